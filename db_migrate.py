@@ -0,0 +1,19 @@
+from sqlalchemy import create_engine
+
+from service.conqueror.settings import database_config
+from service.conqueror.db_models import migrate_schema
+from service.conqueror.utils import DSN
+
+
+def migrate_db():
+    db_url = DSN.format(**database_config['mysql'])
+    engine = create_engine(db_url)
+
+    with engine.connect() as connection:
+        added_columns = migrate_schema(connection)
+
+    print(f'Added columns: {", ".join(added_columns)}' if added_columns else 'The schema is up to date')
+
+
+if __name__ == '__main__':
+    migrate_db()
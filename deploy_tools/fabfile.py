@@ -27,6 +27,7 @@ ASGI_SUPERVISOR_LOCAL_CONF_NAME = 'supervisor_aiohttp_recognize_service.conf'
 CELERY_BEAT_LOCAL_CONF_NAME = 'supervisor_recognize_service_beat.conf'
 CELERY_WORKER_GET_VIDEOS_LOCAL_CONF_NAME = 'supervisor_recognize_service_get_videos_to_process_worker.conf'
 CELERY_WORKER_PROCESS_VIDEO_LOCAL_CONF_NAME = 'supervisor_recognize_service_process_video_worker.conf'
+OCR_SERVER_LOCAL_CONF_NAME = 'supervisor_recognize_service_ocr_server.conf'
 
 NGINX_LOCAL_CONFIG_NAME = 'nginx_config.conf'
 
@@ -37,6 +38,7 @@ SUPERVISOR_CONF_FILES = [
     (CELERY_BEAT_LOCAL_CONF_NAME, CELERY_BEAT_CONF_NAME),
     (CELERY_WORKER_GET_VIDEOS_LOCAL_CONF_NAME, CELERY_WORKER_GET_VIDEOS_LOCAL_CONF_NAME),
     (CELERY_WORKER_PROCESS_VIDEO_LOCAL_CONF_NAME, CELERY_WORKER_PROCESS_VIDEO_LOCAL_CONF_NAME),
+    (OCR_SERVER_LOCAL_CONF_NAME, OCR_SERVER_LOCAL_CONF_NAME),
 ]
 
 CURRENT_FILEPATH = pathlib.Path(__file__).parent.as_posix()
@@ -45,10 +47,16 @@ ROOT_FILEPATH = pathlib.Path(__file__).parent.parent.as_posix()
 
 
 def deploy():
+    # Before the workers are reloaded, they check the schema once on start
+    __migrate_db()
     __copy_supervisor_conf()
     __copy_nginx_conf()
 
 
+def __migrate_db():
+    local(f'cd {ROOT_FILEPATH} && venv/bin/python db_migrate.py')
+
+
 def __copy_supervisor_conf():
     if not exists('/var/log/celery'):
         local('mkdir /var/log/celery')
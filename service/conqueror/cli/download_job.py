@@ -19,7 +19,7 @@ EXPECTED_FILE_TEMPLATE = {
 
 @database_connection
 def select_job_by_id(job_id: str, connection) -> JobModel:
-    return JobModel(list(connection.execute(JobModel.schema.select()
+    return JobModel(list(connection.execute(JobModel.select_columns(connection)
                                    .where(JobModel.schema.c.JobId == job_id)))[0])
 
 
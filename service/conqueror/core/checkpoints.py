@@ -0,0 +1,74 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Recognition checkpoints
+
+A job that dies with its worker is picked up again from the start. While the video is processed,
+the timestamp up to which every sampled frame is matched and the results found so far are saved
+every interval_seconds, the repeated job samples from that timestamp and starts with those results.
+Results of later frames that were matched out of order are saved as well, a rule found stays found.
+"""
+import time
+
+CHECKPOINT_SECONDS_KEY = 'Seconds'
+
+
+class RecognitionCheckpointer:
+
+    def __init__(self, save_checkpoint, interval_seconds=60.0, start_seconds=0.0, seconds_between_samples=0.0):
+        # Called with the checkpoint dict, 0 interval - never
+        self.save_checkpoint = save_checkpoint
+        self.interval_seconds = interval_seconds
+        self.start_seconds = start_seconds
+        self.seconds_between_samples = seconds_between_samples
+
+        self.__last_save_time = time.monotonic()
+        self.__last_processed_frames_count = 0
+
+        self.saved_count = 0
+        self.failed_count = 0
+        self.last_seconds = None
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.save_checkpoint is not None and self.interval_seconds > 0 and self.seconds_between_samples > 0
+
+    def maybe_save(self, processed_frames_count: int, found_lines, url_contains_result: dict,
+                   text_contains_result: dict) -> bool:
+        """
+        Saves a checkpoint if the interval passed since the last one and more frames are processed
+        """
+        if not self.is_enabled or processed_frames_count <= self.__last_processed_frames_count \
+                or time.monotonic() - self.__last_save_time < self.interval_seconds:
+            return False
+
+        seconds = self.start_seconds + processed_frames_count * self.seconds_between_samples
+        checkpoint = {
+            CHECKPOINT_SECONDS_KEY: round(seconds, 3),
+            'SearchPhrasesFound': sorted(found_lines),
+            'URLContainsResults': dict(url_contains_result),
+            'TextContainsResults': dict(text_contains_result),
+        }
+        self.__last_save_time = time.monotonic()
+        self.__last_processed_frames_count = processed_frames_count
+        try:
+            self.save_checkpoint(checkpoint)
+        except Exception as e:
+            # The job goes on, a repeated one starts from the previous checkpoint
+            self.failed_count += 1
+            print(f'Checkpoint at {checkpoint[CHECKPOINT_SECONDS_KEY]} seconds is not saved: {e}')
+            return False
+
+        self.saved_count += 1
+        self.last_seconds = checkpoint[CHECKPOINT_SECONDS_KEY]
+        return True
+
+    def statistics(self) -> dict:
+        return {
+            'start_seconds': self.start_seconds,
+            'saved': self.saved_count,
+            'failed': self.failed_count,
+            'last_seconds': self.last_seconds,
+        }
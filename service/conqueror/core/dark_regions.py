@@ -0,0 +1,79 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Light-on-dark content detection for the inverted recognition pass
+
+The inverted pass only helps where text is light on a dark background. The frame is split
+into tiles, a tile is dark if most of its pixels are dark, and connected dark tiles that
+contain some light pixels (text) make a dark region: a terminal or IDE panel on a light
+screen, or the whole frame of a dark theme.
+"""
+import cv2
+import numpy
+
+
+class DarkRegionClassifier:
+    tile_size = 16
+
+    def __init__(self, max_luminance=96, min_light_luminance=160, min_region_size=48, max_regions_ratio=0.6):
+        self.max_luminance = max_luminance
+        self.min_light_luminance = min_light_luminance
+        # Width and height in frame pixels of the smallest panel worth a second pass
+        self.min_region_size = min_region_size
+        # Above this part of the frame the whole frame is inverted
+        self.max_regions_ratio = max_regions_ratio
+
+        self.frames_count = 0
+        self.skipped_count = 0
+        self.regions_count = 0
+        self.full_count = 0
+
+    def dark_regions(self, image: numpy.ndarray) -> [(int, int, int, int)]:
+        """
+        Regions (x, y, width, height) with light-on-dark content,
+        [] if there are none and the whole image if they cover most of it
+        """
+        height, width = image.shape[:2]
+        grid_size = (max(1, width // self.tile_size), max(1, height // self.tile_size))
+        scale_x, scale_y = width / grid_size[0], height / grid_size[1]
+
+        dark_tiles = self.__tiles_ratio(image < self.max_luminance, grid_size) > 0.5
+        light_tiles = self.__tiles_ratio(image >= self.min_light_luminance, grid_size) > 0
+        # Lines of text make tiles of a dark panel light, they are joined back
+        dark_tiles = cv2.morphologyEx(dark_tiles.astype(numpy.uint8), cv2.MORPH_CLOSE, numpy.ones((3, 3), numpy.uint8))
+
+        regions_count, labels, stats, _ = cv2.connectedComponentsWithStats(dark_tiles)
+        regions = []
+        for label in range(1, regions_count):
+            x, y, tiles_width, tiles_height = stats[label][:4]
+            if min(tiles_width * scale_x, tiles_height * scale_y) < self.min_region_size:
+                continue
+            if not light_tiles[labels == label].any():
+                continue  # Nothing to recognize on an empty dark area
+            regions.append((int(x * scale_x), int(y * scale_y),
+                            int(round(tiles_width * scale_x)), int(round(tiles_height * scale_y))))
+
+        self.frames_count += 1
+        if not regions:
+            self.skipped_count += 1
+        elif sum(w * h for _, _, w, h in regions) > self.max_regions_ratio * width * height:
+            regions = [(0, 0, width, height)]
+            self.full_count += 1
+        else:
+            self.regions_count += 1
+
+        return regions
+
+    @staticmethod
+    def __tiles_ratio(mask: numpy.ndarray, grid_size) -> numpy.ndarray:
+        return cv2.resize(mask.astype(numpy.float32), grid_size, interpolation=cv2.INTER_AREA)
+
+    def statistics(self) -> dict:
+        return {
+            'frames': self.frames_count,
+            'skipped': self.skipped_count,
+            'regions': self.regions_count,
+            'full': self.full_count,
+        }
@@ -0,0 +1,319 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Video decoding backends
+
+ffmpeg - ffmpeg subprocess, the video is streamed to its stdin and frames are read from its stdout
+opencv - in-process decoding with OpenCV VideoCapture (libav) on a temporary file, no pipes and no extra copies
+
+Every backend yields numpy frames sampled by a FrameSampler in one of the pixel formats:
+bgr24      - full bgr frame
+gray       - grayscale frame
+blue_plane - only the blue channel; a backend may yield the full bgr frame instead,
+             recognition takes the blue channel of a 3-channel frame itself
+"""
+import io
+import os
+import shlex
+import subprocess
+import tempfile
+import threading
+from functools import partial
+
+import cv2
+import numpy
+
+from service.conqueror.core.frame_buffers import FrameBufferPool, read_into
+from service.conqueror.core.sampling import FrameSampler, SamplingStrategies, is_pipe_decodable
+
+# In-memory file system, the temporary video file is not written to a disk there
+MEMORY_TEMP_DIR = '/dev/shm'
+
+
+def temporary_video_file(byte_video: bytes):
+    temp_dir = MEMORY_TEMP_DIR if os.path.isdir(MEMORY_TEMP_DIR) else None
+    video_file = tempfile.NamedTemporaryFile(suffix='.video', dir=temp_dir)
+    video_file.write(byte_video)
+    video_file.flush()
+    return video_file
+
+
+class VideoDecoder:
+    name = None
+
+    def __init__(self, byte_video: bytes, frame_sampler: FrameSampler, pixel_format='bgr24', frame_buffers_count=4):
+        self.byte_video = byte_video
+        self.frame_sampler = frame_sampler
+        self.pixel_format = pixel_format
+        self.frame_buffers = FrameBufferPool(frame_buffers_count)
+
+    def frames(self):
+        raise NotImplementedError
+
+    def release(self, frame: numpy.ndarray):
+        """
+        The frame is not used anymore, its buffer can be reused for the next frames
+        """
+        self.frame_buffers.release(frame)
+
+    def statistics(self) -> dict:
+        return self.frame_buffers.statistics()
+
+
+class FfmpegPipeDecoder(VideoDecoder):
+    name = 'ffmpeg'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ppm frames are read here and written to a pooled buffer in bgr order
+        self.__rgb_buffer = None
+
+    def frames(self):
+        if self.frame_sampler.is_seeking:
+            return self.__get_seeking_frame_iterator()
+        return self.__get_decoding_frame_iterator()
+
+    def __video_filter_settings(self):
+        video_filter_setting = self.frame_sampler.video_filter
+
+        # Planes are taken after the conversion to bgr24, so they are exactly the channels of the bgr24 frame
+        if self.pixel_format == 'blue_plane':
+            video_filter_setting += ',format=bgr24,extractplanes=b'
+        elif self.pixel_format == 'gray':
+            video_filter_setting += ',format=bgr24,format=gray'
+        # Quoted as a whole, filter expressions contain quotes and commas of their own
+        return f'-vf "{video_filter_setting}"'
+
+    def __get_output_format(self) -> (str, str):
+        # PNM frames carry their own geometry, so no separate probing pass is needed.
+        # ppm only holds rgb24, channels are swapped back to bgr after reading.
+        if self.pixel_format == 'bgr24':
+            return 'ppm', 'rgb24'
+        return 'pgm', 'gray'
+
+    def __read_frame(self, stream):
+        """
+        Reads one PNM frame ("P5"/"P6", "width height", "maxval" header lines and the raster)
+        into a pooled buffer, returns None at the end of the stream
+        """
+        magic = stream.readline().strip()
+        if not magic:
+            return None
+        if magic not in (b'P5', b'P6'):
+            raise ValueError(f'unexpected frame header {magic}')
+
+        width, height = map(int, stream.readline().split())
+        stream.readline()  # maxval, always 255 for 8 bit formats
+
+        if magic == b'P5':
+            in_frame = self.frame_buffers.acquire((height, width))
+            if read_into(stream, in_frame) < in_frame.nbytes:
+                self.frame_buffers.release(in_frame)
+                return None  # Truncated last frame, ffmpeg was stopped
+            return in_frame
+
+        if self.__rgb_buffer is None or self.__rgb_buffer.shape != (height, width, 3):
+            self.__rgb_buffer = numpy.empty((height, width, 3), numpy.uint8)
+        if read_into(stream, self.__rgb_buffer) < self.__rgb_buffer.nbytes:
+            return None
+
+        in_frame = self.frame_buffers.acquire((height, width, 3))
+        numpy.copyto(in_frame, self.__rgb_buffer[..., ::-1])
+        return in_frame
+
+    def __get_decoding_frame_iterator(self):
+        def writer():
+            try:
+                for chunk in iter(partial(stream.read, 1024), b''):
+                    process.stdin.write(chunk)
+                process.stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass  # FFmpeg is killed when the pipeline stops early.
+
+        # Decoding the video using FFmpeg:
+        ################################################################################
+        stream = io.BytesIO(self.byte_video)
+
+        # FFmpeg input PIPE: WebM encoded data as stream of bytes.
+        # FFmpeg output PIPE: decoded video frames in BGR format, or only the channel used by recognition,
+        # each one with its own size header.
+        codec, pixel_format = self.__get_output_format()
+
+        process = subprocess.Popen(shlex.split(f'ffmpeg {self.frame_sampler.input_options} '
+                                               f'-i pipe: -f image2pipe -c:v {codec} -pix_fmt {pixel_format} -an -sn '
+                                               f'{self.__video_filter_settings()} '
+                                               f'-vsync vfr pipe: '
+                                               f'-loglevel warning'),
+                                   stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, bufsize=10 ** 8)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+
+        try:
+            frame_shape = None
+            while True:
+                in_frame = self.__read_frame(process.stdout)
+
+                if in_frame is None:
+                    break  # Break loop if no more bytes.
+
+                if frame_shape is not None and in_frame.shape != frame_shape:
+                    print(f'Frame resolution changed from {frame_shape} to {in_frame.shape}')
+                frame_shape = in_frame.shape
+
+                # return the frame
+                yield in_frame
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            thread.join()
+            stream.close()
+
+    def __get_seeking_frame_iterator(self):
+        codec, pixel_format = self.__get_output_format()
+
+        # Seeking needs a real file, a pipe can only be read from the start
+        with temporary_video_file(self.byte_video) as video_file:
+            for timestamp in self.frame_sampler.seek_timestamps():
+                process = subprocess.run(shlex.split(f'ffmpeg -ss {timestamp} -i {video_file.name} '
+                                                     f'-frames:v 1 -f image2pipe -c:v {codec} '
+                                                     f'-pix_fmt {pixel_format} -an -sn '
+                                                     f'{self.__video_filter_settings()} pipe: '
+                                                     f'-loglevel error'),
+                                         stdout=subprocess.PIPE)
+
+                in_frame = self.__read_frame(io.BytesIO(process.stdout))
+                if in_frame is None:
+                    break  # Seek past the end of the video
+
+                yield in_frame
+
+
+class OpenCvDecoder(VideoDecoder):
+    """
+    Frames that are not sampled are only grabbed (decoded, but not converted to bgr).
+    There are no frame blending (framerate) or keyframe only decoding in OpenCV,
+    those strategies sample the same timestamps as select.
+    """
+    name = 'opencv'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__bgr_shape = None
+        # Only for gray frames, the bgr frame is converted right away
+        self.__bgr_buffer = None
+
+    def frames(self):
+        with temporary_video_file(self.byte_video) as video_file:
+            capture = cv2.VideoCapture(video_file.name)
+            if not capture.isOpened():
+                raise ValueError('OpenCV can not open the video')
+
+            try:
+                if self.frame_sampler.is_seeking:
+                    yield from self.__seeking_frames(capture)
+                else:
+                    if self.frame_sampler.start_seconds > 0:
+                        capture.set(cv2.CAP_PROP_POS_MSEC, self.frame_sampler.start_seconds * 1000)
+                    yield from self.__decoding_frames(capture)
+            finally:
+                capture.release()
+
+    def __decoding_frames(self, capture):
+        seconds_between_frames = self.frame_sampler.seconds_between_frames
+        frame_index = 0
+        previous_selected_seconds = None
+
+        while capture.grab():
+            if self.frame_sampler.strategy == SamplingStrategies.FRAMESTEP:
+                is_selected = frame_index % self.frame_sampler.skip_frames == 0
+            else:
+                seconds = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+                is_selected = previous_selected_seconds is None \
+                    or seconds - previous_selected_seconds >= seconds_between_frames
+                if is_selected:
+                    previous_selected_seconds = seconds
+            frame_index += 1
+
+            if is_selected:
+                frame = self.__retrieve(capture)
+                if frame is None:
+                    break
+                yield frame
+
+    def __seeking_frames(self, capture):
+        for timestamp in self.frame_sampler.seek_timestamps():
+            capture.set(cv2.CAP_PROP_POS_MSEC, timestamp * 1000)
+            if not capture.grab():
+                break  # Seek past the end of the video
+            frame = self.__retrieve(capture)
+            if frame is None:
+                break
+            yield frame
+
+    def __retrieve(self, capture):
+        """
+        Converts the grabbed frame straight into a pooled buffer
+        """
+        is_gray = self.pixel_format == 'gray'
+        # The blue plane is taken by recognition itself, slicing it here would only add a copy
+        buffer = self.__bgr_buffer if is_gray else self.__acquire(self.__bgr_shape)
+
+        ok, frame = capture.retrieve(buffer)
+        if not ok:
+            return None
+        if frame is not buffer:
+            # First frame or the resolution changed, OpenCV allocated the frame itself
+            if buffer is not None and not is_gray:
+                self.frame_buffers.release(buffer)
+            self.__bgr_shape = frame.shape
+            if is_gray:
+                self.__bgr_buffer = frame
+
+        if not is_gray:
+            return frame
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.__acquire(frame.shape[:2]))
+
+    def __acquire(self, frame_shape):
+        return self.frame_buffers.acquire(frame_shape) if frame_shape is not None else None
+
+
+VIDEO_DECODERS = {decoder.name: decoder for decoder in [FfmpegPipeDecoder, OpenCvDecoder]}
+
+
+def create_video_decoder(name: str, byte_video: bytes, frame_sampler: FrameSampler,
+                         pixel_format='bgr24', frame_buffers_count=4) -> VideoDecoder:
+    if name not in VIDEO_DECODERS:
+        raise ValueError(f'unknown video decoder {name}')
+    return VIDEO_DECODERS[name](byte_video, frame_sampler, pixel_format, frame_buffers_count)
+
+
+def probe_video_timeline(byte_video: bytes) -> (float, int):
+    """
+    Duration in seconds and the number of frames of the video stream, (0.0, 0) if they can't be read.
+    Packets are only demuxed, not decoded: screen recordings often have no duration in their header.
+    """
+    command = 'ffmpeg -nostdin -i {} -map 0:v:0 -c copy -f framecrc pipe: -loglevel error'
+    if is_pipe_decodable(byte_video):
+        process = subprocess.run(shlex.split(command.format('pipe:')), input=byte_video, stdout=subprocess.PIPE)
+    else:
+        with temporary_video_file(byte_video) as video_file:
+            process = subprocess.run(shlex.split(command.format(video_file.name)), stdout=subprocess.PIPE)
+
+    # "#tb 0: 1/1000" header and "stream, dts, pts, duration, size, hash" packet lines
+    time_base = 0.0
+    end = frames_count = 0
+    for line in process.stdout.decode('utf-8', 'replace').splitlines():
+        if line.startswith('#tb 0:'):
+            numerator, denominator = line.split(':')[1].split('/')
+            time_base = int(numerator) / int(denominator)
+        elif line and not line.startswith('#'):
+            _, _, pts, duration = (int(value) for value in line.split(',')[:4])
+            end = max(end, pts + duration)
+            frames_count += 1
+
+    return end * time_base, frames_count
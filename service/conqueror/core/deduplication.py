@@ -0,0 +1,63 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Near-duplicate frame suppression
+
+Screen recordings are mostly static, so consecutive samples often differ only by
+compression noise or the mouse cursor. A frame is compared with the last frame sent to
+OCR on thumbnails and dropped if no changed region is bigger than the cursor.
+Regions are used instead of the mean difference: a new line of text changes
+about as many pixels as a moved cursor, but as one wide region.
+"""
+import cv2
+import numpy
+
+
+class FrameDeduplicator:
+    thumbnail_width = 320
+
+    def __init__(self, max_region_size=32, pixel_threshold=16):
+        # Width and height in frame pixels of the biggest change that is still not new content (the cursor)
+        self.max_region_size = max_region_size
+        self.pixel_threshold = pixel_threshold
+
+        self.__last_thumbnail = None
+        self.frames_count = 0
+        self.skipped_count = 0
+
+    def is_duplicate(self, frame: numpy.ndarray) -> bool:
+        self.frames_count += 1
+
+        image = frame[..., 0] if frame.ndim == 3 else frame
+        scale = self.thumbnail_width / image.shape[1]
+        thumbnail = cv2.resize(image, (self.thumbnail_width, max(1, round(image.shape[0] * scale))),
+                               interpolation=cv2.INTER_AREA)
+
+        last_thumbnail = self.__last_thumbnail
+        if last_thumbnail is not None and last_thumbnail.shape == thumbnail.shape \
+                and self.__max_changed_region_size(thumbnail, last_thumbnail) <= self.max_region_size * scale:
+            self.skipped_count += 1
+            return True
+
+        # Frames are compared with the last recognized one, slow changes still add up
+        self.__last_thumbnail = thumbnail
+        return False
+
+    def __max_changed_region_size(self, thumbnail: numpy.ndarray, last_thumbnail: numpy.ndarray) -> int:
+        changed = (cv2.absdiff(thumbnail, last_thumbnail) > self.pixel_threshold).astype(numpy.uint8)
+        if not changed.any():
+            return 0
+
+        # Letters of a changed line merge into one region
+        changed = cv2.dilate(changed, numpy.ones((3, 3), numpy.uint8))
+        _, _, stats, _ = cv2.connectedComponentsWithStats(changed)
+        # Row 0 is the background
+        return int(stats[1:, [cv2.CC_STAT_WIDTH, cv2.CC_STAT_HEIGHT]].max()) - 2
+
+    def statistics(self) -> dict:
+        return {
+            'frames': self.frames_count,
+            'skipped': self.skipped_count,
+        }
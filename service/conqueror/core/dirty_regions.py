@@ -0,0 +1,216 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Incremental (dirty region) recognition
+
+Only the parts of an image that changed since the previous recognized image are recognized.
+DirtyRegionTracker finds the changed regions, the words recognized in them replace the
+cached words of those regions in RecognitionCache, the rest of the page text is reused.
+RegionReorderBuffer gives the recognized regions back in frame order, since every
+merge builds on the page of the previous frame.
+"""
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy
+
+from service.conqueror.core.recognition_data import (
+    concatenate, empty_recognition_data, first_occurrence_ranks, select
+)
+
+RECOGNITION_DATA_KEYS = ['block_num', 'conf', 'left', 'top', 'width', 'height', 'text']
+
+
+class DirtyRegionTracker:
+
+    def __init__(self, padding=24, pixel_threshold=32, max_changed_ratio=0.5, max_regions_count=8):
+        self.padding = padding
+        self.pixel_threshold = pixel_threshold
+        # Recognizing the whole image is cheaper than many crops covering most of it
+        self.max_changed_ratio = max_changed_ratio
+        self.max_regions_count = max_regions_count
+
+        self.__previous_images = {}
+
+        self.images_count = 0
+        self.unchanged_count = 0
+        self.full_count = 0
+        self.total_pixels = 0
+        self.recognized_pixels = 0
+
+    def changed_regions(self, image_index: int, image: numpy.ndarray) -> [(int, int, int, int)]:
+        """
+        Regions (x, y, width, height) of the image that should be recognized again,
+        the whole image for the first one
+        """
+        height, width = image.shape[:2]
+        previous_image = self.__previous_images.get(image_index)
+        # The image can be a view of a reused frame buffer
+        self.__previous_images[image_index] = image.copy()
+
+        self.images_count += 1
+        self.total_pixels += width * height
+
+        if previous_image is None or previous_image.shape != image.shape:
+            regions = [(0, 0, width, height)]
+        else:
+            regions = self.__find_changed_regions(previous_image, image)
+
+        if not regions:
+            self.unchanged_count += 1
+        elif sum(w * h for _, _, w, h in regions) > self.max_changed_ratio * width * height \
+                or len(regions) > self.max_regions_count:
+            regions = [(0, 0, width, height)]
+
+        if regions == [(0, 0, width, height)]:
+            self.full_count += 1
+        self.recognized_pixels += sum(w * h for _, _, w, h in regions)
+        return regions
+
+    def __find_changed_regions(self, previous_image: numpy.ndarray, image: numpy.ndarray):
+        changed = (cv2.absdiff(previous_image, image) > self.pixel_threshold).astype(numpy.uint8)
+        if changed.ndim == 3:
+            changed = changed.max(axis=2)
+        if not changed.any():
+            return []
+
+        # Padding keeps whole words and lines around the change in the crop
+        kernel = numpy.ones((2 * self.padding + 1, 2 * self.padding + 1), numpy.uint8)
+        changed = cv2.dilate(changed, kernel)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(changed)
+
+        regions = [tuple(int(value) for value in region[:4]) for region in stats[1:]]
+        return merge_overlapping_regions(regions)
+
+    def statistics(self) -> dict:
+        return {
+            'images': self.images_count,
+            'unchanged': self.unchanged_count,
+            'full': self.full_count,
+            'recognized_pixels_ratio': round(self.recognized_pixels / self.total_pixels, 3)
+            if self.total_pixels else 0,
+        }
+
+
+def regions_intersect(first, second) -> bool:
+    return first[0] < second[0] + second[2] and second[0] < first[0] + first[2] \
+        and first[1] < second[1] + second[3] and second[1] < first[1] + first[3]
+
+
+def merge_overlapping_regions(regions: [(int, int, int, int)]) -> [(int, int, int, int)]:
+    """
+    Joins intersecting regions into their bounding regions until no regions intersect
+    """
+    merged = True
+    while merged:
+        merged = False
+        joined_regions = []
+        for region in regions:
+            for index, joined_region in enumerate(joined_regions):
+                if regions_intersect(region, joined_region):
+                    x = min(region[0], joined_region[0])
+                    y = min(region[1], joined_region[1])
+                    right = max(region[0] + region[2], joined_region[0] + joined_region[2])
+                    bottom = max(region[1] + region[3], joined_region[1] + joined_region[3])
+                    joined_regions[index] = (x, y, right - x, bottom - y)
+                    merged = True
+                    break
+            else:
+                joined_regions.append(region)
+        regions = joined_regions
+    return regions
+
+
+class RecognitionCache:
+    """
+    Page words of the last recognized image, one page per image index
+    """
+
+    def __init__(self):
+        self.__pages = {}
+        self.__next_block_num = {}
+
+    def merge(self, image_index: int, regions: [(int, int, int, int)], regions_recognition_data: [dict],
+              cleared_regions: [(int, int, int, int)] = ()) -> dict:
+        """
+        Cached words in cleared_regions are dropped too, the regions changed but were not recognized
+        """
+        page = self.__pages.get(image_index) or empty_recognition_data(RECOGNITION_DATA_KEYS)
+        next_block_num = self.__next_block_num.get(image_index, 0)
+
+        # Cached words of the changed regions are replaced by the words recognized in them
+        dropped_regions = list(regions) + list(cleared_regions)
+        keep = ~self.__intersects_any(page, dropped_regions)
+        pages_data = [select({key: page[key] for key in RECOGNITION_DATA_KEYS}, keep)]
+
+        for (x, y, _, _), recognition_data in zip(regions, regions_recognition_data):
+            region_data = {key: recognition_data[key] for key in RECOGNITION_DATA_KEYS}
+            # Blocks of different crops must not be joined into one
+            block_ranks = first_occurrence_ranks(recognition_data['block_num'])
+            region_data['block_num'] = (next_block_num + block_ranks).astype(numpy.int32)
+            next_block_num += int(block_ranks.max()) + 1 if len(block_ranks) else 0
+            region_data['left'] = recognition_data['left'] + x
+            region_data['top'] = recognition_data['top'] + y
+            pages_data.append(region_data)
+
+        merged = concatenate(pages_data)
+        self.__pages[image_index] = merged
+        self.__next_block_num[image_index] = next_block_num
+        return merged
+
+    @staticmethod
+    def __intersects_any(page: dict, regions: [(int, int, int, int)]) -> numpy.ndarray:
+        """
+        Whether the box of every word intersects any of the regions, as regions_intersect
+        """
+        left, top = page['left'], page['top']
+        right = left + numpy.maximum(1, page['width'])
+        bottom = top + numpy.maximum(1, page['height'])
+        intersects = numpy.zeros(len(left), bool)
+        for x, y, width, height in regions:
+            intersects |= (left < x + width) & (x < right) & (top < y + height) & (y < bottom)
+        return intersects
+
+
+class RegionReorderBuffer:
+    """
+    Collects recognized regions of every image and releases complete images in frame order.
+    Regions of an image are registered (by the preprocessing stage) before they are submitted,
+    so their results can't arrive first.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__pending = {}
+
+    def register(self, frame_index: int, image_index: int, regions: [(int, int, int, int)],
+                 cleared_regions: [(int, int, int, int)] = ()):
+        """
+        An image without regions to recognize is released with the next region of the same image index
+        """
+        with self.__lock:
+            images = self.__pending.setdefault(image_index, OrderedDict())
+            images[frame_index] = (regions, [None] * len(regions), cleared_regions)
+
+    def add(self, frame_index: int, image_index: int, region_index: int, recognition_data: dict):
+        """
+        Returns [(image_index, regions, regions_recognition_data, cleared_regions)]
+        that are complete and next in order
+        """
+        completed = []
+        with self.__lock:
+            images = self.__pending[image_index]
+            images[frame_index][1][region_index] = recognition_data
+
+            while images:
+                first_frame_index = next(iter(images))
+                regions, regions_recognition_data, cleared_regions = images[first_frame_index]
+                if any(data is None for data in regions_recognition_data):
+                    break
+                del images[first_frame_index]
+                completed.append((image_index, regions, regions_recognition_data, cleared_regions))
+
+        return completed
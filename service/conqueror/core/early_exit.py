@@ -0,0 +1,76 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Early exit policy
+
+By default the whole video is decoded and recognized. With early exit conditions set,
+the pipeline stops as soon as all of them hold after a matched result: the rest of the
+video is not decoded and the queued OCR work is cancelled.
+"""
+
+
+class EarlyExitConditions:
+    # Every url_contains and text_contains rule is found, never holds for a job without such rules
+    ALL_RULES_FOUND = 'all_rules_found'
+    # At least min_found_lines key phrase lines are found
+    PHRASE_LINES_FOUND = 'phrase_lines_found'
+
+    ALL = [ALL_RULES_FOUND, PHRASE_LINES_FOUND]
+
+
+class EarlyExitPolicy:
+
+    def __init__(self, conditions: [str], min_found_lines=1):
+        for condition in conditions:
+            if condition not in EarlyExitConditions.ALL:
+                raise ValueError(f'unknown early exit condition {condition}')
+
+        self.conditions = list(conditions)
+        self.min_found_lines = min_found_lines
+
+        self.checks_count = 0
+        self.exit_frame_index = None
+
+    @property
+    def is_enabled(self) -> bool:
+        return bool(self.conditions)
+
+    def is_met(self, frame_index: int, url_contains_result: dict, text_contains_result: dict,
+               found_lines) -> bool:
+        """
+        Whether every condition holds after the result of the frame was matched
+        """
+        if not self.is_enabled:
+            return False
+
+        self.checks_count += 1
+        for condition in self.conditions:
+            if condition == EarlyExitConditions.ALL_RULES_FOUND \
+                    and not self.__are_all_rules_found(url_contains_result, text_contains_result):
+                return False
+            if condition == EarlyExitConditions.PHRASE_LINES_FOUND and len(found_lines) < self.min_found_lines:
+                return False
+
+        self.exit_frame_index = frame_index
+        return True
+
+    @staticmethod
+    def __are_all_rules_found(url_contains_result: dict, text_contains_result: dict) -> bool:
+        # Found lines of a phrase only job are not rules, it must not stop on the first frame
+        if not url_contains_result and not text_contains_result:
+            return False
+        return all(url_contains_result.values()) and all(text_contains_result.values())
+
+    @property
+    def has_exited(self) -> bool:
+        return self.exit_frame_index is not None
+
+    def statistics(self) -> dict:
+        return {
+            'conditions': self.conditions,
+            'checks': self.checks_count,
+            'exited': self.has_exited,
+            'exit_frame': self.exit_frame_index,
+        }
@@ -0,0 +1,84 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Reusable buffers for decoded frames
+
+Decoders read frames straight into preallocated numpy buffers, and the pipeline gives
+the buffers back once a frame is preprocessed, so long videos don't allocate a new
+frame-sized object for every sample. A frame that is never released is simply
+garbage collected and the pool allocates a new buffer instead of waiting for it.
+"""
+import threading
+import weakref
+
+import numpy
+
+
+class FrameBufferPool:
+
+    def __init__(self, buffers_count: int):
+        # Free buffers kept for reuse, more can be in use at the same time
+        self.buffers_count = max(1, buffers_count)
+
+        self.__lock = threading.Lock()
+        self.__buffer_size = None
+        self.__free_buffers = []
+        # Keyed by id, arrays are not hashable
+        self.__owned_buffers = weakref.WeakValueDictionary()
+
+        self.allocated_count = 0
+        self.reused_count = 0
+
+    def acquire(self, frame_shape) -> numpy.ndarray:
+        buffer_size = int(numpy.prod(frame_shape))
+
+        with self.__lock:
+            if buffer_size != self.__buffer_size:
+                # Resolution changed, buffers of the previous size are of no use anymore
+                self.__buffer_size = buffer_size
+                self.__free_buffers = []
+
+            if self.__free_buffers:
+                buffer = self.__free_buffers.pop()
+                self.reused_count += 1
+            else:
+                buffer = numpy.empty(buffer_size, numpy.uint8)
+                self.__owned_buffers[id(buffer)] = buffer
+                self.allocated_count += 1
+
+        return buffer.reshape(frame_shape)
+
+    def release(self, frame: numpy.ndarray):
+        buffer = frame
+        while isinstance(buffer.base, numpy.ndarray):
+            buffer = buffer.base
+
+        with self.__lock:
+            if self.__owned_buffers.get(id(buffer)) is not buffer or buffer.size != self.__buffer_size:
+                return
+            if len(self.__free_buffers) < self.buffers_count \
+                    and not any(buffer is free_buffer for free_buffer in self.__free_buffers):
+                self.__free_buffers.append(buffer)
+
+    def statistics(self) -> dict:
+        return {
+            'allocated': self.allocated_count,
+            'reused': self.reused_count,
+        }
+
+
+def read_into(stream, frame: numpy.ndarray) -> int:
+    """
+    Fills the frame from the stream, a pipe can return less than asked for in one read.
+    Returns the number of bytes read, less than frame.nbytes only at the end of the stream.
+    """
+    view = memoryview(frame.reshape(-1))
+    bytes_read = 0
+    while bytes_read < frame.nbytes:
+        count = stream.readinto(view[bytes_read:])
+        if not count:
+            break
+        bytes_read += count
+    return bytes_read
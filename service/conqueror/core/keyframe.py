@@ -6,42 +6,40 @@ of different software error occurrences
 Vyacheslav Morozov, 2020
 vyacheslav@behealthy.ai
 """
-import copy
-import io
-import json
-import subprocess
-import sys
 import threading
-import shlex
 import os
-from functools import partial
-from billiard.context import Process as LinuxProcess
-from billiard.connection import Pipe as LinuxPipe
-from multiprocessing import Process as WindowsProcess
-from multiprocessing import Pipe as WindowsPipe
 import multiprocessing
 
 import numpy
 
-from service.conqueror.core.keyframe_multipocessing_helper import KeyframeMultiprocessingHelper
+from service.conqueror.core.checkpoints import CHECKPOINT_SECONDS_KEY, RecognitionCheckpointer
+from service.conqueror.core.decoders import VideoDecoder, create_video_decoder, probe_video_timeline
+from service.conqueror.core.deduplication import FrameDeduplicator
+from service.conqueror.core.dirty_regions import RegionReorderBuffer
+from service.conqueror.core.early_exit import EarlyExitConditions, EarlyExitPolicy
+from service.conqueror.core.keyframe_multipocessing_helper import KeyframeMultiprocessingHelper, URL_STRIP_IMAGE_KEY
+from service.conqueror.core.keyframe_worker_pool import KeyframeWorkerPool
+from service.conqueror.core.pipeline import StageQueue, PipelineStage, PipelineStoppedException, PipelineDeadline, \
+    FrameProgress
+from service.conqueror.core.sampling import FrameSampler, SamplingStrategies
 
 
 class KeyFrameFinder:
 
     @property
-    def __video_filter_settings(self):
-        video_filter_setting = '-vf '
-        if self.fps_instead_skip_frames:
-            # video_filter_setting += f'fps=fps={self.frame_per_second}'
-            # video_filter_setting += f'framerate=fps={self.frame_per_second}'
-            video_filter_setting += f'framerate=fps={1/self.seconds_between_frames}'
-        else:
-            video_filter_setting += f'framestep={self.skip_frames}'
-        return video_filter_setting
+    def __decode_pixel_format(self):
+        if self.decode_pixel_format != 'auto':
+            return self.decode_pixel_format
+
+        # Recognition uses only one channel of the frame: the blue one or the grayscale image
+        if self.recognition_settings.get('use_gray_colors', False):
+            return 'gray'
+        return 'blue_plane'
 
     def __init__(self, motion_threshold=0.5,
                  object_detection_threshold=0.5, search_phrases: [str] = [], url_contains: [str] = [],
-                 text_contains: [str] = [], recognition_settings={}, byte_video: bytes = b''):
+                 text_contains: [str] = [], recognition_settings={}, byte_video: bytes = b'',
+                 checkpoint: dict = None, checkpoint_callback=None):
 
         self.recognition_settings = recognition_settings
 
@@ -56,8 +54,37 @@ class KeyFrameFinder:
         self.seconds_between_frames = 3.0
         self.skip_frames = 65
         self.stop_on_first_keyframe_found = False
+        # EarlyExitConditions that all must hold to stop before the end of the video, none - never stop
+        self.early_exit_conditions = []
+        self.early_exit_min_found_lines = 1
+        # Time budget of the job, when it is spent the results found so far are returned. 0 - no budget
+        self.deadline_seconds = 0
         self.fps_instead_skip_frames = True
         self.multiprocessing = True
+        # 0 - one decoded frame per core
+        self.decoded_frames_queue_size = 0
+        # auto | bgr24 | gray | blue_plane
+        self.decode_pixel_format = 'auto'
+        # auto or one of SamplingStrategies
+        self.sampling_strategy = SamplingStrategies.AUTO
+        self.skip_loop_filter = False
+        self.seek_min_seconds_between_frames = 10.0
+        # ffmpeg | opencv
+        self.video_decoder = 'ffmpeg'
+        # Lossy, opt-in: on different_site_errors it kept the recall and saved 2% of the time
+        self.skip_duplicate_frames = False
+        self.duplicate_frame_max_region_size = 32
+        self.duplicate_frame_pixel_threshold = 16
+        # How often the progress is saved with checkpoint_callback, 0 - never
+        self.checkpoint_interval_seconds = 60
+
+        self.statistics = {}
+        # Fraction of the sampled timeline that was processed, less than 1.0 if the deadline stopped the job
+        self.coverage = 1.0
+        self.__decoded_frames_count = 0
+        # A repeated job continues from the checkpoint of the previous run
+        self.checkpoint_callback = checkpoint_callback
+        self.start_seconds = checkpoint[CHECKPOINT_SECONDS_KEY] if checkpoint else 0.0
 
         self.search_phrases = search_phrases
 
@@ -67,6 +94,9 @@ class KeyFrameFinder:
         for key in text_contains:
             self.text_contains_result[key] = False
 
+        if checkpoint:
+            self.__load_checkpoint(checkpoint)
+
         self.templates = {}
 
         self.__load_special_iteration_settings(recognition_settings)
@@ -87,146 +117,303 @@ class KeyFrameFinder:
         if "multiprocessing" in recognition_settings:
             self.multiprocessing = recognition_settings["multiprocessing"]
 
-    def process_keyframes(self) -> ([str], dict, dict):
-        if not self.byte_video:
-            return self.found_lines, self.url_contains_result, self.text_contains_result
-
-        frame_iterator = self.__get_frame_iterator()
+        if "decoded_frames_queue_size" in recognition_settings:
+            self.decoded_frames_queue_size = recognition_settings["decoded_frames_queue_size"]
 
-        final_url_result = copy.deepcopy(self.url_contains_result)
+        if "decode_pixel_format" in recognition_settings:
+            self.decode_pixel_format = recognition_settings["decode_pixel_format"]
 
-        final_text_result = copy.deepcopy(self.text_contains_result)
+        if "sampling_strategy" in recognition_settings:
+            self.sampling_strategy = recognition_settings["sampling_strategy"]
 
-        final_key_phrase_result = set()
+        if "skip_loop_filter" in recognition_settings:
+            self.skip_loop_filter = recognition_settings["skip_loop_filter"]
 
-        cpu_count = multiprocessing.cpu_count() if self.multiprocessing else 1
+        if "seek_min_seconds_between_frames" in recognition_settings:
+            self.seek_min_seconds_between_frames = recognition_settings["seek_min_seconds_between_frames"]
 
-        print(f'Now i will use {cpu_count} core')
+        if "video_decoder" in recognition_settings:
+            self.video_decoder = recognition_settings["video_decoder"]
 
-        if self.multiprocessing:
+        if "skip_duplicate_frames" in recognition_settings:
+            self.skip_duplicate_frames = recognition_settings["skip_duplicate_frames"]
 
-            os.environ['OMP_THREAD_LIMIT'] = '1'
+        if "duplicate_frame_max_region_size" in recognition_settings:
+            self.duplicate_frame_max_region_size = recognition_settings["duplicate_frame_max_region_size"]
 
-        process_frame = True
+        if "duplicate_frame_pixel_threshold" in recognition_settings:
+            self.duplicate_frame_pixel_threshold = recognition_settings["duplicate_frame_pixel_threshold"]
 
-        Pipe = WindowsPipe if sys.platform.startswith('win32') else LinuxPipe
+        if "early_exit_conditions" in recognition_settings:
+            self.early_exit_conditions = recognition_settings["early_exit_conditions"]
 
-        pipe_return, pipe_receive = Pipe(False)
+        if "early_exit_min_found_lines" in recognition_settings:
+            self.early_exit_min_found_lines = recognition_settings["early_exit_min_found_lines"]
 
-        while process_frame:
-            # Todo Для этого есть переменные окружения, свойства класса использовать для такого - плохо.
+        if "deadline_seconds" in recognition_settings:
+            self.deadline_seconds = recognition_settings["deadline_seconds"]
 
-            # if self.stop_on_first_keyframe_found:
-            #     if len(self.found_lines) > 0:
-            #         break
+        if "checkpoint_interval_seconds" in recognition_settings:
+            self.checkpoint_interval_seconds = recognition_settings["checkpoint_interval_seconds"]
 
-            process_list = []
+    def __load_checkpoint(self, checkpoint: dict):
+        # Rules of the job that the previous run found, rules that are not in the job any more are dropped
+        for key, found in checkpoint.get('URLContainsResults', {}).items():
+            if key in self.url_contains_result:
+                self.url_contains_result[key] = found
 
-            for i in range(cpu_count):
-                frame = next(frame_iterator)
-                if frame is None:
-                    process_frame = False
-                    print('final keyframe')
-                    break
+        for key, found in checkpoint.get('TextContainsResults', {}).items():
+            if key in self.text_contains_result:
+                self.text_contains_result[key] = found
 
-                frame_processor = KeyframeMultiprocessingHelper(url_search_keys=self.url_contains_result,
-                                                                text_search_keys=self.text_contains_result,
-                                                                key_phrases=self.search_phrases,
-                                                                recognition_settings=self.recognition_settings)
+        self.found_lines = list(checkpoint.get('SearchPhrasesFound', []))
 
-                Process = WindowsProcess if sys.platform.startswith('win32') else LinuxProcess
+    def get_early_exit_policy(self) -> EarlyExitPolicy:
+        conditions = self.early_exit_conditions
+        if not conditions and self.stop_on_first_keyframe_found:
+            conditions = [EarlyExitConditions.PHRASE_LINES_FOUND]
+        return EarlyExitPolicy(conditions, min_found_lines=self.early_exit_min_found_lines)
 
-                process = Process(target=frame_processor, args=(frame, pipe_receive))
-                process_list.append(process)
-                process.start()
-
-            if len(process_list) < 1:
-                break
-
-            for process in process_list:
-                (url_result, text_result, key_phrases_result) = pipe_return.recv()
-
-                final_url_result = {key: final_url_result[key] or item for key, item in url_result.items()}
+    def process_keyframes(self) -> ([str], dict, dict):
+        if not self.byte_video:
+            return self.found_lines, self.url_contains_result, self.text_contains_result
 
-                final_text_result = {key: final_text_result[key] or item for key, item in text_result.items()}
+        cpu_count = multiprocessing.cpu_count() if self.multiprocessing else 1
 
-                final_key_phrase_result = final_key_phrase_result.union(key_phrases_result)
+        print(f'Now i will use {cpu_count} core')
 
-            for process in process_list:
-                process.join()
+        if self.multiprocessing:
 
-        pipe_receive.close()
-        pipe_return.close()
+            os.environ['OMP_THREAD_LIMIT'] = '1'
 
-        return list(final_key_phrase_result), final_url_result, final_text_result
+        # Preprocessing and rule matching happen here, only recognition is spread between workers
+        frame_processor = KeyframeMultiprocessingHelper(url_search_keys=self.url_contains_result,
+                                                        text_search_keys=self.text_contains_result,
+                                                        key_phrases=self.search_phrases,
+                                                        recognition_settings=self.recognition_settings)
+        frame_processor.found_lines.update(self.found_lines)
+
+        stop_event = threading.Event()
+        deadline = PipelineDeadline(self.deadline_seconds, stop_event)
+        deadline.start()
+        frame_progress = FrameProgress()
+        decoded_frames = StageQueue('decoded_frames', self.decoded_frames_queue_size or cpu_count, stop_event)
+        # Frames in the queue, the one being decoded and the one being preprocessed
+        video_decoder = self.get_video_decoder(frame_buffers_count=decoded_frames.maxsize + 2)
+        frame_deduplicator = FrameDeduplicator(max_region_size=self.duplicate_frame_max_region_size,
+                                               pixel_threshold=self.duplicate_frame_pixel_threshold) \
+            if self.skip_duplicate_frames else None
+        region_reorder_buffer = RegionReorderBuffer() if frame_processor.recognizes_regions else None
+        early_exit_policy = self.get_early_exit_policy()
+        checkpointer = self.get_checkpointer(video_decoder.frame_sampler)
+
+        with KeyframeWorkerPool(cpu_count, url_search_keys=self.url_contains_result,
+                                text_search_keys=self.text_contains_result,
+                                key_phrases=self.search_phrases,
+                                recognition_settings=self.recognition_settings,
+                                stop_event=stop_event) as worker_pool:
+            stages = [
+                PipelineStage('decoder', self.__decoding_stage, stop_event, args=(video_decoder, decoded_frames)),
+                PipelineStage('preprocessing', self.__preprocessing_stage, stop_event,
+                              args=(frame_processor, video_decoder, frame_deduplicator, region_reorder_buffer,
+                                    decoded_frames, worker_pool, frame_progress)),
+            ]
+            for stage in stages:
+                stage.start()
 
-    def __get_frame_iterator(self):
-        def writer():
-            for chunk in iter(partial(stream.read, 1024), b''):
-                process.stdin.write(chunk)
             try:
-                process.stdin.close()
-            except (BrokenPipeError):
-                pass  # For unknown reason there is a Broken Pipe Error when executing FFprobe.
-
-        # Get resolution of video frames using FFprobe
-        # (in case resolution is know, skip this part):
-        ################################################################################
-        # Open In-memory binary streams
-        stream = io.BytesIO(self.byte_video)
-
-        process = subprocess.Popen(
-            shlex.split('ffprobe -v error -i pipe: -select_streams v -print_format json -show_streams'),
-            stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=10 ** 8)
-
-        pthread = threading.Thread(target=writer)
-        pthread.start()
-
-        pthread.join()
-
-        in_bytes = process.stdout.read()
-
-        process.wait()
-
-        video_metadata = json.loads(in_bytes)
-
-        width = (video_metadata['streams'][0])['width']
-        height = (video_metadata['streams'][0])['height']
-        ################################################################################
-
-        # Decoding the video using FFmpeg:
-        ################################################################################
-        stream.seek(0)
-
-        # FFmpeg input PIPE: WebM encoded data as stream of bytes.
-        # FFmpeg output PIPE: decoded video frames in BGR format.
-
-        process = subprocess.Popen(shlex.split('ffmpeg -i pipe: -f rawvideo -pix_fmt bgr24 -an -sn '
-                                               f'{self.__video_filter_settings} '
-                                               f'-vsync vfr -q:v 2 pipe: '
-                                               f'-loglevel warning'),
-                                   stdin=subprocess.PIPE,
-                                   stdout=subprocess.PIPE, bufsize=10 ** 8)
-
-        thread = threading.Thread(target=writer)
-        thread.start()
-
-        # Read decoded video (frame by frame), and display each frame (using cv2.imshow)
+                self.__matching_stage(frame_processor, region_reorder_buffer, worker_pool, early_exit_policy,
+                                      frame_progress, checkpointer)
+            except PipelineStoppedException:
+                pass
+            finally:
+                deadline.cancel()
+                stop_event.set()
+                for stage in stages:
+                    stage.join()
+
+            for stage in stages:
+                stage.raise_if_failed()
+
+            if early_exit_policy.has_exited:
+                # The job is complete, images that are queued or being recognized are not needed
+                print(f'Early exit on frame {early_exit_policy.exit_frame_index}, the rest of the video is skipped')
+                worker_pool.cancel()
+            elif deadline.is_reached:
+                # Recognition of the rest of the video is dropped, what is found so far is the result
+                worker_pool.cancel()
+                self.coverage = self.__timeline_coverage(video_decoder.frame_sampler,
+                                                         frame_progress.processed_frames_count)
+                print(f'Deadline of {self.deadline_seconds} seconds is reached, '
+                      f'{frame_progress.processed_frames_count} frames are processed, coverage {self.coverage}')
+
+        self.statistics = {
+            'decoded_frames': decoded_frames.statistics(),
+            'frame_buffers': video_decoder.statistics(),
+            'duplicate_frames': frame_deduplicator.statistics() if frame_deduplicator else {},
+            'changed_regions': frame_processor.dirty_region_tracker.statistics()
+            if frame_processor.incremental_recognition else {},
+            'text_regions': frame_processor.text_region_detector.statistics()
+            if frame_processor.text_region_proposals else {},
+            'inverted_pass': frame_processor.dark_region_classifier.statistics(),
+            'url_strip': frame_processor.url_strip_tracker.statistics() if frame_processor.url_strip_enabled else {},
+            'static_chrome': frame_processor.static_chrome_detector.statistics()
+            if frame_processor.static_chrome_masking else {},
+            'ocr_tasks': worker_pool.statistics(),
+            'text_scale': worker_pool.worker_statistics.get('text_scale', {}),
+            'rule_matching': frame_processor.rule_matching_statistics(),
+            'block_match_cache': frame_processor.block_match_cache.statistics(),
+            'early_exit': self.__early_exit_statistics(early_exit_policy, worker_pool),
+            'deadline': dict(deadline.statistics(), processed_frames=frame_progress.processed_frames_count,
+                             coverage=self.coverage) if self.deadline_seconds else {},
+            'checkpoints': checkpointer.statistics() if checkpointer.is_enabled or self.start_seconds else {},
+        }
+        print(f'Pipeline statistics: {self.statistics}')
+
+        return list(frame_processor.found_lines), frame_processor.url_contains_result, \
+            frame_processor.text_contains_result
+
+    def __early_exit_statistics(self, early_exit_policy: EarlyExitPolicy, worker_pool: KeyframeWorkerPool) -> dict:
+        if not early_exit_policy.is_enabled:
+            return {}
+
+        statistics = early_exit_policy.statistics()
+        statistics['decoded_frames'] = self.__decoded_frames_count
+        # Frames decoded after the exit frame, their recognition was cancelled or its results dropped
+        statistics['dropped_frames'] = self.__decoded_frames_count - early_exit_policy.exit_frame_index - 1 \
+            if early_exit_policy.has_exited else 0
+        statistics['cancelled_ocr_tasks'] = worker_pool.cancelled_count
+        return statistics
+
+    def __timeline_coverage(self, frame_sampler: FrameSampler, processed_frames_count: int):
+        """
+        None if the length of the video is unknown
+        """
+        duration_seconds, frames_count = probe_video_timeline(self.byte_video)
+        if not duration_seconds:
+            return None
+        covered_seconds = frame_sampler.start_seconds \
+            + processed_frames_count * frame_sampler.seconds_between_samples(frames_count / duration_seconds)
+        return round(min(1.0, covered_seconds / duration_seconds), 3)
+
+    def get_checkpointer(self, frame_sampler: FrameSampler) -> RecognitionCheckpointer:
+        frame_rate = 0.0
+        if self.checkpoint_callback and self.checkpoint_interval_seconds and frame_sampler.needs_frame_rate:
+            # Frames are sampled by their number, the timestamp of a frame depends on the frame rate
+            duration_seconds, frames_count = probe_video_timeline(self.byte_video)
+            frame_rate = frames_count / duration_seconds if duration_seconds else 0.0
+        return RecognitionCheckpointer(self.checkpoint_callback, interval_seconds=self.checkpoint_interval_seconds,
+                                       start_seconds=self.start_seconds,
+                                       seconds_between_samples=frame_sampler.seconds_between_samples(frame_rate))
+
+    def __decoding_stage(self, video_decoder: VideoDecoder, decoded_frames: StageQueue):
+        frame_iterator = video_decoder.frames()
+        try:
+            for frame_index, frame in enumerate(frame_iterator):
+                self.__decoded_frames_count = frame_index + 1
+                decoded_frames.put((frame_index, frame))
+        finally:
+            # Stops the ffmpeg process if the pipeline stopped early
+            frame_iterator.close()
+
+        print('final keyframe')
+        decoded_frames.put(None)
+
+    @staticmethod
+    def __preprocessing_stage(frame_processor: KeyframeMultiprocessingHelper, video_decoder: VideoDecoder,
+                              frame_deduplicator: FrameDeduplicator, region_reorder_buffer: RegionReorderBuffer,
+                              decoded_frames: StageQueue, worker_pool: KeyframeWorkerPool,
+                              frame_progress: FrameProgress):
         while True:
-            # Read raw video frame from stdout as bytes array.
-            in_bytes = process.stdout.read(width * height * 3)
+            decoded_frame = decoded_frames.get()
+            if decoded_frame is None:
+                break
+
+            frame_index, frame = decoded_frame
+            if frame_deduplicator and frame_deduplicator.is_duplicate(frame):
+                # Nothing new to recognize since the last recognized frame
+                video_decoder.release(frame)
+                frame_progress.frame_submitted(frame_index)
+                continue
+
+            frame_is_referenced = False
+            images = frame_processor.preprocess(frame)
+            if images:
+                # The strip is submitted first, the slots must fit the page images, not the strip
+                worker_pool.reserve_shared_memory(max(image.nbytes for image in images))
+            if frame_processor.url_strip_enabled and not frame_processor.url_rules_resolved:
+                # The address bar is recognized on its own and only when it shows something new
+                strip = frame_processor.new_url_strip(images[0])
+                if strip is not None:
+                    frame_progress.add_task(frame_index)
+                    is_copied = worker_pool.submit(frame_index, URL_STRIP_IMAGE_KEY, strip)
+                    frame_is_referenced |= not is_copied and numpy.may_share_memory(strip, frame)
+            if frame_processor.url_strip_enabled and frame_processor.page_rules_resolved:
+                # Only URL rules are left to check
+                images = []
+            elif frame_processor.static_chrome_masking:
+                images = frame_processor.mask_static_chrome(frame, images)
+
+            for image_index, image in enumerate(images):
+                if region_reorder_buffer is None:
+                    tasks = [(image_index, image)]
+                else:
+                    # Only the changed (text) regions are recognized, the matcher merges them with the cached page
+                    regions, cleared_regions = frame_processor.regions_to_recognize(image_index, image)
+                    if cleared_regions:
+                        region_reorder_buffer.register(frame_index, image_index, regions, cleared_regions)
+                    tasks = [((image_index, region_index), image[y:y + height, x:x + width])
+                             for region_index, (x, y, width, height) in enumerate(regions)]
+
+                for image_key, task_image in tasks:
+                    frame_progress.add_task(frame_index)
+                    is_copied = worker_pool.submit(frame_index, image_key, task_image)
+                    # Without preprocessing the image is the frame itself, it is sent after submit returns
+                    frame_is_referenced |= not is_copied and numpy.may_share_memory(task_image, frame)
+
+            if not frame_is_referenced:
+                video_decoder.release(frame)
+            frame_progress.frame_submitted(frame_index)
+
+        worker_pool.finish()
+
+    @staticmethod
+    def __matching_stage(frame_processor: KeyframeMultiprocessingHelper, region_reorder_buffer: RegionReorderBuffer,
+                         worker_pool: KeyframeWorkerPool, early_exit_policy: EarlyExitPolicy,
+                         frame_progress: FrameProgress, checkpointer: RecognitionCheckpointer):
+        # Results are matched in completion order, there is no barrier between frames
+        for frame_index, image_key, recognition_data in worker_pool.results():
+            if region_reorder_buffer is None or image_key == URL_STRIP_IMAGE_KEY:
+                frame_processor.check_search_rules(recognition_data)
+            else:
+                # Pages are merged in frame order, each one is built on the previous page
+                image_index, region_index = image_key
+                for image_index, regions, regions_recognition_data, cleared_regions in region_reorder_buffer.add(
+                        frame_index, image_index, region_index, recognition_data):
+                    frame_processor.check_search_rules(frame_processor.merge_regions(
+                        image_index, regions, regions_recognition_data, cleared_regions))
+            frame_progress.task_done(frame_index)
+            checkpointer.maybe_save(frame_progress.processed_frames_count, frame_processor.found_lines,
+                                    frame_processor.url_contains_result, frame_processor.text_contains_result)
+
+            if early_exit_policy.is_met(frame_index, frame_processor.url_contains_result,
+                                        frame_processor.text_contains_result, frame_processor.found_lines):
+                break
 
-            if not in_bytes:
-                stream.close()
-                thread.join()
-                process.wait(1)
-                yield None  # Break loop if no more bytes.
+    def get_frame_sampler(self) -> FrameSampler:
+        return FrameSampler(self.byte_video, seconds_between_frames=self.seconds_between_frames,
+                            skip_frames=self.skip_frames, fps_instead_skip_frames=self.fps_instead_skip_frames,
+                            strategy=self.sampling_strategy, skip_loop_filter=self.skip_loop_filter,
+                            seek_min_seconds_between_frames=self.seek_min_seconds_between_frames,
+                            start_seconds=self.start_seconds)
 
-            # Transform the byte read into a NumPy array
-            in_frame = (numpy.frombuffer(in_bytes, numpy.uint8).reshape([height, width, 3]))
+    def get_video_decoder(self, frame_buffers_count=4) -> VideoDecoder:
+        frame_sampler = self.get_frame_sampler()
+        print(f'Sampling strategy: {frame_sampler.strategy}, video decoder: {self.video_decoder}')
 
-            # return the frame
-            yield in_frame
+        return create_video_decoder(self.video_decoder, self.byte_video, frame_sampler,
+                                    pixel_format=self.__decode_pixel_format,
+                                    frame_buffers_count=frame_buffers_count)
 
-            # for i in range(70):
-            #     process.stdout.read(width * height * 3)
+    def get_frame_iterator(self):
+        return self.get_video_decoder().frames()
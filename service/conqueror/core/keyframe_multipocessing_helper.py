@@ -5,9 +5,22 @@ import os
 from multiprocessing.queues import Queue
 
 import cv2
-from fuzzywuzzy import fuzz
+import numpy
 from numpy import ndarray
-from pytesseract import pytesseract
+
+from service.conqueror.core.dark_regions import DarkRegionClassifier
+from service.conqueror.core.dirty_regions import DirtyRegionTracker, RecognitionCache
+from service.conqueror.core.ocr_batching import group_images, split_recognition_data, stitch_images
+from service.conqueror.core.ocr_engines import DEFAULT_OCR_ENGINE, OcrEngines, PageSegmentationModes, create_ocr_engine
+from service.conqueror.core.recognition_data import concatenate, join_blocks
+from service.conqueror.core.rule_matcher import BlockMatchCache, RuleMatcher
+from service.conqueror.core.static_chrome import StaticChromeDetector, mask_image
+from service.conqueror.core.text_regions import TextRegionDetector
+from service.conqueror.core.text_scale import TextScaleEstimator
+from service.conqueror.core.url_strip import UrlStripTracker, text_line_bands
+
+# Image key of the URL strip task, its words are always above max_y_position_for_URL
+URL_STRIP_IMAGE_KEY = 'url_strip'
 
 
 class KeyframeMultiprocessingHelper:
@@ -35,6 +48,9 @@ class KeyframeMultiprocessingHelper:
         self.additional_recognition_inverted_image = False
         self.use_threshold_for_inverted_image = True
         self.use_morphology_for_inverted_image = False
+        # the inverted pass runs only on light-on-dark regions of the frame, if there are any
+        self.adaptive_inverted_image = True
+        self.inverted_image_max_luminance = 96
 
         self.min_word_confidence = 0
         self.max_y_position_for_URL = 80
@@ -45,8 +61,59 @@ class KeyframeMultiprocessingHelper:
         self.save_recognition_data_to_csv = False
         self.save_image_with_recognized_text = False
 
+        # pytesseract | tesserocr | server, pytesseract is used if tesserocr is not installed
+        # and the default engine in the worker if the server is not reachable
+        self.ocr_server_socket = os.environ.get('OCR_SERVER_SOCKET')
+        self.ocr_engine = OcrEngines.SERVER if self.ocr_server_socket else DEFAULT_OCR_ENGINE
+        # Requests of one job share a queue on the server
+        self.ocr_job_id = None
+        self.__ocr_engine = None
+        self.__rule_matchers = None
+
+        # OCR batching: small images waiting in the queue are recognized on one canvas in a single call
+        self.ocr_batching = False
+        self.ocr_batch_max_images = 8
+        self.ocr_batch_max_canvas_pixels = 1920 * 1080
+
+        # incremental recognition: only changed regions of the image are recognized again
+        self.incremental_recognition = False
+        self.incremental_region_padding = 24
+        self.incremental_pixel_threshold = 32
+        self.incremental_max_changed_ratio = 0.5
+
+        # URL strip recognition: the top strip is recognized separately, once per distinct content
+        self.url_strip_recognition = False
+        self.url_strip_max_line_height = 32
+
+        # static chrome masking: tiles that don't change over the first frames are masked out of the next ones
+        self.static_chrome_masking = False
+        self.static_chrome_warmup_frames = 6
+
+        # text height normalization: images are resized so that characters have the same height for OCR
+        self.normalize_text_height = False
+        self.target_character_height = 12
+
+        # block match cache: match results of recently seen text blocks are reused on the next frames
+        self.block_match_cache_size = 4096
+
+        # text region proposals: only blocks that look like text are recognized
+        self.text_region_proposals = False
+        self.text_region_padding = 8
+
         self.__load_special_recognition_settings(recognition_settings)
 
+        self.dirty_region_tracker = DirtyRegionTracker(padding=self.incremental_region_padding,
+                                                       pixel_threshold=self.incremental_pixel_threshold,
+                                                       max_changed_ratio=self.incremental_max_changed_ratio)
+        self.recognition_cache = RecognitionCache()
+        self.url_strip_tracker = UrlStripTracker(self.max_y_position_for_URL)
+        self.block_match_cache = BlockMatchCache(max_size=self.block_match_cache_size)
+        self.skipped_results_count = 0
+        self.static_chrome_detector = StaticChromeDetector(warmup_frames=self.static_chrome_warmup_frames)
+        self.text_scale_estimator = TextScaleEstimator(target_character_height=self.target_character_height)
+        self.text_region_detector = TextRegionDetector(padding=self.text_region_padding)
+        self.dark_region_classifier = DarkRegionClassifier(max_luminance=self.inverted_image_max_luminance)
+
     def __load_special_recognition_settings(self, recognition_settings: dict) -> None:
         if "use_gray_colors" in recognition_settings:
             self.use_gray_colors = recognition_settings["use_gray_colors"]
@@ -81,6 +148,12 @@ class KeyframeMultiprocessingHelper:
         if "use_morphology_for_inverted_image" in recognition_settings:
             self.use_morphology_for_inverted_image = recognition_settings["use_morphology_for_inverted_image"]
 
+        if "adaptive_inverted_image" in recognition_settings:
+            self.adaptive_inverted_image = recognition_settings["adaptive_inverted_image"]
+
+        if "inverted_image_max_luminance" in recognition_settings:
+            self.inverted_image_max_luminance = recognition_settings["inverted_image_max_luminance"]
+
         if "use_simple_threshold_bottom_side" in recognition_settings:
             self.use_simple_threshold_bottom_side = recognition_settings["use_simple_threshold_bottom_side"]
 
@@ -93,14 +166,85 @@ class KeyframeMultiprocessingHelper:
         if "use_adaptiveThreshold_method" in recognition_settings:
             self.use_adaptiveThreshold_method = recognition_settings["use_adaptiveThreshold_method"]
 
+        if "ocr_engine" in recognition_settings:
+            self.ocr_engine = recognition_settings["ocr_engine"]
+
+        if "ocr_server_socket" in recognition_settings:
+            self.ocr_server_socket = recognition_settings["ocr_server_socket"]
+
+        if "ocr_job_id" in recognition_settings:
+            self.ocr_job_id = recognition_settings["ocr_job_id"]
+
+        if "ocr_batching" in recognition_settings:
+            self.ocr_batching = recognition_settings["ocr_batching"]
+
+        if "ocr_batch_max_images" in recognition_settings:
+            self.ocr_batch_max_images = recognition_settings["ocr_batch_max_images"]
+
+        if "ocr_batch_max_canvas_pixels" in recognition_settings:
+            self.ocr_batch_max_canvas_pixels = recognition_settings["ocr_batch_max_canvas_pixels"]
+
+        if "incremental_recognition" in recognition_settings:
+            self.incremental_recognition = recognition_settings["incremental_recognition"]
+
+        if "incremental_region_padding" in recognition_settings:
+            self.incremental_region_padding = recognition_settings["incremental_region_padding"]
+
+        if "incremental_pixel_threshold" in recognition_settings:
+            self.incremental_pixel_threshold = recognition_settings["incremental_pixel_threshold"]
+
+        if "incremental_max_changed_ratio" in recognition_settings:
+            self.incremental_max_changed_ratio = recognition_settings["incremental_max_changed_ratio"]
+
+        if "url_strip_recognition" in recognition_settings:
+            self.url_strip_recognition = recognition_settings["url_strip_recognition"]
+
+        if "url_strip_max_line_height" in recognition_settings:
+            self.url_strip_max_line_height = recognition_settings["url_strip_max_line_height"]
+
+        if "static_chrome_masking" in recognition_settings:
+            self.static_chrome_masking = recognition_settings["static_chrome_masking"]
+
+        if "static_chrome_warmup_frames" in recognition_settings:
+            self.static_chrome_warmup_frames = recognition_settings["static_chrome_warmup_frames"]
+
+        if "block_match_cache_size" in recognition_settings:
+            self.block_match_cache_size = recognition_settings["block_match_cache_size"]
+
+        if "normalize_text_height" in recognition_settings:
+            self.normalize_text_height = recognition_settings["normalize_text_height"]
+
+        if "target_character_height" in recognition_settings:
+            self.target_character_height = recognition_settings["target_character_height"]
+
+        if "text_region_proposals" in recognition_settings:
+            self.text_region_proposals = recognition_settings["text_region_proposals"]
+
+        if "text_region_padding" in recognition_settings:
+            self.text_region_padding = recognition_settings["text_region_padding"]
+
 
     def __call__(self, frame: ndarray, result_pipe,  *args, **kwargs):
+        result_pipe.send(self.process_frame(frame))
+
+    def process_frame(self, frame: ndarray) -> (dict, dict, set):
+        for image in self.preprocess(frame):
+            self.check_search_rules(self.recognize(image))
+
+        return self.url_contains_result, self.text_contains_result, self.found_lines
+
+    def preprocess(self, frame: ndarray) -> [ndarray]:
+        """
+        Prepares images that should be recognized for the frame:
+        the frame itself and, if enabled and the frame has light-on-dark content, its inverted copy
+        """
         self.frame = frame
 
-        image = self.__image_preprocessing()
-        if self.additional_recognition_inverted_image:
+        images = [self.__image_preprocessing()]
+        inverted_frame = self.__inverted_frame(frame) if self.additional_recognition_inverted_image else None
+        if inverted_frame is not None:
             # invert colors
-            self.frame = 255 - frame
+            self.frame = inverted_frame
 
             # save current image_preprocessing settings values
             threshold = self.use_simple_threshold
@@ -116,7 +260,7 @@ class KeyframeMultiprocessingHelper:
             self.use_simple_threshold_bottom_side_new_value = cv2.THRESH_BINARY
             self.adaptiveThreshold = False
 
-            image2 = self.__image_preprocessing()
+            images.append(self.__image_preprocessing())
 
             # return preprocessing setting to previous values
             self.use_simple_threshold = threshold
@@ -125,43 +269,183 @@ class KeyframeMultiprocessingHelper:
             self.use_simple_threshold_bottom_side_new_value = threshold_new_value
             self.adaptiveThreshold = adaptiveThreshold
 
-
-        recognition_data = pytesseract.image_to_data(image, config=' SET OMP_THREAD_LIMIT=1 ', output_type='dict',)
-        if self.additional_recognition_inverted_image:
-            inverted_image_recognition_data = pytesseract.image_to_data(image2, config=' SET OMP_THREAD_LIMIT=1 ', output_type='dict', )
-
-
-        # you can try --psm 11 and --psm 6
-        # recognition_data = pytesseract.image_to_data(image, output_type='dict')
-        # recognition_data2 = pytesseract.image_to_data(image, config='--psm 11', output_type='dict')
-        # recognition_data3 = pytesseract.image_to_data(255 - image, output_type='dict')
+        self.frame = None
+        return images
+
+    def __inverted_frame(self, frame: ndarray):
+        if not self.adaptive_inverted_image:
+            return 255 - frame
+
+        channel = frame[..., 0] if frame.ndim == 3 else frame
+        regions = self.dark_region_classifier.dark_regions(channel)
+        if not regions:
+            return None
+
+        height, width = frame.shape[:2]
+        if regions == [(0, 0, width, height)]:
+            return 255 - frame
+
+        # Light content outside the dark regions stays white and has nothing to recognize,
+        # word positions stay the same as on the frame
+        inverted_frame = numpy.full_like(frame, 255)
+        for x, y, region_width, region_height in regions:
+            region = (slice(y, y + region_height), slice(x, x + region_width))
+            inverted_frame[region] = 255 - frame[region]
+        return inverted_frame
+
+    def __create_ocr_engine_once(self):
+        if self.__ocr_engine is None:
+            # Created on first use, so every worker process loads its own engine once
+            self.__ocr_engine = create_ocr_engine(self.ocr_engine, server_socket=self.ocr_server_socket,
+                                                  job_id=self.ocr_job_id)
+
+    def recognize(self, image: ndarray) -> dict:
+        self.__create_ocr_engine_once()
+        # Boxes are given back in the image coordinates whatever size is recognized
+        scale = self.text_scale_estimator.scale(image) if self.normalize_text_height else 1.0
+        recognition_data = self.__recognize_scaled(image, scale)
 
         if self.save_recognition_data_to_csv:
             self.__save_recognition_csv(recognition_data)
 
         if self.save_image_with_recognized_text:
-            self.__save_recognized_image(frame, recognition_data)
-            if self.additional_recognition_inverted_image:
-                self.__save_recognized_image(frame, inverted_image_recognition_data, additional_suffix="_inverted_")
+            self.__save_recognized_image(image, recognition_data)
         # cv2.imshow("image", image)
         # cv2.waitKey()
 
-        self.__check_search_rules(recognition_data)
-        if self.additional_recognition_inverted_image:
-            self.__check_search_rules(inverted_image_recognition_data)
-
-        result_pipe.send((self.url_contains_result, self.text_contains_result, self.found_lines))
+        return recognition_data
+
+    def __recognize_scaled(self, image: ndarray, scale: float) -> dict:
+        if scale == 1.0:
+            return self.__ocr_engine.image_to_data(image)
+
+        height, width = image.shape[:2]
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+        recognition_data = self.__ocr_engine.image_to_data(cv2.resize(image, size, interpolation=interpolation))
+
+        for key in ['left', 'top', 'width', 'height']:
+            recognition_data[key] = numpy.round(recognition_data[key] / scale).astype(numpy.int32)
+        return recognition_data
+
+    def worker_statistics(self) -> dict:
+        """
+        Counters of the recognition that happens in worker processes
+        """
+        statistics = {}
+        if self.normalize_text_height:
+            statistics['text_scale'] = self.text_scale_estimator.statistics()
+        return statistics
+
+    @property
+    def url_strip_enabled(self) -> bool:
+        return self.url_strip_recognition and self.max_y_position_for_URL > 0
+
+    @property
+    def url_rules_resolved(self) -> bool:
+        return all(self.url_contains_result.values())
+
+    @property
+    def page_rules_resolved(self) -> bool:
+        """
+        Page text can't change the result any more: every text rule is found and there are no phrases to collect
+        """
+        return not self.search_phrases and all(self.text_contains_result.values())
+
+    def mask_static_chrome(self, frame: ndarray, images: [ndarray]) -> [ndarray]:
+        """
+        Images of the frame without its static chrome, its text was matched on the first frames of the job
+        """
+        mask = self.static_chrome_detector.static_mask(frame)
+        if mask is None:
+            return images
+        return [mask_image(image, mask) for image in images]
+
+    def new_url_strip(self, image: ndarray):
+        """
+        The URL strip of the preprocessed image if its content was not recognized yet, None otherwise
+        """
+        return self.url_strip_tracker.new_strip(image)
+
+    def recognize_url_strip(self, strip: ndarray) -> dict:
+        self.__create_ocr_engine_once()
+
+        bands = text_line_bands(strip)
+        if not bands or any(height > self.url_strip_max_line_height for _, height in bands):
+            # Not a simple address bar, its layout is left to tesseract
+            return self.__ocr_engine.image_to_data(strip)
+
+        lines_data = []
+        for band_index, (y, height) in enumerate(bands):
+            line_data = self.__ocr_engine.image_to_data(strip[y:y + height],
+                                                        page_segmentation_mode=PageSegmentationModes.SINGLE_LINE)
+            line_data['top'] = line_data['top'] + y
+            # Every line is a block of its own
+            line_data['block_num'] = numpy.full(len(line_data['block_num']), band_index + 1, numpy.int32)
+            lines_data.append(line_data)
+
+        return concatenate(lines_data)
+
+    def recognize_batch(self, images: [ndarray]) -> [dict]:
+        """
+        Recognition data of every image, images that fit one canvas are recognized in one call
+        """
+        images_recognition_data = []
+        for group in group_images(images, self.ocr_batch_max_canvas_pixels):
+            if len(group) == 1:
+                images_recognition_data.append(self.recognize(images[group[0]]))
+                continue
 
-    def __check_search_rules(self, recognition_data):
+            canvas, placements = stitch_images([images[image_index] for image_index in group])
+            images_recognition_data += split_recognition_data(self.recognize(canvas), placements)
+
+        return images_recognition_data
+
+    @property
+    def recognizes_regions(self) -> bool:
+        """
+        Images are recognized by regions, the matcher merges them into pages
+        """
+        return self.incremental_recognition or self.text_region_proposals
+
+    def regions_to_recognize(self, image_index: int, image: ndarray) -> ([(int, int, int, int)],
+                                                                         [(int, int, int, int)]):
+        """
+        Regions (x, y, width, height) of the preprocessed image that should be recognized
+        and regions whose cached words are outdated: the changed ones or the whole image
+        """
+        height, width = image.shape[:2]
+        if self.incremental_recognition:
+            changed_regions = self.dirty_region_tracker.changed_regions(image_index, image)
+        else:
+            changed_regions = [(0, 0, width, height)]
+
+        if not self.text_region_proposals or not changed_regions:
+            return changed_regions, changed_regions
+
+        # Only text blocks of the changed regions are recognized
+        return self.text_region_detector.text_regions(image, changed_regions), changed_regions
+
+    def merge_regions(self, image_index: int, regions: [(int, int, int, int)], regions_recognition_data: [dict],
+                      cleared_regions: [(int, int, int, int)] = ()) -> dict:
+        """
+        Page recognition data: words of the recognized regions and cached words of the rest of the page
+        """
+        return self.recognition_cache.merge(image_index, regions, regions_recognition_data, cleared_regions)
+
+    def check_search_rules(self, recognition_data):
+        if self.url_rules_resolved and self.page_rules_resolved:
+            # Every rule is found already, nothing on the next frames can change the result
+            self.skipped_results_count += 1
+            return
+
+        self.__create_rule_matchers_once()
         url_blocks, page_blocks = self.__get_blocks(recognition_data)
         for line_text in page_blocks:
             if line_text == '':
                 continue
 
-            if self.max_y_position_for_URL < 1:
-                self.__check_url_contains(line_text)
-            self.__check_text_contains(line_text)
-            self.__save_if_keyphrase(line_text)
+            self.__check_block('page', line_text)
 
         if self.max_y_position_for_URL > 0:
 
@@ -169,63 +453,71 @@ class KeyframeMultiprocessingHelper:
                 if line_text == '':
                     continue
 
-                self.__check_url_contains(line_text)
+                self.__check_block('url', line_text)
 
     def __get_blocks(self, recognition_data: dict):
-        url_blocks = {}
-        page_blocks = {}
-
-        for word_index, block_index in enumerate(recognition_data['block_num']):
-            if int(recognition_data['conf'][word_index]) > self.min_word_confidence:
-                if recognition_data['top'][word_index] > self.max_y_position_for_URL:
-                    if block_index in page_blocks:
-                        page_blocks[block_index] = page_blocks[block_index] + ' ' + recognition_data['text'][word_index]
-                    else:
-                        page_blocks[block_index] = recognition_data['text'][word_index]
-                else:
-                    if block_index in url_blocks:
-                        url_blocks[block_index] = url_blocks[block_index] + ' ' + recognition_data['text'][word_index]
-                    else:
-                        url_blocks[block_index] = recognition_data['text'][word_index]
-
-        result_url_blocks = [block for block in url_blocks.values() if len(block.strip()) > 0]
-        result_page_blocks = [block for block in page_blocks.values() if len(block.strip()) > 0]
+        # int() of the confidence as the words were filtered before
+        is_confident = numpy.trunc(recognition_data['conf']) > self.min_word_confidence
+        is_page = recognition_data['top'] > self.max_y_position_for_URL
+
+        url_words = numpy.flatnonzero(is_confident & ~is_page)
+        page_words = numpy.flatnonzero(is_confident & is_page)
+        url_blocks = join_blocks(recognition_data['block_num'][url_words], recognition_data['text'][url_words])
+        page_blocks = join_blocks(recognition_data['block_num'][page_words], recognition_data['text'][page_words])
+
+        result_url_blocks = [block for block in url_blocks if len(block.strip()) > 0]
+        result_page_blocks = [block for block in page_blocks if len(block.strip()) > 0]
         return result_url_blocks, result_page_blocks
 
-    def __check_text_contains(self, whole_page_text):
-        for key in self.text_contains_result.keys():
-            if not self.text_contains_result[key] \
-                    and len(whole_page_text) + 5 >= len(key) \
-                    and (
-                    key in whole_page_text
-                    or
-                    fuzz.partial_ratio(key, whole_page_text) >= self.comparing_similarity_for_phrases
-            ):
-                self.text_contains_result[key] = True
-
-    def __check_url_contains(self, whole_page_text):
-        for key in self.url_contains_result.keys():
-            if not self.url_contains_result[key] \
-                    and len(whole_page_text) + 5 >= len(key) \
-                    and (
-                    key.lower() in whole_page_text.lower()
-                    or
-                    fuzz.partial_ratio(key, whole_page_text) >= self.comparing_similarity_for_phrases
-            ):
-                self.url_contains_result[key] = True
-
-    def __save_if_keyphrase(self, text):
-        for phrase in self.search_phrases:
-            if len(text) + 5 >= len(phrase) \
-                    and (
-                    fuzz.partial_ratio(phrase, text) >= self.comparing_similarity_for_phrases
-                    or
-                    phrase.lower() in text.lower()
-            ):
-                self.found_lines.add(text)
+    def __create_rule_matchers_once(self):
+        if self.__rule_matchers is not None:
+            return
+        # Compiled on first use, only the process that matches results needs them
+        similarity = self.comparing_similarity_for_phrases
+        self.__rule_matchers = {
+            'url': RuleMatcher([key for key, found in self.url_contains_result.items() if not found], similarity),
+            'text': RuleMatcher([key for key, found in self.text_contains_result.items() if not found], similarity,
+                                case_sensitive=True),
+            'phrases': RuleMatcher(self.search_phrases, similarity, resolve_matched=False),
+        }
+
+    def __check_block(self, block_kind: str, text: str):
+        result = self.block_match_cache.get((block_kind, text))
+        if result is None:
+            result = self.__match_block(block_kind, text)
+            self.block_match_cache.put((block_kind, text), result)
+
+        url_keys, text_keys, is_key_phrase = result
+        for key in url_keys:
+            self.url_contains_result[key] = True
+        for key in text_keys:
+            self.text_contains_result[key] = True
+        if is_key_phrase:
+            self.found_lines.add(text)
+
+    def __match_block(self, block_kind: str, text: str) -> ((str,), (str,), bool):
+        """
+        URL and text rules that the block matches and whether it is a key phrase line
+        """
+        # Without the URL position page blocks are checked for URLs too
+        url_keys = self.__rule_matchers['url'].match(text) \
+            if block_kind == 'url' or self.max_y_position_for_URL < 1 else []
+        if block_kind == 'url':
+            return tuple(url_keys), (), False
+
+        return tuple(url_keys), tuple(self.__rule_matchers['text'].match(text)), \
+            bool(self.__rule_matchers['phrases'].match(text, first_only=True))
+
+    def rule_matching_statistics(self) -> dict:
+        if self.__rule_matchers is None:
+            return {}
+        statistics = {kind: rule_matcher.statistics() for kind, rule_matcher in self.__rule_matchers.items()}
+        statistics['skipped_results'] = self.skipped_results_count
+        return statistics
 
     def __image_preprocessing(self) -> ndarray:
-        image = self.frame[..., 0]
+        # Frames can be decoded as a single channel already (blue plane or grayscale)
+        image = self.frame[..., 0] if self.frame.ndim == 3 else self.frame
 
         if self.increase_image_contrast:
             contrast = 64
@@ -240,7 +532,7 @@ class KeyframeMultiprocessingHelper:
 
 
         if self.use_gray_colors:
-            image = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+            image = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY) if self.frame.ndim == 3 else self.frame
 
         if self.use_threshold_with_gausian_blur:
             blur = cv2.GaussianBlur(image, (3, 3), 0)
@@ -284,13 +576,13 @@ class KeyframeMultiprocessingHelper:
             print("I/O error")
 
     def __save_recognized_image(self, src_image, recognition_data, additional_suffix=""):
-        image = copy.deepcopy(src_image)
+        image = cv2.cvtColor(src_image, cv2.COLOR_GRAY2BGR) if src_image.ndim == 2 else copy.deepcopy(src_image)
         for i in range(0, len(recognition_data["text"])):
             # extract the bounding box coordinates of the text region from
-            x = recognition_data["left"][i]
-            y = recognition_data["top"][i]
-            w = recognition_data["width"][i]
-            h = recognition_data["height"][i]
+            x = int(recognition_data["left"][i])
+            y = int(recognition_data["top"][i])
+            w = int(recognition_data["width"][i])
+            h = int(recognition_data["height"][i])
             # extract the OCR text itself along with the confidence of the
             # text localization
             text = recognition_data["text"][i]
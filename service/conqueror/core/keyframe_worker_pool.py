@@ -0,0 +1,334 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Long-lived pool of OCR worker processes
+
+Each worker builds its KeyframeMultiprocessingHelper (and therefore receives the
+rule sets) once, then pulls preprocessed images from a shared bounded task queue
+and pushes recognition data back as soon as an image is recognized.
+Images travel through a shared-memory ring, the task itself only holds the slot reference.
+The ring is reallocated with bigger slots when an image doesn't fit, so no image falls back to pickling.
+With OCR batching a worker takes every queued task it can and recognizes them together.
+"""
+import queue
+import sys
+import threading
+import time
+from billiard.context import Process as LinuxProcess
+from billiard import Queue as LinuxQueue
+from multiprocessing import Process as WindowsProcess
+from multiprocessing import Queue as WindowsQueue
+
+from service.conqueror.core.keyframe_multipocessing_helper import KeyframeMultiprocessingHelper, URL_STRIP_IMAGE_KEY
+from service.conqueror.core.pipeline import PipelineStoppedException
+from service.conqueror.core.shared_frames import SharedFrameRing, SharedFrameReader, SharedFrameReference
+
+
+class OcrWorkerException(Exception):
+    pass
+
+
+def _ocr_worker_loop(frame_processor: KeyframeMultiprocessingHelper, task_queue, result_queue):
+    shared_frame_reader = SharedFrameReader()
+    is_finished = False
+    while not is_finished:
+        tasks = [task_queue.get()]
+        # Images that are already queued are recognized in one call, no waiting for more
+        while frame_processor.ocr_batching and tasks[-1] is not None \
+                and len(tasks) < frame_processor.ocr_batch_max_images:
+            try:
+                tasks.append(task_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        if tasks[-1] is None:
+            tasks.pop()
+            is_finished = True
+
+        if tasks:
+            _recognize_tasks(frame_processor, shared_frame_reader, tasks, result_queue)
+
+    # Every worker reports its end with its counters, so the reader knows no results are left
+    shared_frame_reader.close()
+    result_queue.put(frame_processor.worker_statistics())
+
+
+def _recognize_tasks(frame_processor: KeyframeMultiprocessingHelper, shared_frame_reader: SharedFrameReader,
+                     tasks: list, result_queue):
+    slots = [(image.memory_name, image.slot) if isinstance(image, SharedFrameReference) else None
+             for _, _, image in tasks]
+    try:
+        images = [shared_frame_reader.view(image) if isinstance(image, SharedFrameReference) else image
+                  for _, _, image in tasks]
+        images_recognition_data = [frame_processor.recognize_url_strip(image)
+                                   if image_key == URL_STRIP_IMAGE_KEY else None
+                                   for (_, image_key, _), image in zip(tasks, images)]
+
+        page_indexes = [index for index, (_, image_key, _) in enumerate(tasks) if image_key != URL_STRIP_IMAGE_KEY]
+        if len(page_indexes) == 1:
+            images_recognition_data[page_indexes[0]] = frame_processor.recognize(images[page_indexes[0]])
+        elif page_indexes:
+            for index, recognition_data in zip(page_indexes, frame_processor.recognize_batch(
+                    [images[index] for index in page_indexes])):
+                images_recognition_data[index] = recognition_data
+        # The slots must not be referenced after their release
+        del images
+        errors = [None] * len(tasks)
+    except Exception as e:
+        images_recognition_data = [None] * len(tasks)
+        errors = [f'{type(e).__name__}: {e}'] * len(tasks)
+
+    for (frame_index, image_key, _), slot, recognition_data, error in zip(tasks, slots, images_recognition_data,
+                                                                          errors):
+        result_queue.put((frame_index, image_key, slot, recognition_data, error))
+
+
+class KeyframeWorkerPool:
+    poll_interval_seconds = 0.1
+
+    def __init__(self, processes_count: int, url_search_keys={}, text_search_keys={}, key_phrases=[],
+                 recognition_settings={}, stop_event: threading.Event = None):
+        self.processes_count = max(1, processes_count)
+        # Keep every worker busy while the next frame is preprocessed, without queueing the whole video
+        self.max_images_in_flight = self.processes_count * 2
+        if recognition_settings.get('ocr_batching', False):
+            # A worker batches only the images that are queued already
+            batch_size = recognition_settings.get('ocr_batch_max_images', 8)
+            self.max_images_in_flight = self.processes_count * max(2, batch_size)
+        self.stop_event = stop_event or threading.Event()
+
+        self.url_search_keys = url_search_keys
+        self.text_search_keys = text_search_keys
+        self.key_phrases = key_phrases
+        self.recognition_settings = recognition_settings
+
+        self.use_shared_memory = recognition_settings.get('shared_memory_frames', True)
+        # Images that wait in the task queue, are being recognized or wait for their result to be read
+        self.shared_memory_slots_count = self.max_images_in_flight + self.processes_count
+        self.shared_frame_ring = None
+        # Replaced rings by memory name, until the workers release their slots
+        self.__retired_shared_frame_rings = {}
+        # Rings are replaced by the preprocessing stage and their slots released by the matching one
+        self.__shared_memory_lock = threading.Lock()
+
+        self.__is_windows = sys.platform.startswith('win32')
+        Queue = WindowsQueue if self.__is_windows else LinuxQueue
+
+        self.task_queue = Queue(self.max_images_in_flight)
+        self.result_queue = Queue()
+        self.processes = []
+
+        self.__counters_lock = threading.Lock()
+        self.submitted_count = 0
+        self.recognized_count = 0
+        self.max_depth = 0
+        self.cancelled_count = 0
+        self.shared_memory_reallocations_count = 0
+        self.pickled_images_count = 0
+        self.submit_stall_seconds = 0.0
+        self.result_stall_seconds = 0.0
+        self.worker_statistics = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def start(self):
+        Process = WindowsProcess if self.__is_windows else LinuxProcess
+
+        for _ in range(self.processes_count):
+            frame_processor = KeyframeMultiprocessingHelper(url_search_keys=self.url_search_keys,
+                                                            text_search_keys=self.text_search_keys,
+                                                            key_phrases=self.key_phrases,
+                                                            recognition_settings=self.recognition_settings)
+
+            process = Process(target=_ocr_worker_loop, args=(frame_processor, self.task_queue, self.result_queue))
+            process.daemon = True
+            process.start()
+            self.processes.append(process)
+
+    def submit(self, frame_index: int, image_key, image) -> bool:
+        """
+        Blocks while all workers are busy and the task queue is full.
+        image_key identifies the image of the frame in results: its index, (index, region index)
+        or URL_STRIP_IMAGE_KEY.
+        Returns whether the image was copied to shared memory, otherwise it is pickled
+        by the queue later and must not be changed.
+        """
+        is_copied = False
+        started = time.monotonic()
+        try:
+            if self.use_shared_memory:
+                self.reserve_shared_memory(image.nbytes)
+                image = self.shared_frame_ring.write(image)
+                is_copied = True
+            else:
+                self.pickled_images_count += 1
+
+            self.__put_task((frame_index, image_key, image))
+        finally:
+            self.submit_stall_seconds += time.monotonic() - started
+
+        with self.__counters_lock:
+            self.submitted_count += 1
+            self.max_depth = max(self.max_depth, self.submitted_count - self.recognized_count)
+
+        return is_copied
+
+    def reserve_shared_memory(self, image_nbytes: int):
+        """
+        Makes the slots fit images of image_nbytes bytes
+        """
+        if not self.use_shared_memory or \
+                self.shared_frame_ring is not None and self.shared_frame_ring.fits_size(image_nbytes):
+            return
+
+        with self.__shared_memory_lock:
+            slot_size = max(image_nbytes, 1)
+            if self.shared_frame_ring is not None:
+                # Doubled, images that grow a little at a time (text regions) reallocate only a few times
+                slot_size = max(slot_size, self.shared_frame_ring.slot_size * 2)
+                self.shared_memory_reallocations_count += 1
+                self.__retire_shared_frame_ring(self.shared_frame_ring)
+
+            self.shared_frame_ring = SharedFrameRing(self.shared_memory_slots_count, slot_size, self.stop_event)
+
+    def __retire_shared_frame_ring(self, shared_frame_ring: SharedFrameRing):
+        if shared_frame_ring.is_idle:
+            shared_frame_ring.close()
+        else:
+            self.__retired_shared_frame_rings[shared_frame_ring.name] = shared_frame_ring
+
+    def __release_shared_slot(self, memory_name: str, slot: int):
+        with self.__shared_memory_lock:
+            if memory_name == self.shared_frame_ring.name:
+                self.shared_frame_ring.release(slot)
+                return
+
+            shared_frame_ring = self.__retired_shared_frame_rings[memory_name]
+            shared_frame_ring.release(slot)
+            if shared_frame_ring.is_idle:
+                shared_frame_ring.close()
+                del self.__retired_shared_frame_rings[memory_name]
+
+    def __put_task(self, task):
+        # Waits for space with the stop event checked, a dead worker can leave the queue full
+        while True:
+            if self.stop_event.is_set():
+                raise PipelineStoppedException('ocr task queue stopped')
+            try:
+                self.task_queue.put(task, timeout=self.poll_interval_seconds)
+                return
+            except queue.Full:
+                continue
+
+    def finish(self):
+        """
+        Tells the workers that no more images will be submitted
+        """
+        for _ in self.processes:
+            self.__put_task(None)
+
+    def results(self):
+        """
+        Yields (frame_index, image_key, recognition_data) in completion order until every worker has finished
+        """
+        finished_workers = 0
+        while finished_workers < len(self.processes):
+            if self.stop_event.is_set():
+                # Results that are left are not matched, the pipeline is stopped (by a failure or its deadline)
+                raise PipelineStoppedException('ocr result queue stopped')
+
+            started = time.monotonic()
+            try:
+                result = self.result_queue.get(timeout=self.poll_interval_seconds)
+            except queue.Empty:
+                continue
+            finally:
+                self.result_stall_seconds += time.monotonic() - started
+
+            if isinstance(result, dict):
+                finished_workers += 1
+                self.__add_worker_statistics(result)
+                continue
+
+            frame_index, image_key, slot, recognition_data, error = result
+            with self.__counters_lock:
+                self.recognized_count += 1
+
+            if slot is not None:
+                self.__release_shared_slot(*slot)
+
+            if error is not None:
+                raise OcrWorkerException(f'frame {frame_index} recognition failed - {error}')
+
+            yield frame_index, image_key, recognition_data
+
+    def __add_worker_statistics(self, worker_statistics: dict):
+        for name, counters in worker_statistics.items():
+            total_counters = self.worker_statistics.setdefault(name, {})
+            for counter, value in counters.items():
+                total_counters[counter] = total_counters.get(counter, 0) + value
+
+    def statistics(self) -> dict:
+        return {
+            'items': self.submitted_count,
+            'capacity': self.max_images_in_flight,
+            'workers': self.processes_count,
+            'max_depth': self.max_depth,
+            'cancelled': self.cancelled_count,
+            'shared_memory_reallocations': self.shared_memory_reallocations_count,
+            'pickled_images': self.pickled_images_count,
+            'put_stall_seconds': round(self.submit_stall_seconds, 3),
+            'get_stall_seconds': round(self.result_stall_seconds, 3),
+        }
+
+    def close(self):
+        for process in self.processes:
+            process.join()
+
+        self.processes = []
+        self.__close_shared_frame_ring()
+
+    def cancel(self):
+        """
+        Drops the queued images and stops the workers without waiting for the images they recognize.
+        Nothing may be submitted any more.
+        """
+        # Queued tasks are read back here: the queue thread must not be left writing them to a pipe nobody reads
+        while True:
+            try:
+                self.task_queue.get(timeout=self.poll_interval_seconds)
+            except queue.Empty:
+                break
+
+        with self.__counters_lock:
+            self.cancelled_count = self.submitted_count - self.recognized_count
+        self.terminate()
+
+    def terminate(self):
+        for process in self.processes:
+            process.terminate()
+
+        for process in self.processes:
+            process.join()
+
+        self.processes = []
+        self.__close_shared_frame_ring()
+
+    def __close_shared_frame_ring(self):
+        if self.shared_frame_ring is not None:
+            self.shared_frame_ring.close()
+            self.shared_frame_ring = None
+
+        for shared_frame_ring in self.__retired_shared_frame_rings.values():
+            shared_frame_ring.close()
+        self.__retired_shared_frame_rings = {}
@@ -0,0 +1,95 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+OCR batching
+
+Fixed costs of an OCR call (the tesseract process for pytesseract, page layout setup,
+a round trip to the OCR server) dominate for small crops and low-resolution frames.
+Several images are stacked into one canvas, one under another, with white margins
+between them, so lines of different images are not joined.
+Words recognized on the canvas are given back to the image their box center is in,
+with coordinates of that image.
+"""
+import cv2
+import numpy
+
+from service.conqueror.core.recognition_data import select
+
+
+def group_images(images: [numpy.ndarray], max_canvas_pixels: int, margin=16) -> [[int]]:
+    """
+    Splits image indexes into groups that fit one canvas each, in the original order
+    """
+    groups = []
+    canvas_width = canvas_height = 0
+    for image_index, image in enumerate(images):
+        height, width = image.shape[:2]
+        band_width = max(canvas_width, width + 2 * margin)
+        band_height = canvas_height + height + 2 * margin
+
+        # Images with different channels can't share a canvas
+        if not groups or band_width * band_height > max_canvas_pixels \
+                or image.shape[2:] != images[groups[-1][0]].shape[2:]:
+            groups.append([image_index])
+            canvas_width, canvas_height = width + 2 * margin, height + 2 * margin
+        else:
+            groups[-1].append(image_index)
+            canvas_width, canvas_height = band_width, band_height
+
+    return groups
+
+
+def stitch_images(images: [numpy.ndarray], margin=16) -> (numpy.ndarray, [(int, int, int, int)]):
+    """
+    Returns the canvas and placements (x, y, width, height) of the images on it
+    """
+    canvas_width = max(image.shape[1] for image in images) + 2 * margin
+    canvas_height = sum(image.shape[0] + 2 * margin for image in images)
+    canvas = numpy.empty((canvas_height, canvas_width) + images[0].shape[2:], dtype=images[0].dtype)
+
+    placements = []
+    band_top = 0
+    for image in images:
+        height, width = image.shape[:2]
+        canvas[band_top:band_top + height + 2 * margin] = 255
+        canvas[band_top + margin:band_top + margin + height, margin:margin + width] = _on_white_background(image)
+        placements.append((margin, band_top + margin, width, height))
+        band_top += height + 2 * margin
+
+    return canvas, placements
+
+
+def split_recognition_data(recognition_data: dict, placements: [(int, int, int, int)], margin=16) -> [dict]:
+    """
+    Recognition data of every placed image, boxes are moved to the image coordinates
+    """
+    center_y = recognition_data['top'] + recognition_data['height'] // 2
+    # Bands follow each other, a band ends a margin below its image
+    band_bottoms = [y + height + margin for _, y, _, height in placements]
+    word_images = numpy.minimum(numpy.searchsorted(band_bottoms, center_y, side='right'), len(placements) - 1)
+
+    images_recognition_data = []
+    for image_index, (x, y, width, height) in enumerate(placements):
+        image_recognition_data = select(recognition_data, word_images == image_index)
+        image_recognition_data['left'] = numpy.clip(image_recognition_data['left'] - x, 0, width).astype(numpy.int32)
+        image_recognition_data['top'] = numpy.clip(image_recognition_data['top'] - y, 0, height).astype(numpy.int32)
+        images_recognition_data.append(image_recognition_data)
+
+    return images_recognition_data
+
+
+def _on_white_background(image: numpy.ndarray) -> numpy.ndarray:
+    """
+    Tesseract binarizes the whole canvas with one threshold and takes dark bands between light ones
+    for pictures, so every image is brought to dark text on a white background
+    """
+    border = numpy.concatenate([image[0], image[-1], image[:, 0], image[:, -1]])
+    background_color = float(numpy.median(border))
+    if background_color < 128:
+        image = 255 - image
+        background_color = 255 - background_color
+    if background_color < 255:
+        image = cv2.convertScaleAbs(image, alpha=255 / max(1.0, background_color))
+    return image
@@ -0,0 +1,153 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+OCR engine backends
+
+pytesseract - a tesseract process per image: the image is written to a temporary file,
+              the model is loaded and the TSV result is read back from disk every time
+tesserocr   - libtesseract in the worker process: the model is loaded once
+              and numpy images are passed to it as raw buffers
+server      - client of the local OCR server (ocr_server.py) that all jobs of the host share,
+              the default engine in the worker is used if the server is not reachable
+              and for an image that the server couldn't recognize in time
+
+pytesseract is the default: tesserocr is used only when it is set, until ocr_benchmark.py
+has measured both engines on the same machine.
+
+All of them return columnar recognition data (recognition_data.py) with the pytesseract image_to_data keys
+and take an optional tesseract page segmentation mode (--psm), the automatic one by default.
+"""
+import os
+from multiprocessing.connection import Client
+
+import numpy
+from pytesseract import pytesseract
+
+from service.conqueror.core.recognition_data import parse_tsv
+
+# Answer of the OCR server to a request its engine didn't recognize in time (it may have crashed with it)
+ENGINE_TIMEOUT_ERROR = 'no answer from the OCR engine'
+
+
+class OcrEngines:
+    PYTESSERACT = 'pytesseract'
+    TESSEROCR = 'tesserocr'
+    SERVER = 'server'
+
+    ALL = [PYTESSERACT, TESSEROCR, SERVER]
+
+
+DEFAULT_OCR_ENGINE = OcrEngines.PYTESSERACT
+
+
+class PageSegmentationModes:
+    AUTO = 3
+    SINGLE_LINE = 7
+
+
+class OcrServerException(Exception):
+    pass
+
+
+class PytesseractEngine:
+    name = OcrEngines.PYTESSERACT
+
+    def image_to_data(self, image: numpy.ndarray, page_segmentation_mode: int = None) -> dict:
+        config = ' SET OMP_THREAD_LIMIT=1 '
+        if page_segmentation_mode is not None:
+            config += f'--psm {page_segmentation_mode} '
+        return parse_tsv(pytesseract.image_to_data(image, config=config, output_type='string'))
+
+    def close(self):
+        pass
+
+
+class TesserocrEngine:
+    name = OcrEngines.TESSEROCR
+
+    def __init__(self, language='eng'):
+        # Imported here: the worker sets OMP_THREAD_LIMIT before libtesseract is loaded
+        import tesserocr
+
+        self.__api = tesserocr.PyTessBaseAPI(lang=language)
+
+    def image_to_data(self, image: numpy.ndarray, page_segmentation_mode: int = None) -> dict:
+        height, width = image.shape[:2]
+        # Channels are passed in the array order, as pytesseract does through PIL
+        channels = image.shape[2] if image.ndim == 3 else 1
+
+        self.__api.SetPageSegMode(PageSegmentationModes.AUTO if page_segmentation_mode is None
+                                  else page_segmentation_mode)
+        # Raw pixels in memory, no image encoding and no temporary files
+        self.__api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+        return parse_tsv(self.__api.GetTSVText(0))
+
+    def close(self):
+        self.__api.End()
+
+
+class OcrServerEngine:
+    name = OcrEngines.SERVER
+
+    def __init__(self, socket_path: str, job_id=None, request_timeout_seconds=120):
+        # Set by the caller per job, without it the workers of one process share a queue
+        self.job_id = job_id if job_id is not None else os.getppid()
+        self.request_timeout_seconds = request_timeout_seconds
+        self.__connection = Client(socket_path, family='AF_UNIX')
+        self.__is_connection_lost = False
+        self.__local_engine = None
+
+    def image_to_data(self, image: numpy.ndarray, page_segmentation_mode: int = None) -> dict:
+        if not self.__is_connection_lost:
+            try:
+                self.__connection.send((self.job_id, image, page_segmentation_mode))
+                if not self.__connection.poll(self.request_timeout_seconds):
+                    raise TimeoutError('no answer from the OCR server')
+                recognition_data, error = self.__connection.recv()
+            except (EOFError, OSError) as e:
+                print(f'OCR server connection lost, recognizing locally: {e}')
+                self.__is_connection_lost = True
+            else:
+                if error is None:
+                    return recognition_data
+                if error != ENGINE_TIMEOUT_ERROR:
+                    raise OcrServerException(error)
+                # The server restarts its engine, only this image is recognized here
+                print(f'OCR server: {error}, recognizing the image locally')
+
+        if self.__local_engine is None:
+            self.__local_engine = create_ocr_engine(DEFAULT_OCR_ENGINE)
+        return self.__local_engine.image_to_data(image, page_segmentation_mode)
+
+    def close(self):
+        self.__connection.close()
+        if self.__local_engine is not None:
+            self.__local_engine.close()
+
+
+def create_ocr_engine(name: str, server_socket: str = None, job_id=None):
+    """
+    Falls back to the default local engine if the server is not reachable,
+    and to pytesseract if tesserocr can't be started (it is not installed)
+    """
+    if name not in OcrEngines.ALL:
+        raise ValueError(f'unknown ocr engine {name}')
+
+    if name == OcrEngines.SERVER:
+        try:
+            if not server_socket:
+                raise OSError('the socket path is not set')
+            return OcrServerEngine(server_socket, job_id)
+        except OSError as e:
+            print(f'OCR server {server_socket} is not available, recognizing locally: {e}')
+            name = DEFAULT_OCR_ENGINE
+
+    if name == OcrEngines.TESSEROCR:
+        try:
+            return TesserocrEngine()
+        except (ImportError, RuntimeError) as e:
+            print(f'tesserocr is not available, pytesseract is used instead: {e}')
+
+    return PytesseractEngine()
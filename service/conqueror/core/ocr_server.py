@@ -0,0 +1,246 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Local OCR server
+
+One server per host holds a fixed pool of warm OCR engine processes shared by every job
+(celery tasks, aiohttp requests), so engines are not loaded per job and the cores are not
+oversubscribed by several jobs at once. Clients (OcrServerEngine) connect through a Unix
+domain socket and send one image (and its page segmentation mode) per request.
+
+Requests wait in per-job queues and are taken round-robin between jobs, so a long video
+doesn't hold back the others. They are put on the engine queue in groups of up to batch_size,
+one queue message per group. This is queue grouping, not OCR batching: an engine recognizes
+the images of a group one after another, and as every client connection has one request in flight,
+a group holds images of different clients.
+
+An engine process that dies is started again. Its group is lost: a request without an answer
+after reply_timeout_seconds gets ENGINE_TIMEOUT_ERROR, the client recognizes that image itself.
+
+Run with: python -m service.conqueror.core.ocr_server --socket <path> --engines <count>
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+from billiard.context import Process as LinuxProcess
+from billiard import Queue as LinuxQueue
+from collections import OrderedDict, deque
+from multiprocessing import Process as WindowsProcess
+from multiprocessing import Queue as WindowsQueue
+from multiprocessing.connection import Listener
+
+from service.conqueror.core.ocr_engines import DEFAULT_OCR_ENGINE, ENGINE_TIMEOUT_ERROR, OcrEngines, create_ocr_engine
+
+
+def _engine_loop(ocr_engine_name: str, task_queue, result_queue):
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    ocr_engine = create_ocr_engine(ocr_engine_name)
+    while True:
+        batch = task_queue.get()
+        if batch is None:
+            ocr_engine.close()
+            break
+
+        results = []
+        for request_id, image, page_segmentation_mode in batch:
+            try:
+                results.append((request_id, ocr_engine.image_to_data(image, page_segmentation_mode), None))
+            except Exception as e:
+                results.append((request_id, None, f'{type(e).__name__}: {e}'))
+        result_queue.put(results)
+
+
+class FairRequestQueue:
+    """
+    Requests of every job wait in their own queue, jobs take turns
+    """
+
+    def __init__(self):
+        self.__condition = threading.Condition()
+        self.__jobs = OrderedDict()
+
+    def put(self, job_id, request):
+        with self.__condition:
+            self.__jobs.setdefault(job_id, deque()).append(request)
+            self.__condition.notify()
+
+    def get_batch(self, batch_size: int, timeout=None) -> list:
+        """
+        Waits for the first request, then takes up to batch_size requests, one job after another
+        """
+        with self.__condition:
+            if not self.__jobs and not self.__condition.wait(timeout):
+                return []
+
+            batch = []
+            while self.__jobs and len(batch) < batch_size:
+                job_id, requests = next(iter(self.__jobs.items()))
+                batch.append(requests.popleft())
+                # The job goes to the end of the line
+                del self.__jobs[job_id]
+                if requests:
+                    self.__jobs[job_id] = requests
+            return batch
+
+
+class OcrServer:
+    poll_interval_seconds = 0.5
+
+    def __init__(self, socket_path: str, engines_count: int, ocr_engine=DEFAULT_OCR_ENGINE, batch_size=4,
+                 reply_timeout_seconds=100):
+        self.socket_path = socket_path
+        self.engines_count = max(1, engines_count)
+        self.ocr_engine = ocr_engine
+        self.batch_size = max(1, batch_size)
+        # Shorter than the request timeout of the client, so it gets the error instead of dropping the connection
+        self.reply_timeout_seconds = reply_timeout_seconds
+
+        self.requests = FairRequestQueue()
+        self.stop_event = threading.Event()
+
+        self.__is_windows = sys.platform.startswith('win32')
+        Queue = WindowsQueue if self.__is_windows else LinuxQueue
+        # Groups are handed out only when an engine can start them, the fair queue decides the order
+        self.task_queue = Queue(self.engines_count)
+        self.result_queue = Queue()
+        self.processes = []
+        self.__processes_lock = threading.Lock()
+        self.restarted_engines_count = 0
+        self.timed_out_requests_count = 0
+
+        self.__request_ids = itertools.count()
+        self.__replies_lock = threading.Lock()
+        self.__replies = {}
+
+    def start_engines(self):
+        with self.__processes_lock:
+            self.processes = [self.__start_engine() for _ in range(self.engines_count)]
+
+        threads = [threading.Thread(target=self.__dispatch, daemon=True),
+                   threading.Thread(target=self.__route_results, daemon=True),
+                   threading.Thread(target=self.__supervise_engines, daemon=True)]
+        for thread in threads:
+            thread.start()
+
+    def __start_engine(self):
+        Process = WindowsProcess if self.__is_windows else LinuxProcess
+        process = Process(target=_engine_loop, args=(self.ocr_engine, self.task_queue, self.result_queue))
+        process.daemon = True
+        process.start()
+        return process
+
+    def __supervise_engines(self):
+        while not self.stop_event.wait(self.poll_interval_seconds):
+            with self.__processes_lock:
+                if self.stop_event.is_set():
+                    break
+                for engine_index, process in enumerate(self.processes):
+                    if process.is_alive():
+                        continue
+                    process.join()
+                    self.restarted_engines_count += 1
+                    print(f'OCR engine {engine_index} exited with code {process.exitcode}, starting it again '
+                          f'({self.restarted_engines_count} restarts)')
+                    self.processes[engine_index] = self.__start_engine()
+
+    def serve_forever(self):
+        self.start_engines()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        print(f'OCR server listens on {self.socket_path} with {self.engines_count} {self.ocr_engine} engines')
+        try:
+            with Listener(self.socket_path, family='AF_UNIX') as listener:
+                os.chmod(self.socket_path, 0o777)
+                while not self.stop_event.is_set():
+                    connection = listener.accept()
+                    threading.Thread(target=self.__serve_client, args=(connection,), daemon=True).start()
+        finally:
+            self.stop()
+
+    def stop(self):
+        self.stop_event.set()
+        # Clients that wait for an answer fall back to local recognition
+        with self.__processes_lock:
+            for process in self.processes:
+                process.terminate()
+            for process in self.processes:
+                process.join()
+            self.processes = []
+
+    def __serve_client(self, connection):
+        reply_box = queue.Queue(1)
+        try:
+            while True:
+                job_id, image, page_segmentation_mode = connection.recv()
+
+                request_id = next(self.__request_ids)
+                with self.__replies_lock:
+                    self.__replies[request_id] = reply_box
+                self.requests.put(job_id, (request_id, image, page_segmentation_mode))
+
+                connection.send(self.__wait_reply(request_id, reply_box))
+        except (EOFError, OSError):
+            pass  # The job finished or its worker was killed
+        finally:
+            connection.close()
+
+    def __wait_reply(self, request_id: int, reply_box: queue.Queue) -> tuple:
+        try:
+            return reply_box.get(timeout=self.reply_timeout_seconds)
+        except queue.Empty:
+            pass
+
+        with self.__replies_lock:
+            is_pending = self.__replies.pop(request_id, None) is not None
+        if not is_pending:
+            # The result came right after the timeout
+            return reply_box.get()
+
+        # The engine with the request died or the queue is too long
+        self.timed_out_requests_count += 1
+        return None, ENGINE_TIMEOUT_ERROR
+
+    def __dispatch(self):
+        while not self.stop_event.is_set():
+            batch = self.requests.get_batch(self.batch_size, timeout=self.poll_interval_seconds)
+            if batch:
+                self.task_queue.put(batch)
+
+    def __route_results(self):
+        while not self.stop_event.is_set():
+            try:
+                results = self.result_queue.get(timeout=self.poll_interval_seconds)
+            except queue.Empty:
+                continue
+
+            for request_id, recognition_data, error in results:
+                with self.__replies_lock:
+                    reply_box = self.__replies.pop(request_id, None)
+                # None if the client got ENGINE_TIMEOUT_ERROR already
+                if reply_box is not None:
+                    reply_box.put((recognition_data, error))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="local OCR server")
+    parser.add_argument('--socket', required=True)
+    parser.add_argument('--engines', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--engine', default=DEFAULT_OCR_ENGINE, choices=[OcrEngines.PYTESSERACT,
+                                                                         OcrEngines.TESSEROCR])
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--reply-timeout', type=float, default=100)
+    args = parser.parse_args()
+
+    # supervisor stops the server with SIGTERM, engines are stopped on exit
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    OcrServer(args.socket, args.engines, ocr_engine=args.engine, batch_size=args.batch_size,
+              reply_timeout_seconds=args.reply_timeout).serve_forever()
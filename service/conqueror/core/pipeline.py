@@ -0,0 +1,184 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Building blocks of the staged keyframe processing pipeline:
+bounded queues with backpressure and stage threads that keep
+track of how long they were stalled on their neighbours,
+the time budget of the pipeline and the progress of frames through it.
+"""
+import queue
+import threading
+import time
+
+
+class PipelineStoppedException(Exception):
+    pass
+
+
+class StageQueue:
+    """
+    Bounded queue between two pipeline stages.
+
+    put_stall_seconds grows while the producer waits for free space (downstream is the bottleneck),
+    get_stall_seconds grows while the consumer waits for items (upstream is the bottleneck).
+    """
+    poll_interval_seconds = 0.1
+
+    def __init__(self, name: str, maxsize: int, stop_event: threading.Event):
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self.stop_event = stop_event
+        self.__queue = queue.Queue(self.maxsize)
+
+        self.items_count = 0
+        self.max_depth = 0
+        self.__depth_sum = 0
+        self.put_stall_seconds = 0.0
+        self.get_stall_seconds = 0.0
+
+    def put(self, item):
+        depth = self.__queue.qsize()
+        self.__depth_sum += depth
+        self.max_depth = max(self.max_depth, depth)
+        self.items_count += 1
+
+        started = time.monotonic()
+        try:
+            while True:
+                if self.stop_event.is_set():
+                    raise PipelineStoppedException(f'{self.name} queue stopped')
+                try:
+                    self.__queue.put(item, timeout=self.poll_interval_seconds)
+                    return
+                except queue.Full:
+                    continue
+        finally:
+            self.put_stall_seconds += time.monotonic() - started
+
+    def get(self):
+        started = time.monotonic()
+        try:
+            while True:
+                if self.stop_event.is_set():
+                    raise PipelineStoppedException(f'{self.name} queue stopped')
+                try:
+                    return self.__queue.get(timeout=self.poll_interval_seconds)
+                except queue.Empty:
+                    continue
+        finally:
+            self.get_stall_seconds += time.monotonic() - started
+
+    def statistics(self) -> dict:
+        return {
+            'items': self.items_count,
+            'capacity': self.maxsize,
+            'max_depth': self.max_depth,
+            'average_depth': round(self.__depth_sum / self.items_count, 2) if self.items_count else 0,
+            'put_stall_seconds': round(self.put_stall_seconds, 3),
+            'get_stall_seconds': round(self.get_stall_seconds, 3),
+        }
+
+
+class PipelineStage(threading.Thread):
+    """
+    Thread that runs one pipeline stage. Any exception stops the whole pipeline
+    and is re-raised from the orchestrating thread by raise_if_failed().
+    """
+
+    def __init__(self, name: str, target, stop_event: threading.Event, args=()):
+        super().__init__(name=name, daemon=True)
+        self.__target = target
+        self.__args = args
+        self.stop_event = stop_event
+        self.exception = None
+
+    def run(self):
+        try:
+            self.__target(*self.__args)
+        except PipelineStoppedException:
+            pass
+        except BaseException as e:
+            self.exception = e
+            self.stop_event.set()
+
+    def raise_if_failed(self):
+        if self.exception is not None:
+            raise self.exception
+
+
+class PipelineDeadline:
+    """
+    Stops the pipeline when its time budget is spent, stages stop as if the pipeline failed,
+    but the results matched so far are kept
+    """
+
+    def __init__(self, seconds: float, stop_event: threading.Event):
+        self.seconds = seconds
+        self.stop_event = stop_event
+        self.is_reached = False
+        self.__timer = None
+
+    def start(self):
+        if self.seconds > 0:
+            self.__timer = threading.Timer(self.seconds, self.__reach)
+            self.__timer.daemon = True
+            self.__timer.start()
+
+    def __reach(self):
+        self.is_reached = True
+        self.stop_event.set()
+
+    def cancel(self):
+        if self.__timer is not None:
+            self.__timer.cancel()
+
+    def statistics(self) -> dict:
+        return {
+            'seconds': self.seconds,
+            'reached': self.is_reached,
+        }
+
+
+class FrameProgress:
+    """
+    Counts frames from the start of the video whose every submitted image was matched.
+    Frames are recognized in parallel and results come in completion order,
+    a frame is processed when it and all frames before it are.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__pending_tasks = {}
+        self.__submitted_frames = set()
+        self.processed_frames_count = 0
+
+    def add_task(self, frame_index: int):
+        """
+        Called before an image of the frame is submitted
+        """
+        with self.__lock:
+            self.__pending_tasks[frame_index] = self.__pending_tasks.get(frame_index, 0) + 1
+
+    def frame_submitted(self, frame_index: int):
+        """
+        Every image of the frame is submitted, a frame can have none
+        """
+        with self.__lock:
+            self.__pending_tasks.setdefault(frame_index, 0)
+            self.__submitted_frames.add(frame_index)
+            self.__advance()
+
+    def task_done(self, frame_index: int):
+        with self.__lock:
+            self.__pending_tasks[frame_index] -= 1
+            self.__advance()
+
+    def __advance(self):
+        frame_index = self.processed_frames_count
+        while frame_index in self.__submitted_frames and not self.__pending_tasks[frame_index]:
+            self.__submitted_frames.remove(frame_index)
+            del self.__pending_tasks[frame_index]
+            frame_index += 1
+        self.processed_frames_count = frame_index
@@ -0,0 +1,102 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Columnar recognition data
+
+Recognition data is a dict with the pytesseract image_to_data keys, every value is a numpy array
+with one item per TSV row: int32 boxes and numbers, float32 confidences and an object array of texts.
+The TSV is parsed into the columns at once instead of a Python list per key and an int() per value,
+and filtering by confidence and position and grouping words into blocks are array operations.
+"""
+import numpy
+
+NUMBER_KEYS = ['level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num', 'left', 'top', 'width', 'height']
+KEYS = NUMBER_KEYS + ['conf', 'text']
+
+
+def empty_recognition_data(keys=KEYS) -> dict:
+    return {key: _as_column(key, []) for key in keys}
+
+
+def from_dict(recognition_data: dict) -> dict:
+    """
+    Columns of recognition data given as lists (the pytesseract dict format)
+    """
+    return {key: _as_column(key, values) for key, values in recognition_data.items()}
+
+
+def parse_tsv(tsv: str) -> dict:
+    """
+    Recognition data of tesseract TSV output, with or without the header row
+    """
+    rows = [row for row in tsv.split('\n') if row]
+    if rows and rows[0].startswith('level'):
+        rows = rows[1:]
+    if not rows:
+        return empty_recognition_data()
+
+    cells = '\t'.join(rows).split('\t')
+    if len(cells) != len(rows) * len(KEYS):
+        # A row without the text cell
+        cells = [cell for row in rows for cell in (row.split('\t') + [''])[:len(KEYS)]]
+    table = numpy.array(cells, dtype=object).reshape(len(rows), len(KEYS))
+
+    numbers = table[:, :len(NUMBER_KEYS) + 1].astype(numpy.float64)
+    recognition_data = {key: numbers[:, column].astype(numpy.int32) for column, key in enumerate(NUMBER_KEYS)}
+    recognition_data['conf'] = numbers[:, len(NUMBER_KEYS)].astype(numpy.float32)
+    recognition_data['text'] = table[:, len(NUMBER_KEYS) + 1].copy()
+    return recognition_data
+
+
+def select(recognition_data: dict, words) -> dict:
+    """
+    Words by a boolean mask or indexes
+    """
+    return {key: values[words] for key, values in recognition_data.items()}
+
+
+def concatenate(recognition_data_list: [dict], keys=None) -> dict:
+    """
+    Words of all recognition data one after another, only the given keys if set
+    """
+    keys = keys or list(recognition_data_list[0].keys())
+    return {key: numpy.concatenate([recognition_data[key] for recognition_data in recognition_data_list])
+            for key in keys}
+
+
+def first_occurrence_ranks(values: numpy.ndarray) -> numpy.ndarray:
+    """
+    Rank of every value by its first occurrence: [7, 3, 7, 5] -> [0, 1, 0, 2]
+    """
+    _, first_indexes, inverse = numpy.unique(values, return_index=True, return_inverse=True)
+    ranks = numpy.empty(len(first_indexes), numpy.int64)
+    ranks[numpy.argsort(first_indexes, kind='stable')] = numpy.arange(len(first_indexes))
+    return ranks[inverse.reshape(-1)]
+
+
+def join_blocks(block_nums: numpy.ndarray, texts: numpy.ndarray) -> [str]:
+    """
+    Texts of the words of every block joined by spaces, blocks in the order of their first word
+    """
+    if not len(texts):
+        return []
+
+    ranks = first_occurrence_ranks(block_nums)
+    # Words of a block stay in their order
+    order = numpy.argsort(ranks, kind='stable')
+    block_ends = numpy.flatnonzero(numpy.diff(ranks[order], append=ranks.max() + 1)) + 1
+    block_starts = numpy.concatenate(([0], block_ends[:-1]))
+    texts = texts[order].tolist()
+    return [' '.join(texts[start:end]) for start, end in zip(block_starts, block_ends)]
+
+
+def _as_column(key: str, values) -> numpy.ndarray:
+    if key == 'text':
+        column = numpy.empty(len(values), dtype=object)
+        column[:] = list(values)
+        return column
+    if key == 'conf':
+        return numpy.asarray(values, dtype=numpy.float32)
+    return numpy.asarray(values, dtype=numpy.int32)
@@ -0,0 +1,295 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Compiled rule matching
+
+A rule matches a text block if the text contains it or if fuzz.partial_ratio of the two
+reaches the similarity. Jobs come with hundreds of rules and checking every rule against every
+block costs a fuzzy comparison each. The rules of a kind are compiled once per job:
+- an Aho-Corasick automaton of the lowercased rules finds all contained ones in one pass over the block,
+- counts of the rule characters give an upper bound of partial_ratio for all rules at once.
+partial_ratio compares the shorter string (m characters) with windows of the longer one and
+gives 2M / (m + w) for M matching characters in a window of w <= m characters. M <= w and M <= C,
+the size of the common multiset of characters, so the ratio is at most 2C / (m + C).
+C of the whole block is checked for all rules at once, C of the best window of the block is checked
+for the rules left. Only rules that may reach the similarity by both bounds are compared by
+fuzz.partial_ratio, so the results are the same as of comparing every rule.
+
+The same blocks (headers, banners, menus) come word for word on many frames. Their match
+results are kept in an LRU cache: a block that was checked can't match any rule that is still
+pending, the rules it matched are resolved already.
+"""
+from collections import OrderedDict, deque
+
+import numpy
+from fuzzywuzzy import fuzz
+
+
+class AhoCorasickAutomaton:
+
+    def __init__(self, patterns: [str]):
+        self.__transitions = [{}]
+        self.__outputs = [[]]
+
+        for pattern_index, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for character in pattern:
+                if character not in self.__transitions[state]:
+                    self.__transitions.append({})
+                    self.__outputs.append([])
+                    self.__transitions[state][character] = len(self.__transitions) - 1
+                state = self.__transitions[state][character]
+            self.__outputs[state].append(pattern_index)
+
+        # Failure links are built breadth first, the link of a state is shorter than the state
+        self.__failures = [0] * len(self.__transitions)
+        states = deque(self.__transitions[0].values())
+        while states:
+            state = states.popleft()
+            for character, next_state in self.__transitions[state].items():
+                states.append(next_state)
+                failure = self.__failures[state]
+                while failure and character not in self.__transitions[failure]:
+                    failure = self.__failures[failure]
+                self.__failures[next_state] = self.__transitions[failure].get(character, 0)
+                self.__outputs[next_state] = self.__outputs[next_state] + self.__outputs[self.__failures[next_state]]
+
+    def find(self, text: str) -> {int}:
+        """
+        Indexes of the patterns that text contains
+        """
+        transitions, failures, outputs = self.__transitions, self.__failures, self.__outputs
+        found = set()
+        state = 0
+        for character in text:
+            while state and character not in transitions[state]:
+                state = failures[state]
+            state = transitions[state].get(character, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+
+class RuleMatcher:
+
+    def __init__(self, rules: [str], similarity: int, case_sensitive=False, resolve_matched=True):
+        self.rules = list(rules)
+        self.similarity = similarity
+        # The containment check of text rules is case sensitive, of URL rules and key phrases is not
+        self.case_sensitive = case_sensitive
+        # A found URL or text rule is not checked again, key phrases are checked on every block
+        self.resolve_matched = resolve_matched
+
+        self.pending = numpy.ones(len(self.rules), bool)
+        self.__lengths = numpy.array([len(rule) for rule in self.rules], numpy.int64)
+        self.__automaton = AhoCorasickAutomaton([rule.lower() for rule in self.rules])
+        # An empty rule is contained in any text
+        self.__empty_rules = set(numpy.flatnonzero(self.__lengths == 0).tolist())
+
+        # fuzz.partial_ratio is case sensitive, characters are counted as they are
+        ratio = (similarity - 0.5) / 100  # partial_ratio is rounded to an integer
+        self.__gram_counts = [RuleGramCounts(self.rules, 1, lambda length: ratio * length / (2 - ratio))]
+        if ratio > 2 / 3:
+            # Bigrams are a stronger bound for longer rules, a weaker similarity keeps too few of them
+            self.__gram_counts.append(RuleGramCounts(
+                self.rules, 2, lambda length: (1.5 * ratio - 1) * 2 * length / (2 - ratio) - 1))
+
+        self.blocks_count = 0
+        self.contained_count = 0
+        self.compared_count = 0
+        self.matched_count = 0
+
+    def match(self, text: str, first_only=False) -> [str]:
+        """
+        Pending rules that match the text, only the first found one if first_only
+        """
+        self.blocks_count += 1
+        candidates = self.pending & (self.__lengths <= len(text) + 5)
+        if not candidates.any():
+            return []
+
+        matched = []
+        for rule_index in sorted(self.__automaton.find(text.lower()) | self.__empty_rules):
+            if candidates[rule_index] and (not self.case_sensitive or self.rules[rule_index] in text):
+                candidates[rule_index] = False
+                matched.append(rule_index)
+                self.contained_count += 1
+                if first_only:
+                    return self.__resolve(matched)
+
+        rule_indexes = numpy.flatnonzero(candidates)
+        text_grams = [gram_counts.text_grams(text) for gram_counts in self.__gram_counts]
+        for gram_counts, grams in zip(self.__gram_counts, text_grams):
+            rule_indexes = rule_indexes[gram_counts.may_be_similar(grams, rule_indexes, len(text))]
+
+        for gram_counts, grams in zip(self.__gram_counts, text_grams):
+            if len(rule_indexes):
+                rule_indexes = rule_indexes[gram_counts.windows_may_be_similar(grams, rule_indexes, len(text))]
+
+        for rule_index in rule_indexes:
+            self.compared_count += 1
+            if fuzz.partial_ratio(self.rules[rule_index], text) >= self.similarity:
+                matched.append(rule_index)
+                if first_only:
+                    break
+
+        return self.__resolve(matched)
+
+    def __resolve(self, matched: [int]) -> [str]:
+        self.matched_count += len(matched)
+        if self.resolve_matched:
+            self.pending[matched] = False
+        return [self.rules[rule_index] for rule_index in matched]
+
+    def statistics(self) -> dict:
+        return {
+            'rules': len(self.rules),
+            'blocks': self.blocks_count,
+            'contained': self.contained_count,
+            'compared': self.compared_count,
+            'matched': self.matched_count,
+        }
+
+
+class RuleGramCounts:
+    """
+    Counts of the q-grams (substrings of q characters) of every rule and the bound of partial_ratio by them
+    """
+
+    def __init__(self, rules: [str], gram_length: int, min_common_grams):
+        self.gram_length = gram_length
+        # Common grams that a rule of the given length and a block that reaches the similarity have at least
+        self.min_common_grams = min_common_grams
+
+        # Grams of every rule in a row with their counts, as in a CSR sparse matrix
+        self.__vocabulary = {}
+        rule_grams, rule_gram_counts, grams_count = [], [], []
+        for rule in rules:
+            counts = {}
+            for gram in self.__grams(rule):
+                gram_index = self.__vocabulary.setdefault(gram, len(self.__vocabulary))
+                counts[gram_index] = counts.get(gram_index, 0) + 1
+            rule_grams.extend(counts.keys())
+            rule_gram_counts.extend(counts.values())
+            grams_count.append(len(counts))
+        self.__rule_grams = numpy.array(rule_grams, numpy.int64)
+        self.__rule_gram_counts = numpy.array(rule_gram_counts, numpy.int32)
+        self.__rule_grams_start = numpy.concatenate(([0], numpy.cumsum(grams_count))).astype(numpy.int64)
+        self.__lengths = numpy.array([len(rule) for rule in rules], numpy.int64)
+
+    def __grams(self, text: str) -> [str]:
+        return [text[index:index + self.gram_length] for index in range(len(text) - self.gram_length + 1)]
+
+    def text_grams(self, text: str) -> numpy.ndarray:
+        """
+        Vocabulary indexes of the grams of the text, -1 for grams that no rule has
+        """
+        return numpy.array([self.__vocabulary.get(gram, -1) for gram in self.__grams(text)], numpy.int64)
+
+    def __grams_of(self, rule_indexes: numpy.ndarray):
+        """
+        Positions of the grams of the rules one after another and where every rule starts among them
+        """
+        starts = self.__rule_grams_start[rule_indexes]
+        grams_count = self.__rule_grams_start[rule_indexes + 1] - starts
+        segments = numpy.cumsum(grams_count) - grams_count
+        return numpy.repeat(starts - segments, grams_count) + numpy.arange(grams_count.sum()), segments
+
+    def may_be_similar(self, text_grams: numpy.ndarray, rule_indexes: numpy.ndarray, text_length: int) \
+            -> numpy.ndarray:
+        may_be_similar = numpy.ones(len(rule_indexes), bool)
+        # A rule shorter than a gram has no grams, its bound is not positive
+        positions = numpy.flatnonzero(self.__lengths[rule_indexes] >= self.gram_length)
+        if not len(positions):
+            return may_be_similar
+
+        grams, segments = self.__grams_of(rule_indexes[positions])
+        text_counts = numpy.bincount(text_grams[text_grams >= 0], minlength=len(self.__vocabulary))
+        common_grams = numpy.add.reduceat(
+            numpy.minimum(self.__rule_gram_counts[grams], text_counts[self.__rule_grams[grams]]), segments)
+        shorter_lengths = numpy.minimum(self.__lengths[rule_indexes[positions]], text_length)
+        may_be_similar[positions] = common_grams >= self.min_common_grams(shorter_lengths) - 1e-9
+        return may_be_similar
+
+    def windows_may_be_similar(self, text_grams: numpy.ndarray, rule_indexes: numpy.ndarray, text_length: int) \
+            -> numpy.ndarray:
+        """
+        The same bound by the grams of the best window of the text of the rule length
+        """
+        may_be_similar = numpy.ones(len(rule_indexes), bool)
+        # A rule longer than the text is the longer string, its windows are compared with the whole text
+        lengths = self.__lengths[rule_indexes]
+        positions = numpy.flatnonzero((lengths <= text_length) & (lengths >= self.gram_length))
+        if not len(positions):
+            return may_be_similar
+        positions = positions[numpy.argsort(lengths[positions], kind='stable')]
+        lengths = lengths[positions]
+
+        grams, segments = self.__grams_of(rule_indexes[positions])
+        columns, rule_columns = numpy.unique(self.__rule_grams[grams], return_inverse=True)
+
+        # Counts of every rule gram in the first i grams of the text for every i
+        text_columns = numpy.searchsorted(columns, text_grams)
+        is_rule_gram = numpy.flatnonzero(columns[numpy.minimum(text_columns, len(columns) - 1)] == text_grams)
+        prefix_counts = numpy.zeros((len(columns), len(text_grams) + 1), numpy.int32)
+        prefix_counts[text_columns[is_rule_gram], is_rule_gram + 1] = 1
+        numpy.cumsum(prefix_counts, axis=1, out=prefix_counts)
+
+        # Rules of the same length share the windows
+        group_starts = numpy.flatnonzero(numpy.diff(lengths, prepend=-1))
+        group_ends = numpy.append(segments[group_starts[1:]], len(grams))
+        for group_index, first in enumerate(group_starts):
+            last = group_starts[group_index + 1] if group_index + 1 < len(group_starts) else len(positions)
+            window_length = lengths[first] - self.gram_length + 1
+            group_grams = slice(segments[first], group_ends[group_index])
+            group_columns = rule_columns[group_grams]
+
+            window_counts = prefix_counts[group_columns, window_length:] - prefix_counts[group_columns, :-window_length]
+            common_grams = numpy.minimum(window_counts, self.__rule_gram_counts[grams[group_grams], None])
+            best_common_grams = numpy.add.reduceat(common_grams, segments[first:last] - segments[first]).max(axis=1)
+            may_be_similar[positions[first:last]] = best_common_grams >= self.min_common_grams(lengths[first]) - 1e-9
+
+        return may_be_similar
+
+
+class BlockMatchCache:
+    """
+    Match results of the last checked text blocks, the least recently used one is dropped first
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.__results = OrderedDict()
+
+        self.hits_count = 0
+        self.misses_count = 0
+        self.evicted_count = 0
+
+    def get(self, key):
+        result = self.__results.get(key)
+        if result is None:
+            self.misses_count += 1
+            return None
+
+        self.hits_count += 1
+        self.__results.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        self.__results[key] = result
+        if len(self.__results) > self.max_size:
+            self.__results.popitem(last=False)
+            self.evicted_count += 1
+
+    def statistics(self) -> dict:
+        return {
+            'hits': self.hits_count,
+            'misses': self.misses_count,
+            'evicted': self.evicted_count,
+            'hit_ratio': round(self.hits_count / (self.hits_count + self.misses_count), 3)
+            if self.hits_count + self.misses_count else 0,
+        }
@@ -0,0 +1,168 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Frame sampling strategies for the ffmpeg decoder
+
+framerate   - legacy, decodes every frame and blends output frames
+framestep   - every skip_frames-th decoded frame
+select      - every frame at least seconds_between_frames after the previous sample, no blending
+skip_nonref - select, but non-reference frames are not decoded at all, a sample may move to the next decoded frame
+keyframes   - select among keyframes only, valid if keyframes are not rarer than the sample rate
+seek        - one timestamp seek per sample on a seekable temporary file
+
+A job resumed from a checkpoint samples from start_seconds: a pipe can't be seeked, the frames before it
+are decoded, but dropped by the filter before any conversion.
+"""
+
+MATROSKA_MAGIC = b'\x1a\x45\xdf\xa3'
+MATROSKA_CUES_ID = b'\x1c\x53\xbb\x6b'
+
+
+class SamplingStrategies:
+    AUTO = 'auto'
+    FRAMERATE = 'framerate'
+    FRAMESTEP = 'framestep'
+    SELECT = 'select'
+    SKIP_NONREF = 'skip_nonref'
+    KEYFRAMES = 'keyframes'
+    SEEK = 'seek'
+
+    ALL = [FRAMERATE, FRAMESTEP, SELECT, SKIP_NONREF, KEYFRAMES, SEEK]
+
+
+def detect_container(byte_video: bytes) -> str:
+    if byte_video[4:8] == b'ftyp':
+        return 'mp4'
+    if byte_video[:4] == MATROSKA_MAGIC:
+        return 'matroska'
+    return 'unknown'
+
+
+def mp4_top_level_boxes(byte_video: bytes) -> [bytes]:
+    boxes = []
+    offset = 0
+    while offset + 8 <= len(byte_video):
+        size = int.from_bytes(byte_video[offset:offset + 4], 'big')
+        box_type = byte_video[offset + 4:offset + 8]
+        if size == 1:
+            size = int.from_bytes(byte_video[offset + 8:offset + 16], 'big')
+        elif size == 0:
+            size = len(byte_video) - offset
+        if size < 8:
+            break
+        boxes.append(box_type)
+        offset += size
+    return boxes
+
+
+def is_pipe_decodable(byte_video: bytes) -> bool:
+    """
+    mp4 files with the index (moov) after the media data can't be decoded from a pipe
+    """
+    if detect_container(byte_video) != 'mp4':
+        return True
+    boxes = mp4_top_level_boxes(byte_video)
+    return b'moov' in boxes and (b'mdat' not in boxes or boxes.index(b'moov') < boxes.index(b'mdat'))
+
+
+def is_seekable(byte_video: bytes) -> bool:
+    """
+    Whether timestamp seeks are cheap: the container has an index to jump to the nearest keyframe
+    """
+    container = detect_container(byte_video)
+    if container == 'mp4':
+        return b'moov' in mp4_top_level_boxes(byte_video)
+    if container == 'matroska':
+        # MediaRecorder (RecordRTC) webm files have no cues, ffmpeg would have to scan them on each seek
+        return MATROSKA_CUES_ID in byte_video
+    return False
+
+
+class FrameSampler:
+
+    def __init__(self, byte_video: bytes, seconds_between_frames=3.0, skip_frames=65,
+                 fps_instead_skip_frames=True, strategy=SamplingStrategies.AUTO, skip_loop_filter=False,
+                 seek_min_seconds_between_frames=10.0, start_seconds=0.0):
+        self.seconds_between_frames = seconds_between_frames
+        self.skip_frames = skip_frames
+        self.start_seconds = start_seconds
+        self.skip_loop_filter = skip_loop_filter
+        self.strategy = self.__choose_strategy(byte_video, strategy, fps_instead_skip_frames,
+                                               seek_min_seconds_between_frames)
+
+    def __choose_strategy(self, byte_video, strategy, fps_instead_skip_frames, seek_min_seconds_between_frames):
+        if strategy != SamplingStrategies.AUTO:
+            if strategy not in SamplingStrategies.ALL:
+                raise ValueError(f'unknown sampling strategy {strategy}')
+            return strategy
+
+        if not fps_instead_skip_frames:
+            return SamplingStrategies.FRAMESTEP
+
+        if not is_pipe_decodable(byte_video):
+            return SamplingStrategies.SEEK
+
+        # A seek decodes from the previous keyframe, so it only pays off for sparse sampling
+        if self.seconds_between_frames >= seek_min_seconds_between_frames and is_seekable(byte_video):
+            return SamplingStrategies.SEEK
+
+        # Frames that are decoded stay the same, but select takes the first decoded frame past the interval:
+        # a sample may come up to one run of non-reference frames (B-frames) later than with select, and the
+        # next interval counts from it. Samples are still at least seconds_between_frames apart.
+        # VP8/VP9 recordings have no non-reference frames, their samples are the same.
+        return SamplingStrategies.SKIP_NONREF
+
+    @property
+    def is_seeking(self) -> bool:
+        return self.strategy == SamplingStrategies.SEEK
+
+    @property
+    def input_options(self) -> str:
+        options = []
+        if self.strategy == SamplingStrategies.SKIP_NONREF:
+            options.append('-skip_frame noref')
+        elif self.strategy == SamplingStrategies.KEYFRAMES:
+            options.append('-skip_frame nokey')
+
+        if self.skip_loop_filter:
+            # Faster, but can leave blocking artifacts on frames decoded from filtered references
+            options.append('-skip_loop_filter all')
+
+        return ' '.join(options)
+
+    @property
+    def video_filter(self) -> str:
+        if self.start_seconds > 0 and not self.is_seeking:
+            return f"select='gte(t,{self.start_seconds})',{self.__sampling_filter}"
+        return self.__sampling_filter
+
+    @property
+    def __sampling_filter(self) -> str:
+        if self.strategy == SamplingStrategies.FRAMERATE:
+            return f'framerate=fps={1 / self.seconds_between_frames}'
+        if self.strategy == SamplingStrategies.FRAMESTEP:
+            return f'framestep={self.skip_frames}'
+        if self.strategy == SamplingStrategies.SEEK:
+            return 'null'
+
+        return f"select='isnan(prev_selected_t)+gte(t-prev_selected_t,{self.seconds_between_frames})'"
+
+    def seconds_between_samples(self, frame_rate: float) -> float:
+        """
+        Timeline covered by one sampled frame
+        """
+        if self.strategy == SamplingStrategies.FRAMESTEP:
+            return self.skip_frames / frame_rate if frame_rate > 0 else 0.0
+        return self.seconds_between_frames
+
+    @property
+    def needs_frame_rate(self) -> bool:
+        return self.strategy == SamplingStrategies.FRAMESTEP
+
+    def seek_timestamps(self):
+        timestamp = self.start_seconds
+        while True:
+            yield timestamp
+            timestamp += self.seconds_between_frames
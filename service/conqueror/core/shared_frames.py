@@ -0,0 +1,122 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Shared-memory transport of images to OCR workers
+
+The parent writes each image into a free slot of a reusable ring
+and passes only the slot reference through the task queue,
+so images are neither pickled nor copied through pipes.
+An image bigger than the slots gets a new ring of bigger slots, the old one is closed
+once the workers have released all of its slots.
+"""
+import queue
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy
+
+from service.conqueror.core.pipeline import PipelineStoppedException
+
+
+class SharedFrameRing:
+    poll_interval_seconds = 0.1
+
+    def __init__(self, slots_count: int, slot_size: int, stop_event: threading.Event):
+        self.slots_count = slots_count
+        self.slot_size = slot_size
+        self.stop_event = stop_event
+
+        self.__memory = shared_memory.SharedMemory(create=True, size=slots_count * slot_size)
+        self.name = self.__memory.name
+
+        self.__free_slots = queue.Queue()
+        for slot in range(slots_count):
+            self.__free_slots.put(slot)
+
+    def fits(self, image: numpy.ndarray) -> bool:
+        return self.fits_size(image.nbytes)
+
+    def fits_size(self, image_nbytes: int) -> bool:
+        return image_nbytes <= self.slot_size
+
+    def write(self, image: numpy.ndarray) -> tuple:
+        """
+        Copies image into a free slot, blocks while every slot is used by workers
+        """
+        while True:
+            if self.stop_event.is_set():
+                raise PipelineStoppedException('shared frame ring stopped')
+            try:
+                slot = self.__free_slots.get(timeout=self.poll_interval_seconds)
+                break
+            except queue.Empty:
+                continue
+
+        view = numpy.ndarray(image.shape, dtype=image.dtype, buffer=self.__memory.buf,
+                             offset=slot * self.slot_size)
+        view[...] = image
+
+        return SharedFrameReference(self.name, slot, slot * self.slot_size, image.shape, image.dtype.str)
+
+    def release(self, slot: int):
+        self.__free_slots.put(slot)
+
+    @property
+    def is_idle(self) -> bool:
+        """
+        No slot is used by workers
+        """
+        return self.__free_slots.qsize() == self.slots_count
+
+    def close(self):
+        self.__memory.close()
+        self.__memory.unlink()
+
+
+class SharedFrameReference:
+    """
+    What the worker receives instead of the image itself
+    """
+
+    def __init__(self, memory_name: str, slot: int, offset: int, shape: tuple, dtype: str):
+        self.memory_name = memory_name
+        self.slot = slot
+        self.offset = offset
+        self.shape = shape
+        self.dtype = dtype
+
+
+class SharedFrameReader:
+    """
+    Worker side of the ring: attaches to the parent's memory once and returns views on its slots.
+    Attachments of replaced rings are kept until close, a batch may have images of both rings.
+    """
+
+    def __init__(self):
+        self.__memories = {}
+
+    def view(self, reference: SharedFrameReference) -> numpy.ndarray:
+        memory = self.__memories.get(reference.memory_name)
+        if memory is None:
+            memory = self.__memories[reference.memory_name] = self.__attach(reference.memory_name)
+
+        return numpy.ndarray(reference.shape, dtype=numpy.dtype(reference.dtype), buffer=memory.buf,
+                             offset=reference.offset)
+
+    def close(self):
+        for memory in self.__memories.values():
+            memory.close()
+        self.__memories = {}
+
+    @staticmethod
+    def __attach(memory_name: str) -> shared_memory.SharedMemory:
+        # Only the parent owns the memory. If the worker registered it in the resource tracker,
+        # the tracker would unlink it as "leaked" as soon as the worker exits.
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=memory_name)
+        finally:
+            resource_tracker.register = register
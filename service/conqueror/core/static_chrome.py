@@ -0,0 +1,135 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Static UI chrome exclusion
+
+Taskbars, browser tabs and IDE sidebars stay the same for most of a recording, but they are
+recognized again on every frame. The first recognized frames of a job are recognized in full,
+meanwhile the temporal variance of every tile (mean luminance and edge strength) is collected.
+Tiles that didn't vary are static: their text is already matched, they are masked out of the
+next images. A masked tile that changes later is not static any more, and text lines that
+reach a changed tile are never masked, so a line is not cut into its static and new parts.
+"""
+import cv2
+import numpy
+
+
+class StaticChromeDetector:
+    tile_size = 16
+
+    def __init__(self, warmup_frames=6, max_deviation=3.0, change_threshold=6.0, min_texture=8.0,
+                 min_masked_ratio=0.05):
+        # Frames recognized in full while the variance is collected
+        self.warmup_frames = warmup_frames
+        # Standard deviation of tile features that is still compression noise
+        self.max_deviation = max_deviation
+        # Difference from the warmup mean that makes a static tile changed
+        self.change_threshold = change_threshold
+        # Edge strength of a tile with text
+        self.min_texture = min_texture
+        # Masking less than this part of the frame doesn't pay for the copy of the image
+        self.min_masked_ratio = min_masked_ratio
+
+        self.__features_sum = None
+        self.__features_squares_sum = None
+        self.__reference = None
+        self.__static_tiles = None
+        self.__mask = None
+        self.__warmup_count = 0
+
+        self.frames_count = 0
+        self.masked_count = 0
+        self.changed_tiles_count = 0
+        self.static_ratio = 0.0
+
+    def static_mask(self, frame: numpy.ndarray):
+        """
+        Pixels of the frame that are static chrome (a boolean mask of the frame size),
+        None while the frames are analyzed or if there is too little chrome to mask
+        """
+        self.frames_count += 1
+        features = self.__tile_features(frame)
+
+        if self.__reference is None or self.__reference.shape != features.shape:
+            self.__add_warmup_frame(features, frame.shape[:2])
+            return None
+
+        changed = self.__static_tiles & (numpy.abs(features - self.__reference) > self.change_threshold).any(axis=2)
+        if changed.any():
+            # Chrome that changes is content, it stays unmasked till the end of the job
+            self.changed_tiles_count += int(changed.sum())
+            self.__static_tiles &= ~changed
+            self.__mask = self.__create_mask(frame.shape[:2])
+
+        if self.__mask is not None:
+            self.masked_count += 1
+        return self.__mask
+
+    def __tile_features(self, frame: numpy.ndarray) -> numpy.ndarray:
+        image = frame[..., 0] if frame.ndim == 3 else frame
+        height, width = image.shape
+        grid_size = (max(1, width // self.tile_size), max(1, height // self.tile_size))
+
+        gradient = cv2.morphologyEx(image, cv2.MORPH_GRADIENT, numpy.ones((3, 3), numpy.uint8))
+        luminance = cv2.resize(image.astype(numpy.float32), grid_size, interpolation=cv2.INTER_AREA)
+        texture = cv2.resize(gradient.astype(numpy.float32), grid_size, interpolation=cv2.INTER_AREA)
+        return numpy.dstack((luminance, texture))
+
+    def __add_warmup_frame(self, features: numpy.ndarray, frame_shape):
+        if self.__features_sum is None or self.__features_sum.shape != features.shape:
+            # A new frame size starts the analysis again
+            self.__features_sum = numpy.zeros(features.shape, numpy.float64)
+            self.__features_squares_sum = numpy.zeros(features.shape, numpy.float64)
+            self.__warmup_count = 0
+
+        self.__features_sum += features
+        self.__features_squares_sum += features * features
+        self.__warmup_count += 1
+        if self.__warmup_count < self.warmup_frames:
+            return
+
+        mean = self.__features_sum / self.__warmup_count
+        variance = numpy.maximum(0, self.__features_squares_sum / self.__warmup_count - mean * mean)
+        self.__reference = mean.astype(numpy.float32)
+        self.__static_tiles = (numpy.sqrt(variance) <= self.max_deviation).all(axis=2)
+        self.static_ratio = round(float(self.__static_tiles.mean()), 3)
+        # The mask is for the next frames, this one is recognized in full as the warmup ones
+        self.__mask = self.__create_mask(frame_shape)
+
+    def __create_mask(self, frame_shape) -> numpy.ndarray:
+        masked_tiles = self.__static_tiles.copy()
+        content_tiles = ~self.__static_tiles
+
+        # Words of a line are joined, a line with a content tile is recognized as a whole
+        lines = ((self.__reference[..., 1] > self.min_texture) | content_tiles).astype(numpy.uint8)
+        lines = cv2.morphologyEx(lines, cv2.MORPH_CLOSE, numpy.ones((1, 3), numpy.uint8))
+        _, labels = cv2.connectedComponents(lines)
+        content_lines = numpy.isin(labels, numpy.unique(labels[content_tiles & (labels > 0)])).astype(numpy.uint8)
+        # Tiles around a line may have a few pixels of its letters
+        masked_tiles &= cv2.dilate(content_lines, numpy.ones((3, 3), numpy.uint8)) == 0
+
+        if masked_tiles.mean() < self.min_masked_ratio:
+            return None
+
+        height, width = frame_shape
+        return cv2.resize(masked_tiles.astype(numpy.uint8), (width, height), interpolation=cv2.INTER_NEAREST) > 0
+
+    def statistics(self) -> dict:
+        return {
+            'frames': self.frames_count,
+            'masked': self.masked_count,
+            'static_ratio': self.static_ratio,
+            'changed_tiles': self.changed_tiles_count,
+        }
+
+
+def mask_image(image: numpy.ndarray, mask: numpy.ndarray) -> numpy.ndarray:
+    """
+    Copy of the image with the masked pixels filled with its background
+    """
+    masked_image = image.copy()
+    # The median of a sparse grid is the background for screens and is cheap to find
+    masked_image[mask] = numpy.median(image[::8, ::8], axis=(0, 1)).astype(image.dtype)
+    return masked_image
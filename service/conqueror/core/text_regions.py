@@ -0,0 +1,96 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Text region proposals
+
+Most of a screen is empty background, pictures and window chrome, but tesseract runs
+page segmentation over all of it. Characters have strong edges close to each other:
+the morphological gradient of the image is binarized, characters are closed into words
+and lines, and components of a text line size are joined into padded blocks.
+Only these blocks are recognized, an image without them is not recognized at all.
+"""
+import cv2
+import numpy
+
+from service.conqueror.core.dirty_regions import merge_overlapping_regions, regions_intersect
+
+
+class TextRegionDetector:
+
+    def __init__(self, min_gradient=32, character_gap=9, min_line_height=6, max_line_height=96, padding=8,
+                 max_regions_ratio=0.6, max_regions_count=32):
+        self.min_gradient = min_gradient
+        # Horizontal distance in pixels that still joins characters into one word or line
+        self.character_gap = character_gap
+        self.min_line_height = min_line_height
+        self.max_line_height = max_line_height
+        # Tesseract needs some background around the text
+        self.padding = padding
+        # Recognizing the whole image is cheaper than many crops covering most of it
+        self.max_regions_ratio = max_regions_ratio
+        self.max_regions_count = max_regions_count
+
+        self.images_count = 0
+        self.skipped_count = 0
+        self.full_count = 0
+        self.total_pixels = 0
+        self.recognized_pixels = 0
+
+    def text_regions(self, image: numpy.ndarray, search_regions: [(int, int, int, int)] = None) \
+            -> [(int, int, int, int)]:
+        """
+        Blocks (x, y, width, height) with text that intersect search_regions (the whole image by default),
+        the whole image if they cover most of it
+        """
+        height, width = image.shape[:2]
+        self.images_count += 1
+        self.total_pixels += width * height
+
+        regions = self.__find_text_regions(image)
+        if search_regions is not None:
+            regions = [region for region in regions
+                       if any(regions_intersect(region, search_region) for search_region in search_regions)]
+
+        if not regions:
+            self.skipped_count += 1
+        elif sum(w * h for _, _, w, h in regions) > self.max_regions_ratio * width * height \
+                or len(regions) > self.max_regions_count:
+            regions = [(0, 0, width, height)]
+            self.full_count += 1
+
+        self.recognized_pixels += sum(w * h for _, _, w, h in regions)
+        return regions
+
+    def __find_text_regions(self, image: numpy.ndarray):
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        height, width = image.shape
+
+        gradient = cv2.morphologyEx(image, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+        threshold, _ = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        # Otsu splits noise in two on a blank image
+        edges = (gradient > max(threshold, self.min_gradient)).astype(numpy.uint8)
+        lines = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, numpy.ones((1, self.character_gap), numpy.uint8))
+
+        _, _, stats, _ = cv2.connectedComponentsWithStats(lines)
+        regions = []
+        for x, y, line_width, line_height, _ in stats[1:]:
+            if not self.min_line_height <= line_height <= self.max_line_height or line_width < self.min_line_height:
+                continue
+            left, top = max(0, x - self.padding), max(0, y - self.padding)
+            right, bottom = min(width, x + line_width + self.padding), min(height, y + line_height + self.padding)
+            regions.append((int(left), int(top), int(right - left), int(bottom - top)))
+
+        # Lines of a paragraph overlap with their padding and become one block
+        return merge_overlapping_regions(regions)
+
+    def statistics(self) -> dict:
+        return {
+            'images': self.images_count,
+            'skipped': self.skipped_count,
+            'full': self.full_count,
+            'recognized_pixels_ratio': round(self.recognized_pixels / self.total_pixels, 3)
+            if self.total_pixels else 0,
+        }
@@ -0,0 +1,94 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+Text height normalization
+
+Recordings come from 720p to 4K/HiDPI screens, while tesseract reads best and costs the
+same for the same text size. The dominant character height is estimated from connected
+components of the binarized image: characters are the small components of the minority
+color. The image is resized so that height becomes the target before OCR, the scale is
+estimated again for a new image size, every few images, and kept while images have too few
+characters to estimate it.
+"""
+import cv2
+import numpy
+
+
+class TextScaleEstimator:
+    max_thumbnail_width = 1280
+
+    def __init__(self, target_character_height=12, min_scale=0.25, max_scale=2.0, tolerance=0.15,
+                 min_characters_count=20, estimate_every=8):
+        self.target_character_height = target_character_height
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        # Resizing for a few percent costs more than it gives
+        self.tolerance = tolerance
+        self.min_characters_count = min_characters_count
+        # Text size of a recording rarely changes, the estimation costs about as much as a small OCR call
+        self.estimate_every = estimate_every
+
+        self.__last_scale = 1.0
+        self.__last_shape = None
+        self.__images_since_estimation = 0
+
+        self.images_count = 0
+        self.estimated_count = 0
+        self.resized_count = 0
+
+    def scale(self, image: numpy.ndarray) -> float:
+        """
+        Factor the image should be resized with, 1.0 if its text has the target height already
+        """
+        self.images_count += 1
+        self.__images_since_estimation += 1
+        if image.shape != self.__last_shape or self.__images_since_estimation >= self.estimate_every:
+            self.__last_shape = image.shape
+            self.__images_since_estimation = 0
+
+            character_height = self.character_height(image)
+            if character_height is not None:
+                self.estimated_count += 1
+                scale = min(self.max_scale, max(self.min_scale, self.target_character_height / character_height))
+                self.__last_scale = 1.0 if abs(scale - 1.0) <= self.tolerance else scale
+
+        if self.__last_scale != 1.0:
+            self.resized_count += 1
+        return self.__last_scale
+
+    def character_height(self, image: numpy.ndarray):
+        """
+        Median height in pixels of character-like components, None if there are too few of them
+        """
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        # Thumbnails of 4K frames still keep characters a few pixels high
+        thumbnail_scale = min(1.0, self.max_thumbnail_width / image.shape[1])
+        if thumbnail_scale < 1.0:
+            image = cv2.resize(image, None, fx=thumbnail_scale, fy=thumbnail_scale, interpolation=cv2.INTER_AREA)
+
+        _, binary = cv2.threshold(image, 0, 1, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        # Text is the minority color: dark on light or light on dark
+        if binary.mean() > 0.5:
+            binary = 1 - binary
+
+        _, _, stats, _ = cv2.connectedComponentsWithStats(binary)
+        widths = stats[1:, cv2.CC_STAT_WIDTH]
+        heights = stats[1:, cv2.CC_STAT_HEIGHT]
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        is_character = (heights >= 4) & (heights <= 64) & (widths <= 2 * heights) & (widths * 5 >= heights) \
+            & (areas >= 0.15 * widths * heights) & (areas <= 0.9 * widths * heights)
+        if is_character.sum() < self.min_characters_count:
+            return None
+
+        return float(numpy.median(heights[is_character])) / thumbnail_scale
+
+    def statistics(self) -> dict:
+        return {
+            'images': self.images_count,
+            'estimated': self.estimated_count,
+            'resized': self.resized_count,
+        }
@@ -0,0 +1,94 @@
+"""
+Conqueror v.1
+System that extracts error messages from screen recordings
+of different software error occurrences
+
+URL strip recognition
+
+URL rules are checked against the words at the top of the frame (max_y_position_for_URL),
+where the tabs and the address bar are. The strip is recognized on its own, line by line
+with the single line page segmentation, and only when its content differs from every strip
+recognized before: match results are accumulated, so a strip seen once has nothing new.
+Strips are compared by their downscaled pixels: identical ones by a hash, the rest pixel
+by pixel with a tolerance, so compression noise of the same address bar doesn't make it a new one.
+"""
+import hashlib
+
+import cv2
+import numpy
+
+
+class UrlStripTracker:
+
+    def __init__(self, strip_height: int, pixel_threshold=32, min_changed_pixels=4):
+        self.strip_height = strip_height
+        # Thumbnail pixels of the same strip differ by a few levels of compression noise, text changes them a lot
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.__seen_hashes = set()
+        self.__seen_thumbnails = []
+
+        self.frames_count = 0
+        self.new_count = 0
+
+    def new_strip(self, image: numpy.ndarray):
+        """
+        The top strip of the image if it was not recognized yet, None otherwise
+        """
+        strip = image[:self.strip_height]
+        self.frames_count += 1
+
+        thumbnail = self.__thumbnail(strip)
+        strip_hash = hashlib.blake2b(thumbnail.tobytes(), digest_size=16).digest()
+        if strip_hash in self.__seen_hashes or any(self.__is_same(thumbnail, seen_thumbnail)
+                                                   for seen_thumbnail in self.__seen_thumbnails):
+            return None
+
+        self.__seen_hashes.add(strip_hash)
+        self.__seen_thumbnails.append(thumbnail)
+        self.new_count += 1
+        return strip
+
+    @staticmethod
+    def __thumbnail(strip: numpy.ndarray) -> numpy.ndarray:
+        height, width = strip.shape[:2]
+        return cv2.resize(strip, (max(1, width // 2), max(1, height // 2)), interpolation=cv2.INTER_AREA)
+
+    def __is_same(self, thumbnail: numpy.ndarray, seen_thumbnail: numpy.ndarray) -> bool:
+        if thumbnail.shape != seen_thumbnail.shape:
+            return False
+        changed_pixels = cv2.absdiff(thumbnail, seen_thumbnail) > self.pixel_threshold
+        return numpy.count_nonzero(changed_pixels) < self.min_changed_pixels
+
+    def statistics(self) -> dict:
+        return {
+            'frames': self.frames_count,
+            'recognized': self.new_count,
+        }
+
+
+def text_line_bands(strip: numpy.ndarray, min_gradient=32, min_row_edges=8, min_line_height=6, padding=4) \
+        -> [(int, int)]:
+    """
+    Rows (y, height) of the text lines of the strip. Rows of a line have many character edges,
+    rows between lines have none or only a few of vertical borders and separators.
+    """
+    if strip.ndim == 3:
+        strip = cv2.cvtColor(strip, cv2.COLOR_BGR2GRAY)
+
+    gradient = cv2.morphologyEx(strip, cv2.MORPH_GRADIENT, numpy.ones((3, 3), numpy.uint8))
+    rows_with_edges = (gradient > min_gradient).sum(axis=1) >= min_row_edges
+
+    bands = []
+    start = None
+    for y, has_edges in enumerate(list(rows_with_edges) + [False]):
+        if has_edges and start is None:
+            start = y
+        elif not has_edges and start is not None:
+            # Horizontal borders are thinner than a line of text
+            if y - start >= min_line_height:
+                top = max(0, start - padding)
+                bands.append((top, min(len(rows_with_edges), y + padding) - top))
+            start = None
+
+    return bands
@@ -6,7 +6,7 @@ from datetime import datetime, timedelta
 from typing import List
 
 from sqlalchemy import (
-    MetaData, Table, Column, Integer, String, Enum, Text, DateTime, SmallInteger, or_
+    MetaData, Table, Column, Integer, String, Enum, Text, DateTime, SmallInteger, or_, select, inspect
 )
 
 from service.conqueror.utils import database_connection, RecognitionTimeoutRepeatExceededException
@@ -33,6 +33,13 @@ class JobStorageTypes(enum.Enum):
 
 meta = MetaData()
 
+CHECKPOINT_COLUMN = 'Recognition_Checkpoint'
+
+# Columns added to the Jobs table after it was first created, db_migrate.py adds them to an existing schema
+ADDED_COLUMNS = [
+    (CHECKPOINT_COLUMN, 'TEXT NULL'),
+]
+
 
 class JobModel:
     schema = Table(
@@ -50,16 +57,23 @@ class JobModel:
         Column('Storage_Name', String(128), nullable=True),
         Column('Recognition_Identifiers', Text, nullable=True),
         Column('Exception_Text', Text, nullable=True),
-        Column('Number_Of_Repeat', SmallInteger, nullable=True)
+        Column('Number_Of_Repeat', SmallInteger, nullable=True),
+        Column(CHECKPOINT_COLUMN, Text, nullable=True)
 
     )
 
+    # Whether the schema is migrated to keep checkpoints, checked once per process
+    has_checkpoint_column = None
+
     def __init__(self, row):
         self.id = row.JobId
         self.storage_name = row.Storage_Name
         self.__status = row.Status
         self.local_path = row.Local_File_Path
         self.number_of_repeat = row.Number_Of_Repeat or 0
+        # Progress of the previous run of the job: the processed timestamp and the results found before it
+        checkpoint = getattr(row, CHECKPOINT_COLUMN, None)
+        self.checkpoint = json.loads(checkpoint) if checkpoint else None
         if row.Recognition_Identifiers:
             self.recognition_identifiers = json.loads(row.Recognition_Identifiers)
             self.url_contains = self.recognition_identifiers['caseClasificationRules']['url'] or []
@@ -71,6 +85,28 @@ class JobModel:
             self.text_contains = ["MySQL", "MariaDB"]
             self.search_phrases = ["error", "exception"]
 
+    @classmethod
+    def is_checkpoint_column_migrated(cls, connection) -> bool:
+        if cls.has_checkpoint_column is None:
+            columns = {column['name'] for column in inspect(connection).get_columns(cls.schema.name)}
+            cls.has_checkpoint_column = CHECKPOINT_COLUMN in columns
+            if not cls.has_checkpoint_column:
+                print(f'{cls.schema.name} has no {CHECKPOINT_COLUMN} column, jobs are not checkpointed '
+                      f'until python db_migrate.py is run')
+        return cls.has_checkpoint_column
+
+    @classmethod
+    def select_columns(cls, connection):
+        """
+        Select of the job columns that the schema has, a schema that is not migrated yet keeps working
+        """
+        is_migrated = cls.is_checkpoint_column_migrated(connection)
+        return select([column for column in cls.schema.c if is_migrated or column.name != CHECKPOINT_COLUMN])
+
+    @classmethod
+    def checkpoint_values(cls, connection, checkpoint) -> dict:
+        return {CHECKPOINT_COLUMN: checkpoint} if cls.is_checkpoint_column_migrated(connection) else {}
+
     @staticmethod
     @database_connection
     def insert_fake_data(connection):
@@ -108,7 +144,20 @@ class JobModel:
                            .update()
                            .where(self.schema.c.JobId == self.id)
                            .values(Status=JobStatuses.Recognized, Recognition_Text=recognition_text,
-                                   Recognition_Competed_On=datetime.utcnow()))
+                                   Recognition_Competed_On=datetime.utcnow(),
+                                   # A job processed again starts from the beginning of the video
+                                   **self.checkpoint_values(connection, None)))
+
+    @database_connection
+    def job_checkpoint_reached(self, checkpoint: str, connection):
+        checkpoint_values = self.checkpoint_values(connection, checkpoint)
+        if not checkpoint_values:
+            return
+
+        connection.execute(self.schema
+                           .update()
+                           .where(self.schema.c.JobId == self.id)
+                           .values(**checkpoint_values))
 
     @database_connection
     def exception_catched(self, exception: str, connection):
@@ -116,7 +165,8 @@ class JobModel:
                            .update()
                            .where(self.schema.c.JobId == self.id)
                            .values(Status=JobStatuses.Exception, Exception_Text=exception,
-                                   Recognition_Competed_On=datetime.utcnow()))
+                                   Recognition_Competed_On=datetime.utcnow(),
+                                   **self.checkpoint_values(connection, None)))
 
 
 @database_connection
@@ -124,7 +174,7 @@ def select_uploaded_jobs(connection) -> List[JobModel]:
     result = []
     timeout_datetime = datetime.utcnow() - timedelta(seconds=int(os.environ.get('SCHEDULING_RECOGNITION_JOB_TIMEOUT', 1800)))
     timeout_repeat_exceeded = os.environ.get('SCHEDULING_RECOGNITION_JOB_REPEAT', 3)
-    for row in connection.execute(JobModel.schema.select()
+    for row in connection.execute(JobModel.select_columns(connection)
                                           .where(JobModel.schema.c.Status == JobStatuses.Uploaded)
                                           .where(or_(JobModel.schema.c.Recognition_Started_On == None,
                                                      JobModel.schema.c.Recognition_Started_On < timeout_datetime))
@@ -137,13 +187,29 @@ def select_uploaded_jobs(connection) -> List[JobModel]:
 
 @database_connection
 def select_job_by_id(job_id, connection) -> JobModel:
-    jobs = list(connection.execute(JobModel.schema.select()
+    jobs = list(connection.execute(JobModel.select_columns(connection)
                                    .where(JobModel.schema.c.JobId == job_id)))
     if len(jobs) < 1:
         raise Exception(f'Job with id - {job_id}, does not exist')
     return JobModel(jobs[0])
 
 
+def migrate_schema(connection) -> [str]:
+    """
+    Adds the columns that the Jobs table of an existing schema doesn't have yet, returns their names
+    """
+    existing_columns = {column['name'] for column in inspect(connection).get_columns(JobModel.schema.name)}
+    added_columns = []
+    for column_name, column_type in ADDED_COLUMNS:
+        if column_name not in existing_columns:
+            connection.execute(f'ALTER TABLE {JobModel.schema.name} ADD COLUMN {column_name} {column_type}')
+            added_columns.append(column_name)
+
+    # Checked again on the next use
+    JobModel.has_checkpoint_column = None
+    return added_columns
+
+
 models_list = [
     JobModel,
 ]
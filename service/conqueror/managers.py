@@ -18,13 +18,13 @@ from .core.keyframe import KeyFrameFinder
 from .utils import timeout_handler
 
 
-def process_request(data: str, recognition_settings: dict = None):
+def process_request(data: str, recognition_settings: dict = None, checkpoint: dict = None, checkpoint_callback=None):
     if recognition_settings is None:
         recognition_settings = {}
-    return process_video(data, recognition_settings)
+    return process_video(data, recognition_settings, checkpoint=checkpoint, checkpoint_callback=checkpoint_callback)
 
 
-def process_video(request_data: str, recognition_settings):
+def process_video(request_data: str, recognition_settings, checkpoint: dict = None, checkpoint_callback=None):
     data = json.loads(request_data)
 
     # video_file.stored_file = save_video_to_temporary_directory(video_file)
@@ -33,9 +33,11 @@ def process_video(request_data: str, recognition_settings):
     keyframe_finder = KeyFrameFinder(0.3, object_detection_threshold=0.4,
                                      search_phrases=data['SearchPhraseIdentifiers'], url_contains=data['URLContains'],
                                      text_contains=data['TextContains'], recognition_settings=recognition_settings,
-                                     byte_video=base64.b64decode(data['VideoBody']))
+                                     byte_video=base64.b64decode(data['VideoBody']),
+                                     checkpoint=checkpoint, checkpoint_callback=checkpoint_callback)
 
-    # Set timeout for processing
+    # Set timeout for processing, with a deadline in recognition_settings it only stops a stuck job,
+    # the deadline returns what is found so far
     if not sys.platform.startswith('win32'):
         signal.signal(signal.SIGALRM, timeout_handler)
         signal.alarm(int(os.environ.get('RECOGNITION_TIMEOUT_SECONDS', 1800)))
@@ -48,5 +50,6 @@ def process_video(request_data: str, recognition_settings):
     return {
         'SearchPhrasesFound': found_lines,
         'URLContainsResults': url_contains_results,
-        'TextContainsResults': text_contains_result
+        'TextContainsResults': text_contains_result,
+        'Coverage': keyframe_finder.coverage
     }
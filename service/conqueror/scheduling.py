@@ -1,5 +1,6 @@
 import base64
 import json
+import os
 
 from celery import Celery
 from kombu import Exchange, Queue
@@ -55,8 +56,16 @@ def process_video(job_id):
     data['TextContains'] = job.text_contains
     json_encoded_request = json.dumps(data)
 
+    # A slow job is stored with the results found before its deadline instead of being repeated from the start,
+    # its images wait in their own queue on the OCR server
+    recognition_settings = {'deadline_seconds': int(os.environ.get('RECOGNITION_DEADLINE_SECONDS', 1500)),
+                            'ocr_job_id': job_id}
+
     try:
-        result = process_request(json_encoded_request)
+        # A repeated job continues from the last saved checkpoint instead of the start of the video
+        result = process_request(json_encoded_request, recognition_settings, checkpoint=job.checkpoint,
+                                 checkpoint_callback=lambda checkpoint: job.job_checkpoint_reached(
+                                     json.dumps(checkpoint)))
     except Exception as e:
         job.exception_catched(str(e))
         raise e
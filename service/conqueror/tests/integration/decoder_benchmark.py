@@ -0,0 +1,68 @@
+import csv
+import datetime
+import os
+import pathlib
+import time
+
+from service.conqueror.core.decoders import VIDEO_DECODERS
+from service.conqueror.core.keyframe import KeyFrameFinder
+
+# Decode time of every video decoder backend with the same sampling strategy and pixel format.
+
+
+def benchmark_video(video_path, recognition_settings={}, decoders=list(VIDEO_DECODERS)):
+    with open(video_path, 'rb') as video:
+        byte_video = video.read()
+
+    results = {}
+    for decoder in decoders:
+        keyframe_finder = KeyFrameFinder(byte_video=byte_video,
+                                         recognition_settings={**recognition_settings, 'video_decoder': decoder})
+        start_time = time.time()
+        try:
+            frames_count = sum(1 for _ in keyframe_finder.get_frame_iterator())
+        except Exception as e:
+            print(f'{decoder} failed on {video_path}: {e}')
+            continue
+        results[decoder] = (frames_count, time.time() - start_time)
+
+    return results
+
+
+def benchmark_folder(videos_folder, recognition_settings={}, decoders=list(VIDEO_DECODERS)):
+    report = [['Video'] + [f'{decoder}, s' for decoder in decoders] + [f'{decoder} frames' for decoder in decoders]]
+
+    for video_filename in sorted(os.listdir(videos_folder)):
+        if not video_filename.lower().endswith(('.webm', '.mp4')):
+            continue
+
+        print('processing video: ' + video_filename)
+        results = benchmark_video(os.path.join(videos_folder, video_filename), recognition_settings, decoders)
+
+        row = [video_filename]
+        row += [round(results[decoder][1], 3) if decoder in results else '' for decoder in decoders]
+        row += [results[decoder][0] if decoder in results else '' for decoder in decoders]
+        report.append(row)
+        print(row)
+
+    return report
+
+
+def save_report(videos_folder, report):
+    time_suffix = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_filename = os.path.join(videos_folder, "decoder_benchmark_" + time_suffix + ".csv")
+
+    print('Saving report to file: ' + report_filename)
+    with open(report_filename, "w", newline='', encoding='utf-8') as file:
+        writer = csv.writer(file, delimiter=';')
+        writer.writerows(report)
+    print('Report was sucessfully saved!')
+
+
+if __name__ == "__main__":
+    test_root_folder = (pathlib.Path(__file__).parent.parent / 'integration_tests_video').as_posix()
+
+    for sampling_strategy in ['select', 'seek']:
+        decoder_report = benchmark_folder(test_root_folder, recognition_settings={
+            'sampling_strategy': sampling_strategy, 'seconds_between_frames': 3.0})
+        save_report(test_root_folder, decoder_report)
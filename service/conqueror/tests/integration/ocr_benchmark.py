@@ -0,0 +1,90 @@
+import csv
+import datetime
+import os
+import pathlib
+import statistics
+import time
+
+from service.conqueror.core.keyframe import KeyFrameFinder
+from service.conqueror.core.keyframe_multipocessing_helper import KeyframeMultiprocessingHelper
+from service.conqueror.core.ocr_engines import OcrEngines, PytesseractEngine, TesserocrEngine
+
+# Per-image OCR latency of every engine on the preprocessed frames of the same video.
+
+OCR_ENGINES = {
+    OcrEngines.PYTESSERACT: PytesseractEngine,
+    OcrEngines.TESSEROCR: TesserocrEngine,
+}
+
+
+def preprocessed_images(video_path, recognition_settings={}):
+    with open(video_path, 'rb') as video:
+        byte_video = video.read()
+
+    keyframe_finder = KeyFrameFinder(byte_video=byte_video, recognition_settings=recognition_settings)
+    frame_processor = KeyframeMultiprocessingHelper(recognition_settings=recognition_settings)
+
+    images = []
+    for frame in keyframe_finder.get_frame_iterator():
+        images += frame_processor.preprocess(frame)
+    return images
+
+
+def benchmark_images(images, engines=OcrEngines.ALL):
+    results = {}
+    for engine_name in engines:
+        try:
+            engine = OCR_ENGINES[engine_name]()
+            latencies = []
+            for image in images:
+                start_time = time.time()
+                engine.image_to_data(image)
+                latencies.append(time.time() - start_time)
+            engine.close()
+        except Exception as e:
+            print(f'{engine_name} failed: {e}')
+            continue
+        results[engine_name] = latencies
+
+    return results
+
+
+def benchmark_folder(videos_folder, recognition_settings={}, engines=OcrEngines.ALL):
+    report = [['Video', 'Images'] + [f'{engine} {value}, s' for engine in engines for value in ['mean', 'median']]]
+
+    for video_filename in sorted(os.listdir(videos_folder)):
+        if not video_filename.lower().endswith(('.webm', '.mp4')):
+            continue
+
+        print('processing video: ' + video_filename)
+        images = preprocessed_images(os.path.join(videos_folder, video_filename), recognition_settings)
+        results = benchmark_images(images, engines)
+
+        row = [video_filename, len(images)]
+        for engine in engines:
+            if engine in results and results[engine]:
+                row += [round(statistics.mean(results[engine]), 3), round(statistics.median(results[engine]), 3)]
+            else:
+                row += ['', '']
+        report.append(row)
+        print(row)
+
+    return report
+
+
+def save_report(videos_folder, report):
+    time_suffix = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_filename = os.path.join(videos_folder, "ocr_benchmark_" + time_suffix + ".csv")
+
+    print('Saving report to file: ' + report_filename)
+    with open(report_filename, "w", newline='', encoding='utf-8') as file:
+        writer = csv.writer(file, delimiter=';')
+        writer.writerows(report)
+    print('Report was sucessfully saved!')
+
+
+if __name__ == "__main__":
+    test_root_folder = (pathlib.Path(__file__).parent.parent / 'integration_tests_video').as_posix()
+
+    ocr_report = benchmark_folder(test_root_folder, recognition_settings={'seconds_between_frames': 3.0})
+    save_report(test_root_folder, ocr_report)
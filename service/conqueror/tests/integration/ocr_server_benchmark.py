@@ -0,0 +1,49 @@
+import os
+import pathlib
+import sys
+import threading
+import time
+
+from service.conqueror.core.keyframe import KeyFrameFinder
+from service.conqueror.core.ocr_engines import OcrEngines
+
+# Total time of N concurrent jobs recognized by their own local engines and by the shared OCR server.
+# Start the server first: python -m service.conqueror.core.ocr_server --socket <path>
+
+
+def run_concurrent_jobs(byte_video, jobs_count, recognition_settings):
+    def job(job_index):
+        keyframe_finder = KeyFrameFinder(byte_video=byte_video,
+                                         recognition_settings={**recognition_settings, 'ocr_job_id': job_index})
+        keyframe_finder.process_keyframes()
+
+    threads = [threading.Thread(target=job, args=(job_index,)) for job_index in range(jobs_count)]
+    start_time = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.time() - start_time
+
+
+def benchmark_video(video_path, server_socket, max_jobs_count=4):
+    with open(video_path, 'rb') as video:
+        byte_video = video.read()
+
+    report = [['Jobs', 'local, s', 'server, s']]
+    for jobs_count in range(1, max_jobs_count + 1):
+        local_time = run_concurrent_jobs(byte_video, jobs_count, {'ocr_engine': OcrEngines.TESSEROCR})
+        server_time = run_concurrent_jobs(byte_video, jobs_count, {'ocr_engine': OcrEngines.SERVER,
+                                                                   'ocr_server_socket': server_socket})
+        report.append([jobs_count, round(local_time, 3), round(server_time, 3)])
+        print(report[-1])
+
+    return report
+
+
+if __name__ == "__main__":
+    test_root_folder = (pathlib.Path(__file__).parent.parent / 'integration_tests_video').as_posix()
+    video_filename = sorted(f for f in os.listdir(test_root_folder) if f.lower().endswith(('.webm', '.mp4')))[0]
+
+    benchmark_video(os.path.join(test_root_folder, video_filename),
+                    sys.argv[1] if len(sys.argv) > 1 else os.environ.get('OCR_SERVER_SOCKET'))
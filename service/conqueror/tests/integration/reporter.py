@@ -321,6 +321,13 @@ if __name__ == "__main__":
     # test_settings["fps_instead_skip_frames"] = [False, True]
     test_settings["multiprocessing"] = [True]
     # test_settings["additional_recognition_inverted_image"] = [True, False]
+    # recall of skipping unchanged frames, different_site_errors at 1 second: 69.84 both, 5.81 s -> 5.70 s per video
+    # test_settings["skip_duplicate_frames"] = [False, True]
+    # URL rules found by the separately recognized address bar
+    # test_settings["url_strip_recognition"] = [False, True]
+    # test_settings["static_chrome_masking"] = [False, True]
+    # accuracy and time of stopping as soon as every rule is found
+    # test_settings["early_exit_conditions"] = [[], ["all_rules_found"]]
 
     test_confugurations = generate_test_configurations(test_settings, fullgrid=True)
 
@@ -0,0 +1,94 @@
+import argparse
+import email.message
+import http.client
+import inspect
+import json.decoder
+import logging
+import random
+import re
+import subprocess
+import sys
+import textwrap
+import time
+import unittest.case
+
+from fuzzywuzzy import fuzz
+
+from service.conqueror.core.rule_matcher import RuleMatcher
+
+# Time of matching text blocks against 10 to 10,000 text rules: every rule compared with every block
+# as the matcher did before, and the compiled rules. Both must find the same rules.
+# Blocks are lines of source code (an IDE recording), rules are phrases made of words of other modules.
+
+
+def generate_rules(rules_count, random_generator):
+    words = re.findall(r'[A-Za-z][a-z]{2,}', ' '.join(inspect.getsource(module) for module in (
+        http.client, email.message, json.decoder, unittest.case)))
+    rules = set()
+    while len(rules) < rules_count:
+        rules.add(' '.join(random_generator.sample(words, random_generator.randint(2, 5))))
+    return sorted(rules)
+
+
+def generate_blocks(blocks_count, rules, random_generator):
+    lines = [line.strip() for module in (argparse, textwrap, logging, subprocess)
+             for line in inspect.getsource(module).splitlines() if line.strip()]
+    blocks = []
+    for _ in range(blocks_count):
+        line_index = random_generator.randrange(len(lines) - 4)
+        block = ' '.join(lines[line_index:line_index + random_generator.randint(1, 4)])
+        if random_generator.random() < 0.1:
+            # A rule on the screen, with an OCR error
+            rule = list(random_generator.choice(rules))
+            rule[random_generator.randrange(len(rule))] = random_generator.choice('il1|')
+            block += ' ' + ''.join(rule)
+        blocks.append(block)
+    return blocks
+
+
+def match_every_rule(rules, blocks, similarity):
+    found = {rule: False for rule in rules}
+    for text in blocks:
+        for key in found.keys():
+            if not found[key] and len(text) + 5 >= len(key) \
+                    and (key in text or fuzz.partial_ratio(key, text) >= similarity):
+                found[key] = True
+    return {rule for rule, is_found in found.items() if is_found}
+
+
+def match_compiled_rules(rules, blocks, similarity):
+    start_time = time.time()
+    rule_matcher = RuleMatcher(rules, similarity, case_sensitive=True)
+    compile_time = time.time() - start_time
+
+    found = set()
+    for text in blocks:
+        found.update(rule_matcher.match(text))
+    return found, compile_time, rule_matcher.statistics()
+
+
+def benchmark(rules_counts=(10, 100, 1000, 10000), blocks_count=60, similarity=80):
+    random_generator = random.Random(0)
+    report = [['Rules', 'every rule, s', 'compiled, s', 'compile, s', 'compared', 'found']]
+    for rules_count in rules_counts:
+        rules = generate_rules(rules_count, random_generator)
+        blocks = generate_blocks(blocks_count, rules, random_generator)
+
+        start_time = time.time()
+        expected = match_every_rule(rules, blocks, similarity)
+        every_rule_time = time.time() - start_time
+
+        start_time = time.time()
+        found, compile_time, statistics = match_compiled_rules(rules, blocks, similarity)
+        compiled_time = time.time() - start_time
+
+        assert found == expected, f'{len(found ^ expected)} rules differ'
+        report.append([rules_count, round(every_rule_time, 3), round(compiled_time, 3), round(compile_time, 3),
+                       statistics['compared'], len(found)])
+        print(report[-1])
+
+    return report
+
+
+if __name__ == "__main__":
+    benchmark(rules_counts=[int(count) for count in sys.argv[1:]] or (10, 100, 1000, 10000))
@@ -0,0 +1,70 @@
+import csv
+import datetime
+import os
+import pathlib
+import time
+
+from service.conqueror.core.keyframe import KeyFrameFinder
+from service.conqueror.core.sampling import SamplingStrategies
+
+# Decode time of every sampling strategy against video length.
+# Video length is estimated as number of exact (select) samples * seconds_between_frames.
+
+
+def benchmark_video(video_path, seconds_between_frames=3.0, strategies=SamplingStrategies.ALL):
+    with open(video_path, 'rb') as video:
+        byte_video = video.read()
+
+    results = {}
+    for strategy in strategies:
+        keyframe_finder = KeyFrameFinder(byte_video=byte_video,
+                                         recognition_settings={'sampling_strategy': strategy,
+                                                               'seconds_between_frames': seconds_between_frames})
+        start_time = time.time()
+        try:
+            frames_count = sum(1 for _ in keyframe_finder.get_frame_iterator())
+        except Exception as e:
+            print(f'{strategy} failed on {video_path}: {e}')
+            continue
+        results[strategy] = (frames_count, time.time() - start_time)
+
+    return results
+
+
+def benchmark_folder(videos_folder, seconds_between_frames=3.0, strategies=SamplingStrategies.ALL):
+    report = [['Video', 'Length, s'] + [f'{strategy}, s' for strategy in strategies]
+              + [f'{strategy} frames' for strategy in strategies]]
+
+    for video_filename in sorted(os.listdir(videos_folder)):
+        if not video_filename.lower().endswith(('.webm', '.mp4')):
+            continue
+
+        print('processing video: ' + video_filename)
+        results = benchmark_video(os.path.join(videos_folder, video_filename), seconds_between_frames, strategies)
+
+        exact_frames = results.get(SamplingStrategies.SELECT, (0, 0))[0]
+        row = [video_filename, exact_frames * seconds_between_frames]
+        row += [round(results[strategy][1], 3) if strategy in results else '' for strategy in strategies]
+        row += [results[strategy][0] if strategy in results else '' for strategy in strategies]
+        report.append(row)
+        print(row)
+
+    return report
+
+
+def save_report(videos_folder, report):
+    time_suffix = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_filename = os.path.join(videos_folder, "sampling_benchmark_" + time_suffix + ".csv")
+
+    print('Saving report to file: ' + report_filename)
+    with open(report_filename, "w", newline='', encoding='utf-8') as file:
+        writer = csv.writer(file, delimiter=';')
+        writer.writerows(report)
+    print('Report was sucessfully saved!')
+
+
+if __name__ == "__main__":
+    test_root_folder = (pathlib.Path(__file__).parent.parent / 'integration_tests_video').as_posix()
+
+    sampling_report = benchmark_folder(test_root_folder, seconds_between_frames=3.0)
+    save_report(test_root_folder, sampling_report)
@@ -0,0 +1,46 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from service.conqueror.core.checkpoints import RecognitionCheckpointer
+
+
+class RecognitionCheckpointerTestCase(TestCase):
+
+    @patch('service.conqueror.core.checkpoints.time.monotonic')
+    def test_saved_every_interval(self, monotonic):
+        checkpoints = []
+        monotonic.return_value = 0.0
+        checkpointer = RecognitionCheckpointer(checkpoints.append, interval_seconds=60, start_seconds=30.0,
+                                               seconds_between_samples=3.0)
+
+        monotonic.return_value = 10.0
+        self.assertFalse(checkpointer.maybe_save(4, {'Error: refused'}, {'example.com': False}, {'MySQL': True}))
+        monotonic.return_value = 61.0
+        self.assertTrue(checkpointer.maybe_save(5, {'Error: refused'}, {'example.com': False}, {'MySQL': True}))
+        monotonic.return_value = 200.0
+        # No frame is processed since the last checkpoint
+        self.assertFalse(checkpointer.maybe_save(5, {'Error: refused'}, {'example.com': True}, {'MySQL': True}))
+
+        self.assertEqual(checkpoints, [{'Seconds': 45.0, 'SearchPhrasesFound': ['Error: refused'],
+                                        'URLContainsResults': {'example.com': False},
+                                        'TextContainsResults': {'MySQL': True}}])
+        self.assertEqual(checkpointer.statistics(), {'start_seconds': 30.0, 'saved': 1, 'failed': 0,
+                                                     'last_seconds': 45.0})
+
+    def test_disabled(self):
+        self.assertFalse(RecognitionCheckpointer(None, seconds_between_samples=3.0).is_enabled)
+        self.assertFalse(RecognitionCheckpointer(print, interval_seconds=0, seconds_between_samples=3.0).is_enabled)
+        # The timestamp of a frame is unknown
+        self.assertFalse(RecognitionCheckpointer(print, seconds_between_samples=0.0).is_enabled)
+
+    @patch('service.conqueror.core.checkpoints.time.monotonic')
+    def test_failed_save_does_not_stop_the_job(self, monotonic):
+        def save_checkpoint(checkpoint):
+            raise ConnectionError('database is not reachable')
+
+        monotonic.return_value = 0.0
+        checkpointer = RecognitionCheckpointer(save_checkpoint, interval_seconds=60, seconds_between_samples=3.0)
+
+        monotonic.return_value = 60.0
+        self.assertFalse(checkpointer.maybe_save(1, set(), {}, {}))
+        self.assertEqual(checkpointer.failed_count, 1)
@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+import cv2
+import numpy
+
+from service.conqueror.core.dark_regions import DarkRegionClassifier
+
+
+class DarkRegionClassifierTestCase(TestCase):
+
+    def test_light_frame_is_skipped(self):
+        classifier = DarkRegionClassifier()
+        frame = numpy.full((720, 1280), 240, numpy.uint8)
+        cv2.putText(frame, 'Error: connection refused', (40, 300), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 20, 2)
+
+        self.assertEqual(classifier.dark_regions(frame), [])
+        self.assertEqual(classifier.statistics()['skipped'], 1)
+
+    def test_dark_panel(self):
+        classifier = DarkRegionClassifier()
+        frame = numpy.full((720, 1280), 240, numpy.uint8)
+        frame[304:688, 608:1248] = 30
+        cv2.putText(frame, 'Error: connection refused', (620, 400), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 230, 2)
+
+        self.assertEqual(classifier.dark_regions(frame), [(608, 304, 640, 384)])
+        self.assertEqual(classifier.statistics()['regions'], 1)
+
+    def test_empty_dark_area_is_skipped(self):
+        classifier = DarkRegionClassifier()
+        frame = numpy.full((720, 1280), 240, numpy.uint8)
+        frame[304:688, 608:1248] = 30
+
+        self.assertEqual(classifier.dark_regions(frame), [])
+
+    def test_dark_theme_frame(self):
+        classifier = DarkRegionClassifier()
+        frame = numpy.full((720, 1280), 30, numpy.uint8)
+        cv2.putText(frame, 'Error: connection refused', (40, 300), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 230, 2)
+
+        self.assertEqual(classifier.dark_regions(frame), [(0, 0, 1280, 720)])
+        self.assertEqual(classifier.statistics()['full'], 1)
@@ -0,0 +1,183 @@
+import io
+import pathlib
+import subprocess
+import tempfile
+from unittest import TestCase
+
+import cv2
+import numpy
+
+from service.conqueror.core.decoders import create_video_decoder, FfmpegPipeDecoder, OpenCvDecoder, \
+    probe_video_timeline
+from service.conqueror.core.keyframe_multipocessing_helper import KeyframeMultiprocessingHelper
+from service.conqueror.core.sampling import FrameSampler, SamplingStrategies
+
+INTEGRATION_VIDEO = pathlib.Path(__file__).parent.parent / 'integration_tests_video' / '2730cfc6.webm'
+
+
+def make_video(frames_count=10, fps=5, width=64, height=48) -> bytes:
+    with tempfile.NamedTemporaryFile(suffix='.avi') as video_file:
+        writer = cv2.VideoWriter(video_file.name, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+        for frame_index in range(frames_count):
+            writer.write(numpy.full((height, width, 3), frame_index * 20, numpy.uint8))
+        writer.release()
+        return video_file.read()
+
+
+def make_resized_video(sizes=('64x48', '32x24'), frames_count=5) -> bytes:
+    """
+    Matroska mjpeg video with frames_count frames of every size one after another
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for part_index, size in enumerate(sizes):
+            subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'lavfi',
+                            '-i', f'color=c=gray:s={size}:r=5', '-frames:v', str(frames_count), '-c:v', 'mjpeg',
+                            f'{directory}/{part_index}.mkv'], check=True)
+        with open(f'{directory}/parts.txt', 'w') as parts_file:
+            parts_file.writelines(f"file '{directory}/{part_index}.mkv'\n" for part_index in range(len(sizes)))
+        subprocess.run(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                        '-i', f'{directory}/parts.txt', '-c', 'copy', f'{directory}/video.mkv'], check=True)
+        with open(f'{directory}/video.mkv', 'rb') as video_file:
+            return video_file.read()
+
+
+def pnm_frame(image: numpy.ndarray) -> bytes:
+    height, width = image.shape[:2]
+    magic = b'P6' if image.ndim == 3 else b'P5'
+    return magic + f'\n{width} {height}\n255\n'.encode() + image.tobytes()
+
+
+class FfmpegPipeDecoderTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.byte_video = make_video()
+        self.decoder = FfmpegPipeDecoder(self.byte_video, FrameSampler(self.byte_video))
+
+    def read_frames(self, stream: bytes):
+        stream = io.BytesIO(stream)
+        frames = []
+        while True:
+            frame = self.decoder._FfmpegPipeDecoder__read_frame(stream)
+            if frame is None:
+                return frames
+            frames.append(frame.copy())
+
+    def test_rgb_frame_is_read_as_bgr(self):
+        rgb_image = numpy.zeros((2, 3, 3), numpy.uint8)
+        rgb_image[..., 0], rgb_image[..., 1], rgb_image[..., 2] = 10, 20, 30
+
+        frames = self.read_frames(pnm_frame(rgb_image))
+        self.assertEqual(len(frames), 1)
+        numpy.testing.assert_array_equal(frames[0], rgb_image[..., ::-1])
+
+    def test_resolution_change_between_frames(self):
+        first = numpy.arange(48 * 64, dtype=numpy.uint8).reshape((48, 64))
+        second = numpy.arange(24 * 32, dtype=numpy.uint8).reshape((24, 32))
+        third = numpy.full((24, 32, 3), 7, numpy.uint8)
+
+        frames = self.read_frames(pnm_frame(first) + pnm_frame(second) + pnm_frame(third) + pnm_frame(first))
+        self.assertEqual([frame.shape for frame in frames], [(48, 64), (24, 32), (24, 32, 3), (48, 64)])
+        numpy.testing.assert_array_equal(frames[1], second)
+        numpy.testing.assert_array_equal(frames[3], first)
+
+    def test_truncated_last_frame_is_dropped(self):
+        image = numpy.full((24, 32), 9, numpy.uint8)
+        rgb_image = numpy.full((24, 32, 3), 9, numpy.uint8)
+
+        self.assertEqual(len(self.read_frames(pnm_frame(image) + pnm_frame(image)[:-100])), 1)
+        self.assertEqual(len(self.read_frames(pnm_frame(rgb_image) + pnm_frame(rgb_image)[:-100])), 1)
+
+    def test_unexpected_header(self):
+        with self.assertRaises(ValueError):
+            self.read_frames(b'P3\n2 2\n255\n0 0 0')
+
+    def test_decode_video_with_resolution_change(self):
+        byte_video = make_resized_video()
+        frame_sampler = FrameSampler(byte_video, skip_frames=1, strategy=SamplingStrategies.FRAMESTEP)
+        frames = list(create_video_decoder('ffmpeg', byte_video, frame_sampler, pixel_format='gray').frames())
+
+        # ffmpeg scales frames of the new size to the size of the first frames
+        self.assertEqual(len(frames), 10)
+        self.assertEqual({frame.shape for frame in frames}, {(48, 64)})
+
+    def test_decode_cut_off_video(self):
+        byte_video = make_resized_video(sizes=('64x48',), frames_count=10)
+        byte_video = byte_video[:len(byte_video) * 2 // 3]
+        frame_sampler = FrameSampler(byte_video, skip_frames=1, strategy=SamplingStrategies.FRAMESTEP)
+        frames = list(create_video_decoder('ffmpeg', byte_video, frame_sampler).frames())
+
+        # Frames before the cut are decoded, the cut one is not returned half read
+        self.assertTrue(1 <= len(frames) < 10)
+        self.assertEqual({frame.shape for frame in frames}, {(48, 64, 3)})
+
+
+class OpenCvDecoderTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.byte_video = make_video()
+
+    def test_unknown_decoder(self):
+        with self.assertRaises(ValueError):
+            create_video_decoder('unknown', self.byte_video, FrameSampler(self.byte_video))
+
+    def test_select_samples_by_timestamp(self):
+        frame_sampler = FrameSampler(self.byte_video, seconds_between_frames=0.5,
+                                     strategy=SamplingStrategies.SELECT)
+        frames = list(create_video_decoder('opencv', self.byte_video, frame_sampler).frames())
+
+        # 5 fps: frames at 0.0, 0.6 (index 3), 1.2 (index 6) and 1.8 (index 9) seconds
+        self.assertEqual(len(frames), 4)
+        self.assertEqual(frames[0].shape, (48, 64, 3))
+        self.assertAlmostEqual(int(frames[1].mean()), 60, delta=2)
+
+    def test_framestep_gray(self):
+        frame_sampler = FrameSampler(self.byte_video, skip_frames=4, strategy=SamplingStrategies.FRAMESTEP)
+        frames = list(OpenCvDecoder(self.byte_video, frame_sampler, pixel_format='gray').frames())
+
+        self.assertEqual(len(frames), 3)
+        self.assertEqual(frames[0].shape, (48, 64))
+        self.assertAlmostEqual(int(frames[2].mean()), 160, delta=2)
+
+
+class PixelFormatTestCase(TestCase):
+    """
+    Single channel decoding gives the pixels that recognition took from the bgr24 frame
+    """
+
+    def setUp(self) -> None:
+        self.byte_video = INTEGRATION_VIDEO.read_bytes()
+
+    def decode(self, decoder_name: str, pixel_format: str) -> [numpy.ndarray]:
+        frame_sampler = FrameSampler(self.byte_video, seconds_between_frames=1, strategy=SamplingStrategies.SELECT)
+        return [frame.copy() for frame in create_video_decoder(decoder_name, self.byte_video, frame_sampler,
+                                                               pixel_format=pixel_format).frames()]
+
+    def test_same_pixels_as_bgr24(self):
+        for decoder_name in ['ffmpeg', 'opencv']:
+            bgr_frames = self.decode(decoder_name, 'bgr24')
+            blue_frames = self.decode(decoder_name, 'blue_plane')
+            gray_frames = self.decode(decoder_name, 'gray')
+            self.assertGreater(len(bgr_frames), 1)
+            self.assertEqual(len(blue_frames), len(bgr_frames))
+            self.assertEqual(len(gray_frames), len(bgr_frames))
+
+            for bgr_frame, blue_frame, gray_frame in zip(bgr_frames, blue_frames, gray_frames):
+                # OpenCV yields the bgr frame for blue_plane, recognition takes its channel itself
+                blue_plane = blue_frame if blue_frame.ndim == 2 else blue_frame[..., 0]
+                numpy.testing.assert_array_equal(blue_plane, bgr_frame[..., 0])
+                self.assertEqual(KeyframeMultiprocessingHelper().preprocess(blue_frame)[0].tobytes(),
+                                 KeyframeMultiprocessingHelper().preprocess(bgr_frame)[0].tobytes())
+
+                # ffmpeg rounds the gray conversion its own way, a pixel may be one step off
+                difference = numpy.abs(gray_frame.astype(int) - cv2.cvtColor(bgr_frame, cv2.COLOR_BGR2GRAY))
+                self.assertLessEqual(difference.max(), 1)
+                self.assertLess(numpy.count_nonzero(difference) / difference.size, 0.001)
+
+
+class ProbeVideoTimelineTestCase(TestCase):
+
+    def test_timeline(self):
+        self.assertEqual(probe_video_timeline(make_video(frames_count=10, fps=5)), (2.0, 10))
+
+    def test_invalid_video(self):
+        self.assertEqual(probe_video_timeline(b'not a video'), (0.0, 0))
@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+import cv2
+import numpy
+
+from service.conqueror.core.deduplication import FrameDeduplicator
+
+
+def screen(text='', cursor=(100, 100)) -> numpy.ndarray:
+    frame = numpy.full((720, 1280, 3), 230, numpy.uint8)
+    cv2.putText(frame, 'Settings', (40, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (20, 20, 20), 2)
+    if text:
+        cv2.putText(frame, text, (40, 400), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (20, 20, 20), 1)
+    x, y = cursor
+    cv2.rectangle(frame, (x, y), (x + 12, y + 19), (0, 0, 0), -1)
+    return frame
+
+
+class FrameDeduplicatorTestCase(TestCase):
+
+    def test_same_frame_and_cursor_move_are_skipped(self):
+        frame_deduplicator = FrameDeduplicator()
+
+        self.assertFalse(frame_deduplicator.is_duplicate(screen()))
+        self.assertTrue(frame_deduplicator.is_duplicate(screen()))
+        self.assertTrue(frame_deduplicator.is_duplicate(screen(cursor=(600, 300))))
+        self.assertEqual(frame_deduplicator.statistics(), {'frames': 3, 'skipped': 2})
+
+    def test_new_text_line_is_not_skipped(self):
+        frame_deduplicator = FrameDeduplicator()
+
+        self.assertFalse(frame_deduplicator.is_duplicate(screen()))
+        self.assertFalse(frame_deduplicator.is_duplicate(screen(text='Error: connection refused')))
+        self.assertFalse(frame_deduplicator.is_duplicate(screen(text='Failed')))
+
+    def test_single_channel_frames_and_resolution_change(self):
+        frame_deduplicator = FrameDeduplicator()
+
+        self.assertFalse(frame_deduplicator.is_duplicate(screen()[..., 0]))
+        self.assertTrue(frame_deduplicator.is_duplicate(screen()[..., 0].copy()))
+        self.assertFalse(frame_deduplicator.is_duplicate(numpy.full((480, 640), 230, numpy.uint8)))
@@ -0,0 +1,107 @@
+from unittest import TestCase
+
+import numpy
+
+from service.conqueror.core.dirty_regions import DirtyRegionTracker, RecognitionCache, RegionReorderBuffer, \
+    merge_overlapping_regions
+from service.conqueror.core.recognition_data import from_dict
+
+
+def words(*boxes_and_texts, block_num=1) -> dict:
+    recognition_data = {'block_num': [], 'conf': [], 'left': [], 'top': [], 'width': [], 'height': [], 'text': []}
+    for (left, top, width, height), text in boxes_and_texts:
+        recognition_data['block_num'].append(block_num)
+        recognition_data['conf'].append(90)
+        recognition_data['left'].append(left)
+        recognition_data['top'].append(top)
+        recognition_data['width'].append(width)
+        recognition_data['height'].append(height)
+        recognition_data['text'].append(text)
+    return from_dict(recognition_data)
+
+
+class DirtyRegionTrackerTestCase(TestCase):
+
+    def test_changed_regions(self):
+        tracker = DirtyRegionTracker(padding=4)
+        image = numpy.full((200, 300), 255, numpy.uint8)
+
+        self.assertEqual(tracker.changed_regions(0, image), [(0, 0, 300, 200)])
+        self.assertEqual(tracker.changed_regions(0, image.copy()), [])
+
+        changed_image = image.copy()
+        changed_image[100:110, 50:90] = 0
+        self.assertEqual(tracker.changed_regions(0, changed_image), [(46, 96, 48, 18)])
+
+        self.assertEqual(tracker.statistics()['unchanged'], 1)
+
+    def test_big_change_recognizes_whole_image(self):
+        tracker = DirtyRegionTracker(padding=4)
+        image = numpy.full((200, 300), 255, numpy.uint8)
+        tracker.changed_regions(0, image)
+
+        self.assertEqual(tracker.changed_regions(0, 255 - image), [(0, 0, 300, 200)])
+
+    def test_images_are_tracked_separately(self):
+        tracker = DirtyRegionTracker(padding=4)
+        image = numpy.full((200, 300), 255, numpy.uint8)
+        tracker.changed_regions(0, image)
+
+        self.assertEqual(tracker.changed_regions(1, 255 - image), [(0, 0, 300, 200)])
+
+
+class RecognitionCacheTestCase(TestCase):
+
+    def test_changed_region_words_replace_cached_words(self):
+        cache = RecognitionCache()
+        cache.merge(0, [(0, 0, 300, 200)], [words(((10, 10, 40, 10), 'Settings'), ((10, 100, 40, 10), 'Loading'))])
+
+        page = cache.merge(0, [(0, 90, 300, 30)], [words(((10, 10, 30, 10), 'Error'), ((45, 10, 30, 10), 'occurred'))])
+
+        self.assertEqual(page['text'].tolist(), ['Settings', 'Error', 'occurred'])
+        self.assertEqual(page['top'].tolist(), [10, 100, 100])
+        # Words of the crop get their own block, not the cached block with the same number
+        self.assertNotEqual(page['block_num'][0], page['block_num'][1])
+        self.assertEqual(page['block_num'][1], page['block_num'][2])
+
+    def test_cleared_region_words_are_dropped(self):
+        cache = RecognitionCache()
+        cache.merge(0, [(0, 0, 300, 200)], [words(((10, 10, 40, 10), 'Settings'), ((10, 100, 40, 10), 'Loading'))])
+
+        page = cache.merge(0, [], [], cleared_regions=[(0, 90, 300, 30)])
+
+        self.assertEqual(page['text'].tolist(), ['Settings'])
+
+
+class MergeOverlappingRegionsTestCase(TestCase):
+
+    def test_merge_overlapping_regions(self):
+        regions = [(0, 0, 10, 10), (50, 50, 10, 10), (5, 5, 10, 10), (14, 14, 40, 40)]
+
+        self.assertEqual(merge_overlapping_regions(regions), [(0, 0, 60, 60)])
+        self.assertEqual(merge_overlapping_regions([(0, 0, 10, 10), (10, 0, 10, 10)]), [(0, 0, 10, 10), (10, 0, 10, 10)])
+
+
+class RegionReorderBufferTestCase(TestCase):
+
+    def test_images_are_released_in_frame_order(self):
+        reorder_buffer = RegionReorderBuffer()
+        reorder_buffer.register(0, 0, [(0, 0, 10, 10), (20, 0, 10, 10)])
+        reorder_buffer.register(1, 0, [(0, 0, 10, 10)])
+
+        self.assertEqual(reorder_buffer.add(1, 0, 0, 'frame 1'), [])
+        self.assertEqual(reorder_buffer.add(0, 0, 1, 'frame 0 region 1'), [])
+
+        completed = reorder_buffer.add(0, 0, 0, 'frame 0 region 0')
+        self.assertEqual([regions_data for _, _, regions_data, _ in completed],
+                         [['frame 0 region 0', 'frame 0 region 1'], ['frame 1']])
+
+    def test_image_without_regions_is_released_in_order(self):
+        reorder_buffer = RegionReorderBuffer()
+        reorder_buffer.register(0, 0, [(0, 0, 10, 10)])
+        reorder_buffer.register(1, 0, [], cleared_regions=[(0, 0, 10, 10)])
+        reorder_buffer.register(2, 0, [(0, 0, 10, 10)])
+
+        completed = reorder_buffer.add(0, 0, 0, 'frame 0')
+        self.assertEqual([(regions_data, cleared_regions) for _, _, regions_data, cleared_regions in completed],
+                         [(['frame 0'], ()), ([], [(0, 0, 10, 10)])])
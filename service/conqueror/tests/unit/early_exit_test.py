@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from service.conqueror.core.early_exit import EarlyExitConditions, EarlyExitPolicy
+
+
+class EarlyExitPolicyTestCase(TestCase):
+
+    def test_disabled_without_conditions(self):
+        policy = EarlyExitPolicy([])
+
+        self.assertFalse(policy.is_met(0, {'example.com': True}, {'Error': True}, {'Error: refused'}))
+        self.assertFalse(policy.has_exited)
+        self.assertEqual(policy.checks_count, 0)
+
+    def test_all_rules_found(self):
+        policy = EarlyExitPolicy([EarlyExitConditions.ALL_RULES_FOUND])
+
+        self.assertFalse(policy.is_met(0, {'example.com': True}, {'Error': False}, set()))
+        self.assertTrue(policy.is_met(3, {'example.com': True}, {'Error': True}, set()))
+        self.assertEqual(policy.statistics(), {'conditions': ['all_rules_found'], 'checks': 2, 'exited': True,
+                                               'exit_frame': 3})
+
+    def test_phrase_only_job_does_not_stop_on_all_rules_found(self):
+        policy = EarlyExitPolicy([EarlyExitConditions.ALL_RULES_FOUND])
+
+        self.assertFalse(policy.is_met(0, {}, {}, set()))
+        self.assertFalse(policy.is_met(1, {}, {}, {'Error: refused'}))
+        self.assertFalse(policy.has_exited)
+
+    def test_every_condition_must_hold(self):
+        policy = EarlyExitPolicy([EarlyExitConditions.ALL_RULES_FOUND, EarlyExitConditions.PHRASE_LINES_FOUND],
+                                 min_found_lines=2)
+
+        self.assertFalse(policy.is_met(0, {}, {'Error': True}, {'Error: refused'}))
+        self.assertTrue(policy.is_met(1, {}, {'Error': True}, {'Error: refused', 'Exception in thread'}))
+
+    def test_unknown_condition(self):
+        with self.assertRaises(ValueError):
+            EarlyExitPolicy(['first_frame'])
@@ -0,0 +1,72 @@
+import io
+from unittest import TestCase
+
+import numpy
+
+from service.conqueror.core.frame_buffers import FrameBufferPool, read_into
+
+
+class ChunkedStream(io.RawIOBase):
+    """
+    Returns at most chunk_size bytes per read, like a pipe
+    """
+
+    def __init__(self, data: bytes, chunk_size: int):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self.data[self.position:self.position + min(len(buffer), self.chunk_size)]
+        buffer[:len(chunk)] = chunk
+        self.position += len(chunk)
+        return len(chunk)
+
+
+class FrameBufferPoolTestCase(TestCase):
+
+    def test_released_buffer_is_reused(self):
+        pool = FrameBufferPool(2)
+        frame = pool.acquire((4, 6))
+        pool.release(frame)
+
+        self.assertTrue(numpy.shares_memory(pool.acquire((4, 6)), frame))
+        self.assertEqual(pool.statistics(), {'allocated': 1, 'reused': 1})
+
+    def test_buffers_are_dropped_on_resolution_change(self):
+        pool = FrameBufferPool(2)
+        frame = pool.acquire((4, 6))
+        pool.release(frame)
+
+        self.assertEqual(pool.acquire((8, 6)).shape, (8, 6))
+        pool.release(frame)
+        self.assertEqual(pool.statistics(), {'allocated': 2, 'reused': 0})
+
+    def test_foreign_and_surplus_frames_are_not_kept(self):
+        pool = FrameBufferPool(1)
+        frames = [pool.acquire((4, 6)) for _ in range(2)]
+        pool.release(numpy.zeros((4, 6), numpy.uint8))
+        for frame in frames:
+            pool.release(frame)
+
+        pool.acquire((4, 6))
+        pool.acquire((4, 6))
+        self.assertEqual(pool.statistics(), {'allocated': 3, 'reused': 1})
+
+
+class ReadIntoTestCase(TestCase):
+
+    def test_short_reads_fill_the_frame(self):
+        data = bytes(range(24))
+        frame = numpy.empty((4, 6), numpy.uint8)
+
+        self.assertEqual(read_into(ChunkedStream(data, 5), frame), 24)
+        self.assertEqual(frame.tobytes(), data)
+
+    def test_truncated_stream(self):
+        frame = numpy.empty((4, 6), numpy.uint8)
+
+        self.assertEqual(read_into(ChunkedStream(bytes(10), 4), frame), 10)
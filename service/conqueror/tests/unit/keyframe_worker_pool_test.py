@@ -0,0 +1,136 @@
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy
+
+from service.conqueror.core.keyframe_multipocessing_helper import URL_STRIP_IMAGE_KEY
+from service.conqueror.core.keyframe_worker_pool import KeyframeWorkerPool, OcrWorkerException
+from service.conqueror.core.pipeline import PipelineStoppedException
+
+BROKEN_IMAGE_VALUE = 255
+SLOW_IMAGE_VALUE = 254
+
+
+class StubFrameProcessor:
+    """
+    Recognizes an image as the sum of its pixels, the workers are forked with it
+    """
+    ocr_batching = False
+
+    def __init__(self, url_search_keys={}, text_search_keys={}, key_phrases=[], recognition_settings={}):
+        pass
+
+    def recognize(self, image):
+        if image.flat[0] == BROKEN_IMAGE_VALUE:
+            raise ValueError('unreadable image')
+        if image.flat[0] == SLOW_IMAGE_VALUE:
+            time.sleep(10)
+        return {'sum': int(image.sum())}
+
+    def recognize_url_strip(self, image):
+        return {'strip_sum': int(image.sum())}
+
+    def worker_statistics(self):
+        return {'text_scale': {'images': 1}}
+
+
+def image_of(shape, value):
+    return numpy.full(shape, value, dtype=numpy.uint8)
+
+
+@patch('service.conqueror.core.keyframe_worker_pool.KeyframeMultiprocessingHelper', StubFrameProcessor)
+class KeyframeWorkerPoolTestCase(TestCase):
+
+    def test_bigger_image_reallocates_the_ring(self):
+        worker_pool = KeyframeWorkerPool(1)
+        try:
+            self.assertTrue(worker_pool.submit(0, URL_STRIP_IMAGE_KEY, image_of((32, 640), 1)))
+            self.assertTrue(worker_pool.submit(0, 0, image_of((480, 640), 1)))
+        finally:
+            # Drains the queued tasks
+            worker_pool.cancel()
+
+        self.assertEqual(worker_pool.statistics()['shared_memory_reallocations'], 1)
+        self.assertEqual(worker_pool.statistics()['pickled_images'], 0)
+
+    def test_images_of_replaced_ring_are_recognized(self):
+        images = [image_of((8, 8), 1), image_of((64, 64), 2), image_of((8, 8), 3), image_of((256, 64), 4)]
+        with KeyframeWorkerPool(2) as worker_pool:
+            submitter = threading.Thread(target=self.__submit_all, args=(worker_pool, images))
+            submitter.start()
+            results = sorted(worker_pool.results(), key=lambda result: result[0])
+            submitter.join()
+
+        self.assertEqual([recognition_data['sum'] for _, _, recognition_data in results],
+                         [int(image.sum()) for image in images])
+        self.assertEqual(worker_pool.statistics()['shared_memory_reallocations'], 2)
+
+    @staticmethod
+    def __submit_all(worker_pool: KeyframeWorkerPool, images):
+        for frame_index, image in enumerate(images):
+            worker_pool.submit(frame_index, 0, image)
+        worker_pool.finish()
+
+    def test_results_of_every_image(self):
+        images = [image_of((16, 16), value) for value in range(1, 7)]
+        with KeyframeWorkerPool(2) as worker_pool:
+            submitter = threading.Thread(target=self.__submit_all, args=(worker_pool, images))
+            submitter.start()
+            results = list(worker_pool.results())
+            submitter.join()
+
+        self.assertEqual(sorted((frame_index, recognition_data['sum']) for frame_index, _, recognition_data in results),
+                         [(frame_index, int(image.sum())) for frame_index, image in enumerate(images)])
+        self.assertEqual(worker_pool.statistics()['items'], 6)
+        # Results end with the statistics of every worker
+        self.assertEqual(worker_pool.worker_statistics, {'text_scale': {'images': 2}})
+
+    def test_url_strip_is_recognized_as_strip(self):
+        with KeyframeWorkerPool(1) as worker_pool:
+            worker_pool.submit(3, URL_STRIP_IMAGE_KEY, image_of((32, 64), 1))
+            worker_pool.finish()
+            results = list(worker_pool.results())
+
+        self.assertEqual(results, [(3, URL_STRIP_IMAGE_KEY, {'strip_sum': 32 * 64})])
+
+    def test_worker_error_is_raised(self):
+        with self.assertRaisesRegex(OcrWorkerException, 'frame 1 recognition failed - ValueError: unreadable image'):
+            with KeyframeWorkerPool(1) as worker_pool:
+                worker_pool.submit(1, 0, image_of((16, 16), BROKEN_IMAGE_VALUE))
+                worker_pool.finish()
+                list(worker_pool.results())
+
+        self.assertEqual(worker_pool.processes, [])
+
+    def test_cancel_drops_queued_images(self):
+        worker_pool = KeyframeWorkerPool(1)
+        worker_pool.start()
+        for frame_index in range(3):
+            # The first one is being recognized, two wait in the queue
+            worker_pool.submit(frame_index, 0, image_of((16, 16), SLOW_IMAGE_VALUE))
+
+        started = time.monotonic()
+        worker_pool.cancel()
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(worker_pool.cancelled_count, 3)
+        self.assertEqual(worker_pool.processes, [])
+        self.assertIsNone(worker_pool.shared_frame_ring)
+
+    def test_finish_stops_on_full_queue(self):
+        stop_event = threading.Event()
+        worker_pool = KeyframeWorkerPool(1, stop_event=stop_event)
+        worker_pool.submit(0, 0, image_of((16, 16), 1))
+        worker_pool.submit(1, 0, image_of((16, 16), 1))
+        # A worker that died leaves the queue full
+        worker_pool.processes = [None]
+        threading.Timer(0.2, stop_event.set).start()
+
+        try:
+            with self.assertRaises(PipelineStoppedException):
+                worker_pool.finish()
+        finally:
+            worker_pool.processes = []
+            worker_pool.cancel()
@@ -37,14 +37,15 @@ class ProcessRequestTestCase(TestCase):
         test_settings = {'test_key': 'test_value'}
         process_request(test_data, test_settings)
 
-        process_video_function.assert_called_once_with(test_data, test_settings)
+        process_video_function.assert_called_once_with(test_data, test_settings, checkpoint=None,
+                                                       checkpoint_callback=None)
 
     @patch('service.conqueror.managers.process_video')
     def test_process_request_without_recognition_settings(self, process_video_function: NonCallableMock):
         test_data = json.dumps({'test_data_key': 'test_data_value'})
         process_request(test_data)
 
-        process_video_function.assert_called_once_with(test_data, {})
+        process_video_function.assert_called_once_with(test_data, {}, checkpoint=None, checkpoint_callback=None)
 
 
 class ProcessVideoTestCase(TestCase):
@@ -57,7 +58,8 @@ class ProcessVideoTestCase(TestCase):
         self.process_video_expected_result_data = {
             'SearchPhrasesFound': self.process_keyframe_result_data[0],
             'URLContainsResults': self.process_keyframe_result_data[1],
-            'TextContainsResults': self.process_keyframe_result_data[2]
+            'TextContainsResults': self.process_keyframe_result_data[2],
+            'Coverage': 1.0
         }
 
     @patch.object(KeyFrameFinder, 'process_keyframes',
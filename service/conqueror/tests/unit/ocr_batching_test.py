@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+import numpy
+
+from service.conqueror.core.ocr_batching import group_images, split_recognition_data, stitch_images
+from service.conqueror.core.recognition_data import from_dict
+
+
+class OcrBatchingTestCase(TestCase):
+
+    def test_group_images(self):
+        images = [numpy.zeros((40, 100), numpy.uint8) for _ in range(3)] + [numpy.zeros((40, 100, 3), numpy.uint8)]
+
+        self.assertEqual(group_images(images, max_canvas_pixels=10 ** 6, margin=10), [[0, 1, 2], [3]])
+        # Two bands of 120x60 fit, the third one doesn't
+        self.assertEqual(group_images(images, max_canvas_pixels=120 * 120, margin=10), [[0, 1], [2], [3]])
+
+    def test_stitch_images(self):
+        light_image = numpy.full((40, 100), 200, numpy.uint8)
+        light_image[10:20, 10:50] = 0
+        dark_image = numpy.full((30, 60), 20, numpy.uint8)
+        dark_image[10:20, 10:50] = 240
+
+        canvas, placements = stitch_images([light_image, dark_image], margin=10)
+
+        self.assertEqual(canvas.shape, (40 + 30 + 4 * 10, 120))
+        self.assertEqual(placements, [(10, 10, 100, 40), (10, 70, 60, 30)])
+        # Both images are dark text on a white background
+        self.assertEqual(canvas[0, 0], 255)
+        self.assertEqual(canvas[15, 15], 255)
+        self.assertEqual(canvas[25, 25], 0)
+        self.assertEqual(canvas[75, 15], 255)
+        self.assertEqual(canvas[85, 25], 16)
+
+    def test_split_recognition_data(self):
+        placements = [(10, 10, 100, 40), (10, 70, 60, 30)]
+        recognition_data = from_dict({
+            'level': [1, 5, 5],
+            'block_num': [0, 1, 2],
+            'conf': [-1, 90, 80],
+            'left': [0, 15, 20],
+            'top': [0, 20, 75],
+            'width': [120, 50, 30],
+            'height': [110, 12, 12],
+            'text': ['', 'Error', 'refused'],
+        })
+
+        first, second = split_recognition_data(recognition_data, placements, margin=10)
+
+        self.assertEqual(first['text'].tolist(), ['', 'Error'])
+        self.assertEqual(first['left'].tolist(), [0, 5])
+        self.assertEqual(first['top'].tolist(), [0, 10])
+        self.assertEqual(second['text'].tolist(), ['refused'])
+        self.assertEqual(second['block_num'].tolist(), [2])
+        self.assertEqual(second['left'].tolist(), [10])
+        self.assertEqual(second['top'].tolist(), [5])
+        self.assertEqual(second['level'].tolist(), [5])
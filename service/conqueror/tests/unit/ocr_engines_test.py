@@ -0,0 +1,90 @@
+import os
+import sys
+import tempfile
+import threading
+from multiprocessing.connection import Listener
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy
+
+from service.conqueror.core.ocr_engines import create_ocr_engine, ENGINE_TIMEOUT_ERROR, OcrEngines, \
+    OcrServerEngine, OcrServerException, PageSegmentationModes, PytesseractEngine
+
+
+class OcrEnginesTestCase(TestCase):
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            create_ocr_engine('unknown')
+
+    def test_pytesseract_fallback_without_tesserocr(self):
+        with patch.dict(sys.modules, {'tesserocr': None}):
+            engine = create_ocr_engine(OcrEngines.TESSEROCR)
+
+        self.assertIsInstance(engine, PytesseractEngine)
+
+    def test_local_engine_without_server(self):
+        with patch.dict(sys.modules, {'tesserocr': None}):
+            engine = create_ocr_engine(OcrEngines.SERVER, server_socket='/nonexistent/ocr.sock')
+
+        self.assertIsInstance(engine, PytesseractEngine)
+
+    def test_pytesseract_page_segmentation_mode(self):
+        image = numpy.full((32, 320), 255, numpy.uint8)
+        with patch('service.conqueror.core.ocr_engines.pytesseract.image_to_data') as image_to_data:
+            image_to_data.return_value = ''
+            PytesseractEngine().image_to_data(image, page_segmentation_mode=PageSegmentationModes.SINGLE_LINE)
+            PytesseractEngine().image_to_data(image)
+
+        self.assertIn('--psm 7', image_to_data.call_args_list[0].kwargs['config'])
+        self.assertNotIn('--psm', image_to_data.call_args_list[1].kwargs['config'])
+
+
+class OcrServerEngineTestCase(TestCase):
+
+    def answer_with(self, replies, requests=None):
+        """
+        Server that answers every request with the next reply, the requests are appended to requests
+        """
+        socket_path = os.path.join(tempfile.mkdtemp(), 'ocr.sock')
+        listener = Listener(socket_path, family='AF_UNIX')
+
+        def serve():
+            with listener.accept() as connection:
+                for reply in replies:
+                    request = connection.recv()
+                    if requests is not None:
+                        requests.append(request)
+                    connection.send(reply)
+            listener.close()
+
+        threading.Thread(target=serve, daemon=True).start()
+        return socket_path
+
+    def test_engine_timeout_is_recognized_locally(self):
+        local_recognition_data = {'text': numpy.array(['local'], dtype=object)}
+        engine = OcrServerEngine(self.answer_with([(None, ENGINE_TIMEOUT_ERROR), ({'text': 'server'}, None)]))
+        with patch('service.conqueror.core.ocr_engines.create_ocr_engine') as create_local_engine:
+            create_local_engine.return_value.image_to_data.return_value = local_recognition_data
+            image = numpy.zeros((8, 8), numpy.uint8)
+
+            self.assertIs(engine.image_to_data(image), local_recognition_data)
+            # The next image goes to the server again
+            self.assertEqual(engine.image_to_data(image), {'text': 'server'})
+        engine.close()
+
+    def test_recognition_error_is_raised(self):
+        engine = OcrServerEngine(self.answer_with([(None, 'RuntimeError: bad image')]))
+        with self.assertRaises(OcrServerException):
+            engine.image_to_data(numpy.zeros((8, 8), numpy.uint8))
+        engine.close()
+
+    def test_requests_carry_the_job_id(self):
+        requests = []
+        engine = OcrServerEngine(self.answer_with([({'text': 'server'}, None)], requests), job_id='job 1')
+        engine.image_to_data(numpy.zeros((8, 8), numpy.uint8), PageSegmentationModes.SINGLE_LINE)
+        engine.close()
+
+        job_id, _, page_segmentation_mode = requests[0]
+        self.assertEqual((job_id, page_segmentation_mode), ('job 1', PageSegmentationModes.SINGLE_LINE))
@@ -0,0 +1,113 @@
+import os
+import signal
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy
+
+from service.conqueror.core.ocr_engines import ENGINE_TIMEOUT_ERROR, PageSegmentationModes
+from service.conqueror.core.ocr_server import FairRequestQueue, OcrServer
+
+SLOW_IMAGE_VALUE = 254
+
+
+class EchoEngine:
+    """
+    Answers with the sum of the image pixels and the page segmentation mode, the engines are forked with it
+    """
+
+    def __init__(self, ocr_engine_name):
+        pass
+
+    def image_to_data(self, image, page_segmentation_mode=None):
+        if image.flat[0] == SLOW_IMAGE_VALUE:
+            time.sleep(10)
+        return {'sum': int(image.sum()), 'page_segmentation_mode': page_segmentation_mode}
+
+    def close(self):
+        pass
+
+
+class FairRequestQueueTestCase(TestCase):
+
+    def test_jobs_take_turns(self):
+        requests = FairRequestQueue()
+        for request in range(4):
+            requests.put('long job', f'long {request}')
+        requests.put('short job', 'short 0')
+
+        self.assertEqual(requests.get_batch(3), ['long 0', 'short 0', 'long 1'])
+        self.assertEqual(requests.get_batch(3), ['long 2', 'long 3'])
+
+    def test_empty_queue_timeout(self):
+        self.assertEqual(FairRequestQueue().get_batch(3, timeout=0.1), [])
+
+
+@patch('service.conqueror.core.ocr_server.create_ocr_engine', EchoEngine)
+class OcrServerTestCase(TestCase):
+
+    def start_server(self, **kwargs) -> OcrServer:
+        socket_path = os.path.join(tempfile.mkdtemp(), 'ocr.sock')
+        server = OcrServer(socket_path, 1, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(self.stop_server, server)
+
+        started = time.monotonic()
+        while not os.path.exists(socket_path) and time.monotonic() - started < 10:
+            time.sleep(0.05)
+        return server
+
+    @staticmethod
+    def stop_server(server: OcrServer):
+        server.stop()
+        # Wakes up the listener, it exits as the server is stopped
+        try:
+            Client(server.socket_path, family='AF_UNIX').close()
+        except OSError:
+            pass
+
+    @staticmethod
+    def request(server: OcrServer, image: numpy.ndarray, timeout: float, page_segmentation_mode=None):
+        with Client(server.socket_path, family='AF_UNIX') as connection:
+            connection.send(('job', image, page_segmentation_mode))
+            if not connection.poll(timeout):
+                raise TimeoutError('no answer from the OCR server')
+            return connection.recv()
+
+    def test_request_is_recognized(self):
+        server = self.start_server()
+        image = numpy.ones((8, 8), numpy.uint8)
+
+        self.assertEqual(self.request(server, image, timeout=10,
+                                      page_segmentation_mode=PageSegmentationModes.SINGLE_LINE),
+                         ({'sum': 64, 'page_segmentation_mode': PageSegmentationModes.SINGLE_LINE}, None))
+
+    def test_unanswered_request_gets_timeout_error(self):
+        # The engine takes longer than the reply timeout
+        server = self.start_server(reply_timeout_seconds=0.2)
+
+        self.assertEqual(self.request(server, numpy.full((8, 8), SLOW_IMAGE_VALUE, numpy.uint8), timeout=5),
+                         (None, ENGINE_TIMEOUT_ERROR))
+        self.assertEqual(server.timed_out_requests_count, 1)
+
+    def test_crashed_engine_is_started_again(self):
+        server = self.start_server(batch_size=1, reply_timeout_seconds=1)
+        with Client(server.socket_path, family='AF_UNIX') as connection:
+            connection.send(('job', numpy.full((8, 8), SLOW_IMAGE_VALUE, numpy.uint8), None))
+            time.sleep(0.5)
+            # The engine dies while it recognizes the image
+            os.kill(server.processes[0].pid, signal.SIGKILL)
+            self.assertTrue(connection.poll(10))
+            self.assertEqual(connection.recv(), (None, ENGINE_TIMEOUT_ERROR))
+
+        started = time.monotonic()
+        while server.restarted_engines_count == 0 and time.monotonic() - started < 10:
+            time.sleep(0.1)
+        self.assertEqual(server.restarted_engines_count, 1)
+
+        self.assertEqual(self.request(server, numpy.ones((8, 8), numpy.uint8), timeout=10),
+                         ({'sum': 64, 'page_segmentation_mode': None}, None))
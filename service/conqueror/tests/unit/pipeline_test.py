@@ -0,0 +1,118 @@
+import threading
+from unittest import TestCase
+
+from service.conqueror.core.pipeline import StageQueue, PipelineStage, PipelineStoppedException, PipelineDeadline, \
+    FrameProgress
+
+
+class StageQueueTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.stop_event = threading.Event()
+
+    def test_put_get_statistics(self):
+        stage_queue = StageQueue('test', 2, self.stop_event)
+        stage_queue.put(1)
+        stage_queue.put(2)
+
+        self.assertEqual(stage_queue.get(), 1)
+        self.assertEqual(stage_queue.get(), 2)
+
+        statistics = stage_queue.statistics()
+        self.assertEqual(statistics['items'], 2)
+        self.assertEqual(statistics['capacity'], 2)
+        self.assertEqual(statistics['max_depth'], 1)
+
+    def test_put_on_full_queue_stops_with_pipeline(self):
+        stage_queue = StageQueue('test', 1, self.stop_event)
+        stage_queue.put(1)
+        threading.Timer(0.2, self.stop_event.set).start()
+
+        with self.assertRaises(PipelineStoppedException):
+            stage_queue.put(2)
+
+        self.assertGreater(stage_queue.statistics()['put_stall_seconds'], 0)
+
+    def test_get_on_empty_queue_stops_with_pipeline(self):
+        stage_queue = StageQueue('test', 1, self.stop_event)
+        threading.Timer(0.2, self.stop_event.set).start()
+
+        with self.assertRaises(PipelineStoppedException):
+            stage_queue.get()
+
+
+class PipelineStageTestCase(TestCase):
+
+    def test_stage_exception_stops_pipeline(self):
+        stop_event = threading.Event()
+
+        def failing_stage():
+            raise ValueError('test')
+
+        stage = PipelineStage('test', failing_stage, stop_event)
+        stage.start()
+        stage.join()
+
+        self.assertTrue(stop_event.is_set())
+        with self.assertRaises(ValueError):
+            stage.raise_if_failed()
+
+    def test_stopped_stage_is_not_failed(self):
+        stop_event = threading.Event()
+        stage_queue = StageQueue('test', 1, stop_event)
+        stop_event.set()
+
+        stage = PipelineStage('test', stage_queue.get, stop_event)
+        stage.start()
+        stage.join()
+
+        stage.raise_if_failed()
+
+
+class PipelineDeadlineTestCase(TestCase):
+
+    def test_deadline_stops_pipeline(self):
+        stop_event = threading.Event()
+        deadline = PipelineDeadline(0.1, stop_event)
+        deadline.start()
+
+        self.assertTrue(stop_event.wait(2))
+        self.assertTrue(deadline.is_reached)
+
+    def test_cancelled_deadline(self):
+        stop_event = threading.Event()
+        deadline = PipelineDeadline(0.1, stop_event)
+        deadline.start()
+        deadline.cancel()
+
+        self.assertFalse(stop_event.wait(0.3))
+        self.assertFalse(deadline.is_reached)
+
+
+class FrameProgressTestCase(TestCase):
+
+    def test_frames_are_processed_in_order(self):
+        frame_progress = FrameProgress()
+        for frame_index in range(3):
+            frame_progress.add_task(frame_index)
+            frame_progress.add_task(frame_index)
+            frame_progress.frame_submitted(frame_index)
+
+        frame_progress.task_done(1)
+        frame_progress.task_done(1)
+        frame_progress.task_done(0)
+        self.assertEqual(frame_progress.processed_frames_count, 0)
+
+        frame_progress.task_done(0)
+        self.assertEqual(frame_progress.processed_frames_count, 2)
+
+    def test_frame_without_tasks(self):
+        frame_progress = FrameProgress()
+        frame_progress.add_task(0)
+        frame_progress.frame_submitted(0)
+        # A duplicate frame, nothing is recognized
+        frame_progress.frame_submitted(1)
+        self.assertEqual(frame_progress.processed_frames_count, 0)
+
+        frame_progress.task_done(0)
+        self.assertEqual(frame_progress.processed_frames_count, 2)
@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+import numpy
+from pytesseract import pytesseract
+
+from service.conqueror.core.recognition_data import KEYS, concatenate, first_occurrence_ranks, from_dict, \
+    join_blocks, parse_tsv, select
+
+TSV = ('level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext\n'
+       '1\t1\t0\t0\t0\t0\t0\t0\t640\t480\t-1\t\n'
+       '5\t1\t1\t1\t1\t1\t12\t20\t48\t14\t96.512345\tError:\n'
+       '5\t1\t1\t1\t1\t2\t64\t20\t90\t14\t91.000000\tconnection\n'
+       '5\t1\t2\t1\t1\t1\t12\t60\t40\t14\t35.250000\trefused\n')
+
+
+class RecognitionDataTestCase(TestCase):
+
+    def test_parse_tsv_as_pytesseract(self):
+        recognition_data = parse_tsv(TSV)
+        expected = pytesseract.file_to_dict(TSV, '\t', -1)
+
+        self.assertEqual(list(recognition_data.keys()), KEYS)
+        for key in KEYS:
+            if key == 'conf':
+                # pytesseract drops the fraction
+                self.assertEqual(numpy.trunc(recognition_data[key]).astype(int).tolist(), expected[key])
+            else:
+                self.assertEqual(recognition_data[key].tolist(), expected[key])
+        self.assertEqual(recognition_data['left'].dtype, numpy.int32)
+
+    def test_parse_tsv_without_header_and_text(self):
+        recognition_data = parse_tsv(TSV.split('\n', 1)[1].rstrip('\n\t'))
+
+        self.assertEqual(recognition_data['text'].tolist(), ['', 'Error:', 'connection', 'refused'])
+
+    def test_parse_empty_tsv(self):
+        recognition_data = parse_tsv('')
+
+        self.assertEqual(len(recognition_data['text']), 0)
+        self.assertEqual(recognition_data['conf'].dtype, numpy.float32)
+
+    def test_select_and_concatenate(self):
+        recognition_data = parse_tsv(TSV)
+        words = select(recognition_data, recognition_data['level'] == 5)
+
+        self.assertEqual(words['text'].tolist(), ['Error:', 'connection', 'refused'])
+        self.assertEqual(concatenate([words, words])['top'].tolist(), [20, 20, 60, 20, 20, 60])
+
+    def test_first_occurrence_ranks(self):
+        self.assertEqual(first_occurrence_ranks(numpy.array([7, 3, 7, 5])).tolist(), [0, 1, 0, 2])
+
+    def test_join_blocks(self):
+        recognition_data = from_dict({'block_num': [4, 2, 4, 2, 9], 'text': ['Error:', 'File', 'refused', 'Edit', '']})
+
+        self.assertEqual(join_blocks(recognition_data['block_num'], recognition_data['text']),
+                         ['Error: refused', 'File Edit', ''])
+        self.assertEqual(join_blocks(numpy.array([], numpy.int32), numpy.array([], object)), [])
@@ -0,0 +1,113 @@
+import random
+import string
+from unittest import TestCase
+
+from fuzzywuzzy import fuzz
+
+from service.conqueror.core.rule_matcher import AhoCorasickAutomaton, BlockMatchCache, RuleMatcher
+
+WORDS = ['error', 'failed', 'connection', 'refused', 'timeout', 'Exception', 'Traceback', 'denied', 'access',
+         'server', 'https://example.com/login', '404', 'not', 'found']
+
+
+def matches_every_rule(rules, text, similarity, case_sensitive):
+    # The check that compiled rules replace
+    return sorted(rule for rule in rules
+                  if len(text) + 5 >= len(rule)
+                  and ((rule in text if case_sensitive else rule.lower() in text.lower())
+                       or fuzz.partial_ratio(rule, text) >= similarity))
+
+
+def noisy_word(word, random_generator):
+    characters = list(word)
+    for _ in range(random_generator.randint(0, 3)):
+        characters[random_generator.randrange(len(characters))] = random_generator.choice(string.ascii_letters)
+    return ''.join(characters)
+
+
+class AhoCorasickAutomatonTestCase(TestCase):
+
+    def test_overlapping_patterns(self):
+        automaton = AhoCorasickAutomaton(['he', 'she', 'his', 'hers', 'is'])
+
+        self.assertEqual(automaton.find('ushers'), {0, 1, 3})
+        self.assertEqual(automaton.find('this'), {2, 4})
+        self.assertEqual(automaton.find('xyz'), set())
+
+    def test_same_as_contains(self):
+        random_generator = random.Random(1)
+        for _ in range(200):
+            patterns = [''.join(random_generator.choice('abc') for _ in range(random_generator.randint(1, 4)))
+                        for _ in range(8)]
+            text = ''.join(random_generator.choice('abcd') for _ in range(30))
+
+            self.assertEqual(AhoCorasickAutomaton(patterns).find(text),
+                             {index for index, pattern in enumerate(patterns) if pattern in text})
+
+
+class RuleMatcherTestCase(TestCase):
+
+    def test_same_as_every_rule(self):
+        random_generator = random.Random(2)
+        for _ in range(200):
+            rules = sorted({' '.join(random_generator.sample(WORDS, random_generator.randint(1, 3)))
+                            for _ in range(15)})
+            text = ' '.join(noisy_word(random_generator.choice(WORDS), random_generator)
+                            for _ in range(random_generator.randint(1, 8)))
+            similarity = random_generator.choice([50, 70, 80, 90])
+
+            for case_sensitive in [False, True]:
+                rule_matcher = RuleMatcher(rules, similarity, case_sensitive=case_sensitive)
+                self.assertEqual(sorted(rule_matcher.match(text)),
+                                 matches_every_rule(rules, text, similarity, case_sensitive))
+
+    def test_contained_rule_case(self):
+        self.assertEqual(RuleMatcher(['Connection Refused'], 100).match('error: connection refused'),
+                         ['Connection Refused'])
+        self.assertEqual(RuleMatcher(['Connection Refused'], 100, case_sensitive=True)
+                         .match('error: connection refused'), [])
+
+    def test_matched_rule_is_resolved(self):
+        rule_matcher = RuleMatcher(['timeout', 'refused'], 80)
+
+        self.assertEqual(rule_matcher.match('connection refused'), ['refused'])
+        self.assertEqual(rule_matcher.match('connection refused'), [])
+        self.assertEqual(rule_matcher.statistics()['matched'], 1)
+
+    def test_phrases_are_not_resolved(self):
+        rule_matcher = RuleMatcher(['refused', 'connection'], 80, resolve_matched=False)
+
+        self.assertEqual(len(rule_matcher.match('connection refused', first_only=True)), 1)
+        self.assertEqual(len(rule_matcher.match('connection refused')), 2)
+
+    def test_dissimilar_rules_are_not_compared(self):
+        rule_matcher = RuleMatcher(['segmentation fault', 'out of memory'], 80)
+
+        self.assertEqual(rule_matcher.match('connection refused by the server'), [])
+        self.assertEqual(rule_matcher.statistics()['compared'], 0)
+
+    def test_empty_rule(self):
+        self.assertEqual(RuleMatcher([''], 80).match('any text'), [''])
+
+
+class BlockMatchCacheTestCase(TestCase):
+
+    def test_hits_and_misses(self):
+        cache = BlockMatchCache()
+
+        self.assertIsNone(cache.get(('page', 'Error: connection refused')))
+        cache.put(('page', 'Error: connection refused'), ((), ('connection refused',), True))
+        self.assertEqual(cache.get(('page', 'Error: connection refused')), ((), ('connection refused',), True))
+        self.assertIsNone(cache.get(('url', 'Error: connection refused')))
+        self.assertEqual(cache.statistics(), {'hits': 1, 'misses': 2, 'evicted': 0, 'hit_ratio': 0.333})
+
+    def test_least_recently_used_is_evicted(self):
+        cache = BlockMatchCache(max_size=2)
+        cache.put(('page', 'File'), ((), (), False))
+        cache.put(('page', 'Edit'), ((), (), False))
+        cache.get(('page', 'File'))
+        cache.put(('page', 'View'), ((), (), False))
+
+        self.assertIsNotNone(cache.get(('page', 'File')))
+        self.assertIsNone(cache.get(('page', 'Edit')))
+        self.assertEqual(cache.statistics()['evicted'], 1)
@@ -0,0 +1,71 @@
+from unittest import TestCase
+
+from service.conqueror.core.sampling import FrameSampler, SamplingStrategies, detect_container, is_pipe_decodable, \
+    is_seekable
+
+
+def mp4_box(box_type: bytes, payload_size: int = 8) -> bytes:
+    return (8 + payload_size).to_bytes(4, 'big') + box_type + b'\x00' * payload_size
+
+
+FASTSTART_MP4 = mp4_box(b'ftyp') + mp4_box(b'moov') + mp4_box(b'mdat', 64)
+MOOV_AT_END_MP4 = mp4_box(b'ftyp') + mp4_box(b'mdat', 64) + mp4_box(b'moov')
+WEBM_WITHOUT_CUES = b'\x1a\x45\xdf\xa3' + b'\x00' * 64
+WEBM_WITH_CUES = WEBM_WITHOUT_CUES + b'\x1c\x53\xbb\x6b' + b'\x00' * 8
+
+
+class SamplingTestCase(TestCase):
+
+    def test_detect_container(self):
+        self.assertEqual(detect_container(FASTSTART_MP4), 'mp4')
+        self.assertEqual(detect_container(WEBM_WITHOUT_CUES), 'matroska')
+        self.assertEqual(detect_container(b'something else'), 'unknown')
+
+    def test_mp4_with_index_at_the_end_is_not_pipe_decodable(self):
+        self.assertTrue(is_pipe_decodable(FASTSTART_MP4))
+        self.assertFalse(is_pipe_decodable(MOOV_AT_END_MP4))
+        self.assertTrue(is_pipe_decodable(WEBM_WITHOUT_CUES))
+
+    def test_webm_is_seekable_only_with_cues(self):
+        self.assertFalse(is_seekable(WEBM_WITHOUT_CUES))
+        self.assertTrue(is_seekable(WEBM_WITH_CUES))
+
+    def test_auto_strategy(self):
+        self.assertEqual(FrameSampler(WEBM_WITH_CUES, seconds_between_frames=3).strategy,
+                         SamplingStrategies.SKIP_NONREF)
+        self.assertEqual(FrameSampler(WEBM_WITH_CUES, seconds_between_frames=30).strategy,
+                         SamplingStrategies.SEEK)
+        self.assertEqual(FrameSampler(WEBM_WITHOUT_CUES, seconds_between_frames=30).strategy,
+                         SamplingStrategies.SKIP_NONREF)
+        self.assertEqual(FrameSampler(MOOV_AT_END_MP4, seconds_between_frames=3).strategy,
+                         SamplingStrategies.SEEK)
+        self.assertEqual(FrameSampler(WEBM_WITH_CUES, fps_instead_skip_frames=False).strategy,
+                         SamplingStrategies.FRAMESTEP)
+
+    def test_explicit_strategy(self):
+        sampler = FrameSampler(WEBM_WITHOUT_CUES, strategy=SamplingStrategies.KEYFRAMES)
+        self.assertEqual(sampler.strategy, SamplingStrategies.KEYFRAMES)
+        self.assertEqual(sampler.input_options, '-skip_frame nokey')
+
+        with self.assertRaises(ValueError):
+            FrameSampler(WEBM_WITHOUT_CUES, strategy='unknown')
+
+    def test_seconds_between_samples(self):
+        self.assertEqual(FrameSampler(WEBM_WITHOUT_CUES, seconds_between_frames=3,
+                                      strategy=SamplingStrategies.SELECT).seconds_between_samples(30.0), 3)
+        self.assertAlmostEqual(FrameSampler(WEBM_WITHOUT_CUES, skip_frames=60,
+                                            strategy=SamplingStrategies.FRAMESTEP).seconds_between_samples(30.0), 2.0)
+        self.assertEqual(FrameSampler(WEBM_WITHOUT_CUES, strategy=SamplingStrategies.FRAMESTEP)
+                         .seconds_between_samples(0.0), 0.0)
+
+    def test_resumed_sampling_starts_from_the_checkpoint(self):
+        sampler = FrameSampler(WEBM_WITHOUT_CUES, seconds_between_frames=3, strategy=SamplingStrategies.SELECT,
+                               start_seconds=42.0)
+        self.assertEqual(sampler.video_filter,
+                         "select='gte(t,42.0)',select='isnan(prev_selected_t)+gte(t-prev_selected_t,3)'")
+
+        sampler = FrameSampler(WEBM_WITH_CUES, seconds_between_frames=30, strategy=SamplingStrategies.SEEK,
+                               start_seconds=42.0)
+        self.assertEqual(sampler.video_filter, 'null')
+        timestamps = sampler.seek_timestamps()
+        self.assertEqual([next(timestamps) for _ in range(3)], [42.0, 72.0, 102.0])
@@ -1,11 +1,14 @@
 import base64
 import json
+import os
 import pathlib
 import zlib
 from unittest import TestCase
-from unittest.mock import patch, NonCallableMock
+from unittest.mock import patch, NonCallableMock, ANY
 
-from service.conqueror.db_models import JobModel, JobStorageTypes
+from sqlalchemy import MetaData, Table, create_engine
+
+from service.conqueror.db_models import CHECKPOINT_COLUMN, JobModel, JobStatuses, JobStorageTypes, migrate_schema
 from service.conqueror.scheduling import get_videos_to_process, process_video
 from service.conqueror.utils import RecognitionTimeoutRepeatExceededException
 
@@ -17,6 +20,7 @@ class JobMock:
     Local_File_Path = (pathlib.Path(__file__).parent.parent / 'integration_tests_video' / '7bbfc76b.mp4').as_posix()
     Recognition_Identifiers = None
     Number_Of_Repeat = None
+    Recognition_Checkpoint = None
 
 
 class JobMockAmazon(JobMock):
@@ -28,6 +32,11 @@ class JobMockRecognitionIdentifiersWithoutUrl(JobMockAmazon):
                               '"searchPhraseIdentifiers":["Error","Exception","System"]}'
 
 
+class JobMockWithCheckpoint(JobMockAmazon):
+    Recognition_Checkpoint = '{"Seconds": 42.0, "SearchPhrasesFound": ["Error"], "URLContainsResults": {}, ' \
+                             '"TextContainsResults": {"MySQL": true}}'
+
+
 class JobMockRecognitionIdentifiersWithUrl(JobMockAmazon):
     Recognition_Identifiers = '{"caseClasificationRules":{"page":["MySQL","MongoDB","Oracle","Java"],"url":["test"]},' \
                               '"searchPhraseIdentifiers":["Error","Exception","System"]}'
@@ -92,10 +101,45 @@ class SchedulingTaskTestCase(TestCase):
         job_id = 1
         process_video(job_id)
         select_job_by_id.assert_called_once_with(job_id)
-        process_request.assert_called_once_with(get_expected_amazon_result_json())
+        process_request.assert_called_once_with(
+            get_expected_amazon_result_json(),
+            {'deadline_seconds': int(os.environ.get('RECOGNITION_DEADLINE_SECONDS', 1500)), 'ocr_job_id': job_id},
+            checkpoint=None, checkpoint_callback=ANY)
         job_processed.assert_called_once_with(json.dumps({'SearchPhrasesFound': ['some text']}))
         get_video_from_amazon_server.assert_called_once_with(job_id)
 
+    @patch.object(JobModel, 'job_checkpoint_reached')
+    @patch('service.conqueror.scheduling.get_video_from_amazon_server', return_value='fdasffasf'.encode())
+    @patch('service.conqueror.scheduling.process_request', return_value={'SearchPhrasesFound': ['some text']})
+    @patch.object(JobModel, 'job_processed')
+    @patch('service.conqueror.scheduling.select_job_by_id', return_value=JobModel(JobMockWithCheckpoint))
+    def test_process_video_from_checkpoint(self, select_job_by_id, job_processed, process_request,
+                                           get_video_from_amazon_server, job_checkpoint_reached):
+        process_video(1)
+        checkpoint = json.loads(JobMockWithCheckpoint.Recognition_Checkpoint)
+        self.assertEqual(process_request.call_args.kwargs['checkpoint'], checkpoint)
+
+        process_request.call_args.kwargs['checkpoint_callback'](checkpoint)
+        job_checkpoint_reached.assert_called_once_with(JobMockWithCheckpoint.Recognition_Checkpoint)
+
+    @patch.object(JobModel, 'has_checkpoint_column', True)
+    @patch.dict('service.conqueror.utils.database_config', {'mysql': {}})
+    @patch('service.conqueror.utils.DSN', 'sqlite://')
+    @patch('service.conqueror.utils.create_engine')
+    def test_checkpoint_is_cleared_when_job_ends(self, create_engine):
+        connection = create_engine.return_value.connect.return_value.__enter__.return_value
+        job = JobModel(JobMockWithCheckpoint)
+
+        job.job_processed(json.dumps({'SearchPhrasesFound': []}))
+        job.exception_catched('system trying to process this job too much times')
+
+        updates = [update_call.args[0].compile().params for update_call in connection.execute.call_args_list
+                   if update_call.args[0] != 'commit']
+        self.assertEqual(len(updates), 2)
+        for update in updates:
+            self.assertIn('Recognition_Checkpoint', update)
+            self.assertIsNone(update['Recognition_Checkpoint'])
+
     def test_create_job_url_null_object(self):
         job_without_url = JobModel(JobMockRecognitionIdentifiersWithoutUrl)
         self.assertEqual(job_without_url.url_contains, [])
@@ -104,3 +148,37 @@ class SchedulingTaskTestCase(TestCase):
         job_with_url = JobModel(JobMockRecognitionIdentifiersWithUrl)
         self.assertEqual(job_with_url.url_contains, json.loads(
             JobMockRecognitionIdentifiersWithUrl.Recognition_Identifiers)['caseClasificationRules']['url'])
+
+
+@patch.object(JobModel, 'has_checkpoint_column', None)
+class JobSchemaMigrationTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.connection = create_engine('sqlite://').connect()
+        # Jobs table created before recognition checkpoints
+        legacy_schema = Table(JobModel.schema.name, MetaData(),
+                              *[column.copy() for column in JobModel.schema.c if column.name != CHECKPOINT_COLUMN])
+        legacy_schema.create(self.connection)
+        self.connection.execute(legacy_schema.insert(values={'JobId': 'job 1', 'Status': JobStatuses.Uploaded,
+                                                             'Local_File_Path': 'job.webm'}))
+
+    def tearDown(self) -> None:
+        self.connection.close()
+
+    def select_job(self) -> JobModel:
+        return JobModel(self.connection.execute(JobModel.select_columns(self.connection)
+                                                .where(JobModel.schema.c.JobId == 'job 1')).first())
+
+    def test_unmigrated_schema_is_read_without_checkpoints(self):
+        self.assertIsNone(self.select_job().checkpoint)
+        self.assertEqual(JobModel.checkpoint_values(self.connection, '{"Seconds": 42.0}'), {})
+
+    def test_migration_adds_checkpoint_column(self):
+        self.select_job()
+
+        self.assertEqual(migrate_schema(self.connection), [CHECKPOINT_COLUMN])
+        self.assertEqual(migrate_schema(self.connection), [])
+
+        self.connection.execute(JobModel.schema.update()
+                                .values(**JobModel.checkpoint_values(self.connection, '{"Seconds": 42.0}')))
+        self.assertEqual(self.select_job().checkpoint, {'Seconds': 42.0})
@@ -0,0 +1,72 @@
+import threading
+from unittest import TestCase
+
+import numpy
+
+from service.conqueror.core.pipeline import PipelineStoppedException
+from service.conqueror.core.shared_frames import SharedFrameRing, SharedFrameReader
+
+
+class SharedFrameRingTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.stop_event = threading.Event()
+        self.ring = SharedFrameRing(2, 100 * 200, self.stop_event)
+        self.reader = SharedFrameReader()
+
+    def tearDown(self) -> None:
+        self.reader.close()
+        self.ring.close()
+
+    def test_write_and_view(self):
+        image = numpy.arange(100 * 200, dtype=numpy.uint8).reshape((100, 200))
+        reference = self.ring.write(image)
+
+        view = self.reader.view(reference)
+        numpy.testing.assert_array_equal(view, image)
+        del view
+
+    def test_slot_is_reused_after_release(self):
+        image = numpy.zeros((100, 200), dtype=numpy.uint8)
+        first = self.ring.write(image)
+        second = self.ring.write(image)
+        self.assertNotEqual(first.slot, second.slot)
+
+        self.ring.release(first.slot)
+        self.assertEqual(self.ring.write(image).slot, first.slot)
+
+    def test_write_waits_for_free_slot(self):
+        image = numpy.zeros((100, 200), dtype=numpy.uint8)
+        self.ring.write(image)
+        self.ring.write(image)
+        threading.Timer(0.2, self.stop_event.set).start()
+
+        with self.assertRaises(PipelineStoppedException):
+            self.ring.write(image)
+
+    def test_fits(self):
+        self.assertTrue(self.ring.fits(numpy.zeros((100, 200), dtype=numpy.uint8)))
+        self.assertFalse(self.ring.fits(numpy.zeros((100, 200, 3), dtype=numpy.uint8)))
+
+    def test_is_idle(self):
+        self.assertTrue(self.ring.is_idle)
+        reference = self.ring.write(numpy.zeros((100, 200), dtype=numpy.uint8))
+        self.assertFalse(self.ring.is_idle)
+
+        self.ring.release(reference.slot)
+        self.assertTrue(self.ring.is_idle)
+
+    def test_reader_keeps_views_of_replaced_ring(self):
+        bigger_ring = SharedFrameRing(2, 100 * 200 * 3, self.stop_event)
+        try:
+            image = numpy.ones((100, 200), dtype=numpy.uint8)
+            bigger_image = numpy.full((100, 200, 3), 2, dtype=numpy.uint8)
+
+            view = self.reader.view(self.ring.write(image))
+            bigger_view = self.reader.view(bigger_ring.write(bigger_image))
+            numpy.testing.assert_array_equal(view, image)
+            numpy.testing.assert_array_equal(bigger_view, bigger_image)
+            del view, bigger_view
+        finally:
+            self.reader.close()
+            bigger_ring.close()
@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+import cv2
+import numpy
+
+from service.conqueror.core.static_chrome import StaticChromeDetector, mask_image
+
+
+def screen_frame(frame_index: int, taskbar_text='Start  Files  Terminal  12:00') -> numpy.ndarray:
+    frame = numpy.full((720, 1280), 240, numpy.uint8)
+    frame[672:] = 200
+    cv2.putText(frame, taskbar_text, (20, 704), cv2.FONT_HERSHEY_SIMPLEX, 0.7, 20, 2)
+    for line_index in range(6):
+        cv2.putText(frame, f'Log line {frame_index * 6 + line_index} processed', (40, 100 + 60 * line_index),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, 20, 2)
+    cv2.putText(frame, f'Status: request {frame_index * 37} done', (40, 560), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 20, 2)
+    return frame
+
+
+class StaticChromeDetectorTestCase(TestCase):
+
+    def test_frames_are_not_masked_during_warmup(self):
+        detector = StaticChromeDetector(warmup_frames=3)
+
+        self.assertIsNone(detector.static_mask(screen_frame(0)))
+        self.assertIsNone(detector.static_mask(screen_frame(1)))
+        self.assertIsNone(detector.static_mask(screen_frame(2)))
+
+    def test_static_taskbar_is_masked(self):
+        detector = StaticChromeDetector(warmup_frames=3)
+        for frame_index in range(3):
+            detector.static_mask(screen_frame(frame_index))
+
+        mask = detector.static_mask(screen_frame(3))
+        self.assertEqual(mask.shape, (720, 1280))
+        self.assertTrue(mask[680:, :].all())
+        # Changing text is content
+        self.assertFalse(mask[80:420, 40:300].any())
+        self.assertEqual(detector.statistics()['masked'], 1)
+
+    def test_line_with_static_words_is_not_masked(self):
+        detector = StaticChromeDetector(warmup_frames=3)
+        for frame_index in range(3):
+            detector.static_mask(screen_frame(frame_index))
+
+        mask = detector.static_mask(screen_frame(3))
+        # "Status: request" is the same on every frame, but the numbers after it change
+        self.assertFalse(mask[540:565, 40:200].any())
+
+    def test_changed_chrome_is_not_masked(self):
+        detector = StaticChromeDetector(warmup_frames=3)
+        for frame_index in range(3):
+            detector.static_mask(screen_frame(frame_index))
+
+        mask = detector.static_mask(screen_frame(3, taskbar_text='Start  Files  Terminal  Error: disk is full'))
+        self.assertFalse(mask[680:710, 20:400].any())
+        self.assertGreater(detector.statistics()['changed_tiles'], 0)
+
+    def test_mask_image_fills_background(self):
+        image = screen_frame(0)
+        mask = numpy.zeros(image.shape, bool)
+        mask[672:] = True
+
+        masked_image = mask_image(image, mask)
+        self.assertTrue((masked_image[672:] == 240).all())
+        self.assertTrue((masked_image[:672] == image[:672]).all())
+        self.assertFalse((image[672:] == 240).all())
@@ -0,0 +1,52 @@
+from unittest import TestCase
+
+import cv2
+import numpy
+
+from service.conqueror.core.text_regions import TextRegionDetector
+
+
+class TextRegionDetectorTestCase(TestCase):
+
+    def setUp(self):
+        self.image = numpy.full((720, 1280), 240, numpy.uint8)
+        cv2.putText(self.image, 'File  Edit  View', (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 20, 2)
+        cv2.putText(self.image, 'Error: connection refused', (600, 400), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 20, 2)
+        cv2.putText(self.image, 'Retry later', (600, 430), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 20, 2)
+
+    def test_text_regions(self):
+        detector = TextRegionDetector(padding=8)
+
+        regions = sorted(detector.text_regions(self.image))
+
+        self.assertEqual(len(regions), 2)
+        menu, message = regions
+        # Regions keep the image coordinates and cover the text with padding
+        self.assertTrue(menu[0] <= 20 - 8 + 1 and menu[1] < 40 - 17 and menu[1] + menu[3] > 40)
+        # Lines of the paragraph are one block
+        self.assertTrue(message[0] <= 600 - 7 and message[1] < 400 - 17 and message[1] + message[3] > 430)
+        self.assertLess(detector.statistics()['recognized_pixels_ratio'], 0.1)
+
+    def test_blank_image_is_skipped(self):
+        detector = TextRegionDetector()
+        image = numpy.full((720, 1280), 240, numpy.uint8)
+        image += numpy.random.default_rng(0).integers(0, 4, image.shape, dtype=numpy.uint8)
+
+        self.assertEqual(detector.text_regions(image), [])
+        self.assertEqual(detector.statistics()['skipped'], 1)
+
+    def test_search_regions(self):
+        detector = TextRegionDetector()
+
+        regions = detector.text_regions(self.image, search_regions=[(700, 380, 20, 20)])
+
+        self.assertEqual(len(regions), 1)
+        self.assertGreater(regions[0][0], 500)
+
+    def test_text_covering_image_is_recognized_whole(self):
+        detector = TextRegionDetector()
+        image = numpy.full((100, 110), 240, numpy.uint8)
+        for y in range(20, 100, 25):
+            cv2.putText(image, 'Error text', (5, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, 20, 2)
+
+        self.assertEqual(detector.text_regions(image), [(0, 0, 110, 100)])
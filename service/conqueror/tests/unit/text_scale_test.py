@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+import cv2
+import numpy
+
+from service.conqueror.core.text_scale import TextScaleEstimator
+
+
+def text_image(scale: float) -> numpy.ndarray:
+    image = numpy.full((int(720 * scale), int(1280 * scale)), 240, numpy.uint8)
+    for line in range(12):
+        cv2.putText(image, 'Error: connection refused', (int(20 * scale), int((40 + line * 50) * scale)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5 * scale, 20, max(1, int(scale)))
+    return image
+
+
+class TextScaleEstimatorTestCase(TestCase):
+
+    def test_character_height_follows_resolution(self):
+        estimator = TextScaleEstimator()
+
+        height = estimator.character_height(text_image(1))
+        self.assertAlmostEqual(estimator.character_height(text_image(3)) / height, 3, delta=0.5)
+
+    def test_scale(self):
+        estimator = TextScaleEstimator(target_character_height=12)
+        image = text_image(3)
+
+        scale = estimator.scale(image)
+        self.assertEqual(scale, 0.5)
+        # The scale is kept for an image without text
+        self.assertEqual(estimator.scale(numpy.full(image.shape, 240, numpy.uint8)), scale)
+        self.assertEqual(estimator.statistics(), {'images': 2, 'estimated': 1, 'resized': 2})
+
+    def test_target_height_is_not_resized(self):
+        estimator = TextScaleEstimator(target_character_height=12)
+        image = text_image(1)
+        estimator.target_character_height = estimator.character_height(image) * 1.05
+
+        self.assertEqual(estimator.scale(image), 1.0)
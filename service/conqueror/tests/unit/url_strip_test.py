@@ -0,0 +1,110 @@
+import threading
+from unittest import TestCase
+from unittest.mock import Mock
+
+import cv2
+import numpy
+
+from service.conqueror.core.keyframe import KeyFrameFinder
+from service.conqueror.core.keyframe_multipocessing_helper import KeyframeMultiprocessingHelper, URL_STRIP_IMAGE_KEY
+from service.conqueror.core.keyframe_worker_pool import KeyframeWorkerPool
+from service.conqueror.core.pipeline import FrameProgress, StageQueue
+from service.conqueror.core.url_strip import UrlStripTracker, text_line_bands
+
+
+def browser_frame(url: str) -> numpy.ndarray:
+    frame = numpy.full((720, 1280), 240, numpy.uint8)
+    frame[:40] = 222
+    cv2.putText(frame, 'New tab', (20, 28), cv2.FONT_HERSHEY_SIMPLEX, 0.6, 20, 1)
+    cv2.putText(frame, url, (20, 68), cv2.FONT_HERSHEY_SIMPLEX, 0.6, 20, 1)
+    cv2.putText(frame, 'Page content', (20, 300), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 20, 2)
+    return frame
+
+
+class UrlStripTrackerTestCase(TestCase):
+
+    def test_same_strip_is_recognized_once(self):
+        tracker = UrlStripTracker(strip_height=90)
+        frame = browser_frame('https://example.com/login')
+
+        strip = tracker.new_strip(frame)
+        self.assertEqual(strip.shape, (90, 1280))
+        self.assertIsNone(tracker.new_strip(frame.copy()))
+        self.assertEqual(tracker.statistics(), {'frames': 2, 'recognized': 1})
+
+    def test_compression_noise_is_not_a_new_strip(self):
+        tracker = UrlStripTracker(strip_height=90)
+        frame = browser_frame('https://example.com/login')
+        noisy_frame = frame.copy()
+        noisy_frame[::7, ::5] += 1
+
+        tracker.new_strip(frame)
+        self.assertIsNone(tracker.new_strip(noisy_frame))
+
+    def test_new_url_is_recognized(self):
+        tracker = UrlStripTracker(strip_height=90)
+
+        tracker.new_strip(browser_frame('https://example.com/login'))
+        self.assertIsNotNone(tracker.new_strip(browser_frame('https://example.com/error')))
+
+    def test_page_content_is_not_in_the_strip(self):
+        tracker = UrlStripTracker(strip_height=90)
+        frame = browser_frame('https://example.com/login')
+        other_page = frame.copy()
+        cv2.putText(other_page, 'Error: connection refused', (20, 400), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 20, 2)
+
+        tracker.new_strip(frame)
+        self.assertIsNone(tracker.new_strip(other_page))
+
+
+class TextLineBandsTestCase(TestCase):
+
+    def test_tab_and_address_lines(self):
+        strip = browser_frame('https://example.com/login')[:90]
+
+        bands = text_line_bands(strip)
+        self.assertEqual(len(bands), 2)
+        (tab_y, tab_height), (url_y, url_height) = bands
+        self.assertLessEqual(tab_y, 16)
+        self.assertGreaterEqual(tab_y + tab_height, 28)
+        self.assertLessEqual(url_y, 56)
+        self.assertGreaterEqual(url_y + url_height, 68)
+
+    def test_horizontal_border_is_not_a_line(self):
+        strip = numpy.full((90, 1280), 240, numpy.uint8)
+        strip[40:42] = 100
+
+        self.assertEqual(text_line_bands(strip), [])
+
+
+class UrlStripSubmitTestCase(TestCase):
+
+    def test_page_images_are_copied_to_shared_memory(self):
+        stop_event = threading.Event()
+        frame_processor = KeyframeMultiprocessingHelper(url_search_keys={'example.com': False}, key_phrases=['error'],
+                                                        recognition_settings={'url_strip_recognition': True})
+        decoded_frames = StageQueue('decoded_frames', 2, stop_event)
+        decoded_frames.put((0, browser_frame('https://example.com/login')))
+        decoded_frames.put(None)
+        worker_pool = KeyframeWorkerPool(1, stop_event=stop_event)
+        submitted = []
+        submit = worker_pool.submit
+
+        def recording_submit(frame_index, image_key, image):
+            is_copied = submit(frame_index, image_key, image)
+            submitted.append((image_key, image.shape, is_copied))
+            return is_copied
+
+        worker_pool.submit = recording_submit
+        try:
+            KeyFrameFinder._KeyFrameFinder__preprocessing_stage(frame_processor, Mock(), None, None, decoded_frames,
+                                                                worker_pool, FrameProgress())
+        finally:
+            worker_pool.cancel()
+
+        # The strip is submitted before the page, both through shared memory
+        self.assertEqual([(image_key, is_copied) for image_key, _, is_copied in submitted],
+                         [(URL_STRIP_IMAGE_KEY, True), (0, True)])
+        self.assertEqual(submitted[1][1], (720, 1280))
+        self.assertEqual(worker_pool.statistics()['shared_memory_reallocations'], 0)
+        self.assertEqual(worker_pool.statistics()['pickled_images'], 0)
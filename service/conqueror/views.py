@@ -1,3 +1,5 @@
+import uuid
+
 from aiohttp import web
 from .managers import process_request
 
@@ -11,4 +13,5 @@ class ProcessEndpoint(web.View):
     async def post(self):
         # check ruleset
         request_body = await self.request.read()
-        return web.json_response(process_request(request_body))
+        # Requests share the server process, each one gets its own queue on the OCR server
+        return web.json_response(process_request(request_body, {'ocr_job_id': uuid.uuid4().hex}))